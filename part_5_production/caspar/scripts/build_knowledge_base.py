@@ -12,19 +12,27 @@ This script:
 Note: Make sure you've run 'pip install -e .' from the project root first!
 """
 
+import json
+import os
 import sys
 from pathlib import Path
 
 from caspar.config import setup_logging, get_logger
-from caspar.knowledge import KnowledgeLoader, KnowledgeRetriever
 
 setup_logging()
 logger = get_logger(__name__)
 
+# (query, expected source files) pairs for the retrieval sanity check
+GOLD_QUERIES_PATH = Path("data/eval/retrieval_gold.json")
 
-def build_knowledge_base():
+
+def build_knowledge_base(batch_size: int | None = None, force: bool = False):
     """Build the ChromaDB knowledge base from markdown files."""
     
+    # Imported here (and in the other commands) so --help doesn't pay for
+    # loading chromadb and langchain
+    from caspar.knowledge import KnowledgeLoader, KnowledgeRetriever
+    
     print("=" * 60)
     print("📚 Building CASPAR Knowledge Base")
     print("=" * 60)
@@ -36,36 +44,70 @@ def build_knowledge_base():
         print("   Create the directory and add your .md files")
         return False
     
-    md_files = list(kb_path.glob("*.md"))
+    # scandir entries carry the stat info from the directory read itself,
+    # so listing sizes doesn't cost an extra stat() call per file
+    with os.scandir(kb_path) as entries:
+        md_files = [
+            entry for entry in entries
+            if entry.is_file() and entry.name.endswith(".md")
+        ]
+    
     print(f"\n📄 Found {len(md_files)} markdown files:")
-    for f in md_files:
-        size = f.stat().st_size / 1024
-        print(f"   • {f.name} ({size:.1f} KB)")
+    for entry in md_files:
+        size = entry.stat().st_size / 1024
+        print(f"   • {entry.name} ({size:.1f} KB)")
     
     if not md_files:
         print("❌ No .md files found in knowledge base directory")
         return False
     
-    # Load and preview documents
-    print("\n📖 Loading documents...")
     loader = KnowledgeLoader()
-    chunks = loader.load_and_split()
+    retriever = KnowledgeRetriever()
     
-    print(f"✅ Created {len(chunks)} chunks")
-    print(f"   Average chunk size: {sum(len(c.page_content) for c in chunks) // len(chunks)} characters")
+    # Nothing changed since the last build - don't touch the store at all
+    if not force and retriever.is_up_to_date(loader):
+        print("\n✨ KB up-to-date, skipping rebuild (use --force to rebuild anyway)")
+        return True
     
     # Build vector store
     print("\n🔨 Building vector store...")
-    retriever = KnowledgeRetriever()
-    retriever.initialize(force_reload=True)
+    # Normally only changed files are re-embedded; --force resets the
+    # collection and embeds everything (e.g. after changing HNSW settings).
+    # Chunks stream straight into the store, so their stats come from the
+    # lengths the loader recorded on the way through.
+    retriever.initialize(
+        force_reload=force,
+        incremental=not force,
+        batch_size=batch_size,
+        loader=loader
+    )
+    
+    lengths = sorted(loader.chunk_lengths)
+    print(f"✅ Embedded {len(lengths)} chunks")
+    
+    if lengths:
+        # Sorted once so we can also show the p95, which is more useful
+        # than the mean when tuning chunk_size
+        p95 = lengths[min(len(lengths) - 1, int(len(lengths) * 0.95))]
+        print(f"   Average chunk size: {sum(lengths) // len(lengths)} characters (p95: {p95})")
     
     print("✅ Vector store created and persisted")
     
     return True
 
 
-def test_retrieval():
-    """Test retrieval with sample queries."""
+def test_retrieval(k: int = 2) -> float:
+    """
+    Test retrieval against the gold query set and report recall@k.
+    
+    A query counts as a hit when any of its top-k chunks comes from one of
+    the expected source files in data/eval/retrieval_gold.json.
+    
+    Returns:
+        The fraction of queries that were hits
+    """
+    
+    from caspar.knowledge import KnowledgeRetriever
     
     print("\n" + "=" * 60)
     print("🧪 Testing Knowledge Retrieval")
@@ -74,21 +116,20 @@ def test_retrieval():
     retriever = KnowledgeRetriever()
     retriever.initialize()
     
-    test_queries = [
-        "What is your return policy?",
-        "How do I track my order?",
-        "My laptop won't turn on, what should I do?",
-        "What laptops do you sell?",
-        "How long does shipping take?",
-        "Can I pay with PayPal?",
-        "My earbuds won't connect to my phone",
-    ]
-    
-    for query in test_queries:
-        print(f"\n📝 Query: {query}")
-        print("-" * 50)
+    gold = json.loads(GOLD_QUERIES_PATH.read_text(encoding="utf-8"))
+    test_queries = [entry["query"] for entry in gold]
+    
+    # One embedding request and one vector search for all queries
+    all_results = retriever.retrieve_batch(test_queries, k=k)
+    
+    hits = []
+    for entry, results in zip(gold, all_results):
+        sources = [doc.metadata.get("source", "unknown") for doc, _ in results]
+        hit = any(source in entry["expected_sources"] for source in sources)
+        hits.append(hit)
         
-        results = retriever.retrieve_with_scores(query, k=2)
+        print(f"\n{'✅' if hit else '❌'} Query: {entry['query']}")
+        print("-" * 50)
         
         for doc, score in results:
             source = doc.metadata.get("source", "unknown")
@@ -96,12 +137,18 @@ def test_retrieval():
             print(f"   📄 [{source}] (score: {score:.3f})")
             print(f"      {preview}...")
     
+    recall = sum(hits) / len(hits) if hits else 0.0
+    print(f"\n📊 Recall@{k}: {recall:.0%} ({sum(hits)}/{len(hits)} queries)")
     print("\n✅ Retrieval tests complete!")
+    
+    return recall
 
 
 def interactive_test():
     """Interactive mode for testing queries."""
     
+    from caspar.knowledge import KnowledgeRetriever
+    
     print("\n" + "=" * 60)
     print("🔍 Interactive Knowledge Search")
     print("=" * 60)
@@ -142,6 +189,8 @@ def main():
     parser.add_argument("--build", action="store_true", help="Build the vector store")
     parser.add_argument("--test", action="store_true", help="Run retrieval tests")
     parser.add_argument("--interactive", action="store_true", help="Interactive query mode")
+    parser.add_argument("--batch-size", type=int, default=None, help="Chunks per embedding/insert batch")
+    parser.add_argument("--force", action="store_true", help="Rebuild everything from scratch, even if the knowledge files are unchanged")
     
     args = parser.parse_args()
     
@@ -151,7 +200,7 @@ def main():
         args.test = True
     
     if args.build:
-        success = build_knowledge_base()
+        success = build_knowledge_base(batch_size=args.batch_size, force=args.force)
         if not success:
             sys.exit(1)
     
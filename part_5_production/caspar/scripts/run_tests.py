@@ -4,48 +4,96 @@ Unified test runner for CASPAR.
 Run different test suites based on the situation.
 """
 
+import importlib.util
 import subprocess
 import sys
 import argparse
+import tempfile
+
+import pytest
+
+
+# Suite name -> (banner, pytest arguments)
+SUITES = {
+    "unit": ("🧪 Running Unit Tests...", ["tests/unit/", "-v", "--tb=short"]),
+    "integration": (
+        "🔗 Running Integration Tests...",
+        ["tests/integration/", "-v", "--tb=short", "--timeout=60"],
+    ),
+    "evaluation": (
+        "📊 Running Evaluation Tests...",
+        ["tests/evaluation/", "-v", "--tb=short", "--timeout=120"],
+    ),
+}
+
+
+def _pytest_args(suite: str) -> list[str]:
+    """Build the pytest arguments for a suite."""
+    command = list(SUITES[suite][1])
+    
+    # Spread tests across CPU cores when pytest-xdist is installed.
+    # loadfile keeps each test file on one worker, so tests that share
+    # module-level fixtures or singletons still run together.
+    if importlib.util.find_spec("xdist") is not None:
+        command += ["-n", "auto", "--dist=loadfile"]
+    
+    # Parallel runs would otherwise race on the .pytest_cache directory
+    command += ["-p", "no:cacheprovider"]
+    
+    return command
+
+
+def _run_suite(suite: str) -> bool:
+    """Run a single suite in this process, streaming its output."""
+    print(f"\n{SUITES[suite][0]}")
+    
+    # pytest.main() reuses the interpreter we're already running in,
+    # skipping a fresh Python startup and plugin discovery per suite
+    return pytest.main(_pytest_args(suite)) == 0
 
 
 def run_unit_tests():
     """Run fast unit tests."""
-    print("\n🧪 Running Unit Tests...")
-    result = subprocess.run(
-        ["pytest", "tests/unit/", "-v", "--tb=short"],
-        capture_output=False
-    )
-    return result.returncode == 0
+    return _run_suite("unit")
 
 
 def run_integration_tests():
     """Run integration tests (requires API key)."""
-    print("\n🔗 Running Integration Tests...")
-    result = subprocess.run(
-        ["pytest", "tests/integration/", "-v", "--tb=short", "--timeout=60"],
-        capture_output=False
-    )
-    return result.returncode == 0
+    return _run_suite("integration")
 
 
 def run_evaluation_tests():
     """Run evaluation tests (slowest, most thorough)."""
-    print("\n📊 Running Evaluation Tests...")
-    result = subprocess.run(
-        ["pytest", "tests/evaluation/", "-v", "--tb=short", "--timeout=120"],
-        capture_output=False
-    )
-    return result.returncode == 0
+    return _run_suite("evaluation")
 
 
 def run_all_tests():
     """Run all test suites."""
-    results = {
-        "unit": run_unit_tests(),
-        "integration": run_integration_tests(),
-        "evaluation": run_evaluation_tests(),
-    }
+    
+    # The suites live in separate directories and the slow ones spend most
+    # of their time waiting on the API, so start them all at once. Output
+    # goes to a temp file per suite and is printed once that suite finishes.
+    running = {}
+    for suite in SUITES:
+        output = tempfile.TemporaryFile(mode="w+")
+        # Concurrent suites need separate processes - pytest.main() keeps
+        # global state (sys.modules, plugins) that can't be shared
+        process = subprocess.Popen(
+            [sys.executable, "-m", "pytest", *_pytest_args(suite)],
+            stdout=output,
+            stderr=subprocess.STDOUT,
+            text=True,
+        )
+        running[suite] = (process, output)
+    
+    results = {}
+    for suite, (process, output) in running.items():
+        results[suite] = process.wait() == 0
+        
+        print(f"\n{SUITES[suite][0]}")
+        output.seek(0)
+        print(output.read())
+        output.close()
     
     print("\n" + "=" * 60)
     print("TEST SUMMARY")
@@ -5,6 +5,7 @@
 
 import asyncio
 from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
 
 from caspar.agent import create_agent, create_initial_state
 from caspar.config import setup_logging, get_logger
@@ -13,19 +14,18 @@ setup_logging()
 logger = get_logger(__name__)
 
 
-async def test_flow(name: str, message: str, customer_id: str = "CUST-1000"):
+async def test_flow(agent, name: str, message: str, customer_id: str = "CUST-1000"):
     """Run a single test flow."""
-    print(f"\n{'=' * 60}")
-    print(f"🧪 Test: {name}")
-    print(f"{'=' * 60}")
-    
-    agent = await create_agent()
     state = create_initial_state(conversation_id=f"test-{name}", customer_id=customer_id)
     state["messages"] = [HumanMessage(content=message)]
     
     config = {"configurable": {"thread_id": f"test-{name}"}}
     result = await agent.ainvoke(state, config)
     
+    # Print only after the agent finishes so concurrent flows don't interleave
+    print(f"\n{'=' * 60}")
+    print(f"🧪 Test: {name}")
+    print(f"{'=' * 60}")
     print(f"Customer: {message}")
     print(f"Intent: {result['intent']}")
     print(f"Sentiment: {result.get('sentiment_score', 'N/A')}")
@@ -39,20 +39,18 @@ async def test_flow(name: str, message: str, customer_id: str = "CUST-1000"):
 async def main():
     """Run all tests."""
     
-    # Test FAQ
-    await test_flow("FAQ", "What is your return policy?")
-    
-    # Test Order Inquiry
-    await test_flow("Order", "Where is my order TF-10001?")
-    
-    # Test Account
-    await test_flow("Account", "What's my loyalty status?", "CUST-1001")
-    
-    # Test Complaint
-    await test_flow("Complaint", "My laptop arrived damaged! This is unacceptable!")
-    
-    # Test Handoff
-    await test_flow("Handoff", "I want to speak to a human agent please")
+    # One agent is enough - each flow uses its own thread_id
+    # and it stays in-memory: these runs are throwaway, so skip database round-trips
+    agent = await create_agent(checkpointer=MemorySaver())
+    
+    # The flows are independent and network-bound, so run them concurrently
+    await asyncio.gather(
+        test_flow(agent, "FAQ", "What is your return policy?"),
+        test_flow(agent, "Order", "Where is my order TF-10001?"),
+        test_flow(agent, "Account", "What's my loyalty status?", "CUST-1001"),
+        test_flow(agent, "Complaint", "My laptop arrived damaged! This is unacceptable!"),
+        test_flow(agent, "Handoff", "I want to speak to a human agent please"),
+    )
     
     print(f"\n{'=' * 60}")
     print("✅ All tests complete!")
@@ -5,6 +5,7 @@
 
 import asyncio
 from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import MemorySaver
 
 from caspar.agent import create_agent, create_initial_state
 from caspar.handoff import get_handoff_queue, format_context_for_display
@@ -14,13 +15,8 @@ setup_logging()
 logger = get_logger(__name__)
 
 
-async def test_explicit_handoff():
+async def test_explicit_handoff(agent):
     """Test explicit request for human agent."""
-    print("\n" + "=" * 60)
-    print("🧪 Test: Explicit Handoff Request")
-    print("=" * 60)
-    
-    agent = await create_agent()
     state = create_initial_state(
         conversation_id="test-handoff-explicit",
         customer_id="CUST-1000"
@@ -30,6 +26,9 @@ async def test_explicit_handoff():
     config = {"configurable": {"thread_id": "test-handoff-explicit"}}
     result = await agent.ainvoke(state, config)
     
+    print("\n" + "=" * 60)
+    print("🧪 Test: Explicit Handoff Request")
+    print("=" * 60)
     print(f"Intent: {result['intent']}")
     print(f"Escalated: {result.get('needs_escalation')}")
     print(f"Ticket: {result.get('ticket_id')}")
@@ -44,13 +43,8 @@ async def test_explicit_handoff():
         print(f"   Est. Wait: {request.estimated_wait} minutes")
 
 
-async def test_frustration_escalation():
+async def test_frustration_escalation(agent):
     """Test escalation triggered by frustration."""
-    print("\n" + "=" * 60)
-    print("🧪 Test: Frustration-Triggered Escalation")
-    print("=" * 60)
-    
-    agent = await create_agent()
     state = create_initial_state(
         conversation_id="test-handoff-frustration",
         customer_id="CUST-1001"
@@ -64,6 +58,9 @@ async def test_frustration_escalation():
     config = {"configurable": {"thread_id": "test-handoff-frustration"}}
     result = await agent.ainvoke(state, config)
     
+    print("\n" + "=" * 60)
+    print("🧪 Test: Frustration-Triggered Escalation")
+    print("=" * 60)
     print(f"Intent: {result['intent']}")
     print(f"Sentiment: {result.get('sentiment_score')}")
     print(f"Frustration: {result.get('frustration_level')}")
@@ -71,14 +68,8 @@ async def test_frustration_escalation():
     print(f"\nCASPAR Response:\n{result['messages'][-1].content[:300]}...")
 
 
-async def test_vip_customer():
+async def test_vip_customer(agent):
     """Test VIP customer gets priority handling."""
-    print("\n" + "=" * 60)
-    print("🧪 Test: VIP Customer Handling")
-    print("=" * 60)
-    
-    agent = await create_agent()
-    
     # CUST-1003 is a gold tier customer in our mock data
     state = create_initial_state(
         conversation_id="test-handoff-vip",
@@ -91,6 +82,9 @@ async def test_vip_customer():
     config = {"configurable": {"thread_id": "test-handoff-vip"}}
     result = await agent.ainvoke(state, config)
     
+    print("\n" + "=" * 60)
+    print("🧪 Test: VIP Customer Handling")
+    print("=" * 60)
     print(f"Intent: {result['intent']}")
     print(f"Escalated: {result.get('needs_escalation')}")
     
@@ -101,13 +95,8 @@ async def test_vip_customer():
         print(f"Triggers: {request.triggers}")
 
 
-async def test_sensitive_topic():
+async def test_sensitive_topic(agent):
     """Test sensitive topic detection."""
-    print("\n" + "=" * 60)
-    print("🧪 Test: Sensitive Topic Detection")
-    print("=" * 60)
-    
-    agent = await create_agent()
     state = create_initial_state(
         conversation_id="test-handoff-sensitive",
         customer_id="CUST-1000"
@@ -119,6 +108,9 @@ async def test_sensitive_topic():
     config = {"configurable": {"thread_id": "test-handoff-sensitive"}}
     result = await agent.ainvoke(state, config)
     
+    print("\n" + "=" * 60)
+    print("🧪 Test: Sensitive Topic Detection")
+    print("=" * 60)
     print(f"Intent: {result['intent']}")
     print(f"Escalated: {result.get('needs_escalation')}")
     print(f"Reason: {result.get('escalation_reason', 'N/A')}")
@@ -160,10 +152,18 @@ async def test_queue_management():
 async def main():
     """Run all handoff tests."""
     
-    await test_explicit_handoff()
-    await test_frustration_escalation()
-    await test_vip_customer()
-    await test_sensitive_topic()
+    # One agent is enough - each test uses its own conversation/thread ID
+    # and it stays in-memory: these runs are throwaway, so skip database round-trips
+    agent = await create_agent(checkpointer=MemorySaver())
+    
+    # The agent tests are independent and network-bound, so run them concurrently
+    await asyncio.gather(
+        test_explicit_handoff(agent),
+        test_frustration_escalation(agent),
+        test_vip_customer(agent),
+        test_sensitive_topic(agent),
+    )
+    
     await test_queue_management()
     
     print("\n" + "=" * 60)
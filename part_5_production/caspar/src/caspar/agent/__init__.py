@@ -4,7 +4,7 @@
 """CASPAR Agent Module - The core intelligence of the customer service system."""
 
 from .state import AgentState, create_initial_state, ConversationMetadata
-from .graph import build_graph, create_agent
+from .graph import build_graph, create_agent, get_or_create_agent, run_agent, stream_agent
 from .nodes import (
     classify_intent,
     handle_faq,
@@ -14,7 +14,8 @@ from .nodes import (
     handle_general,
     respond,
 )
-from .nodes_handoff_update import check_sentiment, human_handoff
+from .nodes_handoff_update import check_sentiment, classify_and_check_sentiment, human_handoff
+from .persistence import BoundedMemorySaver, create_checkpointer_context, create_connection_pool
 
 __all__ = [
     # State
@@ -24,6 +25,9 @@ __all__ = [
     # Graph
     "build_graph", 
     "create_agent",
+    "get_or_create_agent",
+    "run_agent",
+    "stream_agent",
     # Nodes
     "classify_intent", 
     "handle_faq", 
@@ -32,6 +36,11 @@ __all__ = [
     "handle_complaint", 
     "handle_general", 
     "check_sentiment", 
+    "classify_and_check_sentiment",
     "respond", 
     "human_handoff",
+    # Persistence
+    "BoundedMemorySaver",
+    "create_checkpointer_context",
+    "create_connection_pool",
 ]
@@ -8,13 +8,16 @@ This module defines the StateGraph that orchestrates the agent's behavior,
 routing messages through classification, handling, and response generation.
 """
 
+from functools import lru_cache
+import asyncio
+from types import MappingProxyType
+from langchain_core.messages import AIMessageChunk
 from langgraph.graph import StateGraph, END
-from langgraph.checkpoint.memory import MemorySaver
 
-from caspar.config import get_logger
+from caspar.config import settings, get_logger
 from .state import AgentState
+from .persistence import BoundedMemorySaver
 from .nodes import (
-    classify_intent,
     handle_faq,
     handle_order_inquiry,
     handle_account,
@@ -22,7 +25,7 @@ from .nodes import (
     handle_general,
     respond,
 )
-from .nodes_handoff_update import check_sentiment, human_handoff
+from .nodes_handoff_update import classify_and_check_sentiment, human_handoff
 
 logger = get_logger(__name__)
 
@@ -31,20 +34,20 @@ logger = get_logger(__name__)
 # Routing Functions
 # ════════════════════════════════════════════════════════════════════════════
 
+# Intent -> handler node (read-only, built once at import)
+INTENT_ROUTES = MappingProxyType({
+    "faq": "handle_faq",
+    "order_inquiry": "handle_order_inquiry",
+    "account": "handle_account",
+    "complaint": "handle_complaint",
+    "handoff_request": "human_handoff",
+    "general": "handle_general",
+})
+
+
 def route_by_intent(state: AgentState) -> str:
     """Route to the appropriate handler based on classified intent."""
-    intent = state.get("intent", "general")
-    
-    routes = {
-        "faq": "handle_faq",
-        "order_inquiry": "handle_order_inquiry",
-        "account": "handle_account",
-        "complaint": "handle_complaint",
-        "handoff_request": "human_handoff",
-        "general": "handle_general",
-    }
-    
-    return routes.get(intent, "handle_general")
+    return INTENT_ROUTES.get(state.get("intent", "general"), "handle_general")
 
 
 def route_after_sentiment(state: AgentState) -> str:
@@ -63,10 +66,10 @@ def build_graph() -> StateGraph:
     Build the CASPAR agent graph.
     
     The flow is:
-    1. classify_intent: Determine what the customer needs
+    1. classify_and_check_sentiment: Determine what the customer needs
+       and analyze their emotion (both LLM calls run concurrently)
     2. handle_*: Process the specific type of request
-    3. check_sentiment: Analyze customer emotion
-    4. respond OR human_handoff: Generate response or escalate
+    3. respond OR human_handoff: Generate response or escalate
     
     Returns:
         StateGraph: The uncompiled graph (call .compile() to use)
@@ -74,22 +77,21 @@ def build_graph() -> StateGraph:
     graph = StateGraph(AgentState)
     
     # Add all nodes
-    graph.add_node("classify_intent", classify_intent)
+    graph.add_node("classify_and_check_sentiment", classify_and_check_sentiment)
     graph.add_node("handle_faq", handle_faq)
     graph.add_node("handle_order_inquiry", handle_order_inquiry)
     graph.add_node("handle_account", handle_account)
     graph.add_node("handle_complaint", handle_complaint)
     graph.add_node("handle_general", handle_general)
-    graph.add_node("check_sentiment", check_sentiment)
     graph.add_node("respond", respond)
     graph.add_node("human_handoff", human_handoff)
     
     # Set entry point
-    graph.set_entry_point("classify_intent")
+    graph.set_entry_point("classify_and_check_sentiment")
     
     # Route by intent after classification
     graph.add_conditional_edges(
-        "classify_intent",
+        "classify_and_check_sentiment",
         route_by_intent,
         {
             "handle_faq": "handle_faq",
@@ -101,20 +103,15 @@ def build_graph() -> StateGraph:
         }
     )
     
-    # All handlers go to sentiment check
+    # Sentiment was scored up front, so handlers route straight on
+    # to respond or escalate
     for handler in ["handle_faq", "handle_order_inquiry", "handle_account", 
                     "handle_complaint", "handle_general"]:
-        graph.add_edge(handler, "check_sentiment")
-    
-    # Sentiment check routes to respond or escalate
-    graph.add_conditional_edges(
-        "check_sentiment",
-        route_after_sentiment,
-        {
-            "respond": "respond",
-            "human_handoff": "human_handoff"
-        }
-    )
+        graph.add_conditional_edges(
+            handler,
+            route_after_sentiment,
+            {"respond": "respond", "human_handoff": "human_handoff"}
+        )
     
     # End nodes
     graph.add_edge("respond", END)
@@ -123,23 +120,99 @@ def build_graph() -> StateGraph:
     return graph
 
 
+@lru_cache(maxsize=1)
+def _compiled_graph():
+    """
+    Build and compile the graph once per process.
+    
+    The compiled graph holds no conversation state of its own, so every
+    agent can share it and only needs its own checkpointer.
+    """
+    return build_graph().compile()
+
+
 async def create_agent(checkpointer=None):
     """
     Create a compiled CASPAR agent ready for use.
     
     Args:
         checkpointer: Optional checkpointer for persistence.
-                     If None, uses in-memory storage.
+                     If None, uses in-memory storage capped at
+                     settings.checkpoint_memory_max_threads conversations.
     
     Returns:
         Compiled graph ready to process messages.
     """
-    graph = build_graph()
-    
     if checkpointer is None:
-        checkpointer = MemorySaver()
+        checkpointer = BoundedMemorySaver()
     
-    return graph.compile(checkpointer=checkpointer)
+    # Reuse the compiled graph and just attach this agent's checkpointer
+    return _compiled_graph().copy(update={"checkpointer": checkpointer})
+
+
+_shared_agent = None
+_shared_agent_lock = asyncio.Lock()
+
+
+async def get_or_create_agent():
+    """
+    Get the process-wide agent with in-memory checkpoints, creating it once.
+    
+    For callers that don't manage their own checkpointer, such as test
+    suites, where every test can share one agent instead of building its
+    own. Conversations are still kept apart by thread_id.
+    """
+    global _shared_agent
+    
+    async with _shared_agent_lock:
+        if _shared_agent is None:
+            _shared_agent = await create_agent()
+    
+    return _shared_agent
+
+
+async def run_agent(agent, state: dict, config: dict) -> dict:
+    """
+    Run the agent for one turn and return the final state.
+    
+    Checkpoints are written according to settings.checkpoint_durability -
+    by default once when the turn finishes, rather than after every node.
+    """
+    return await agent.ainvoke(state, config, durability=settings.checkpoint_durability)
+
+
+async def stream_agent(agent, state: dict, config: dict):
+    """
+    Run the agent, yielding response tokens as the LLM produces them.
+    
+    Yields:
+        ("token", text) for each chunk generated by the respond node, then
+        ("final", state) once the graph finishes. Turns that don't stream
+        (cached answers, human handoff) only produce the final event, so
+        clients should read the reply from the final state.
+    """
+    final_state = None
+    
+    async for mode, payload in agent.astream(
+        state,
+        config,
+        stream_mode=["messages", "values"],
+        durability=settings.checkpoint_durability,
+    ):
+        if mode == "messages":
+            chunk, metadata = payload
+            # Skip the complete AIMessage the node returns - its tokens
+            # have already been sent as chunks
+            if (
+                isinstance(chunk, AIMessageChunk)
+                and metadata.get("langgraph_node") == "respond"
+                and chunk.content
+            ):
+                yield "token", chunk.content
+        else:
+            final_state = payload
+    
+    yield "final", final_state
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -148,7 +221,7 @@ async def create_agent(checkpointer=None):
 # These are optional extensions for workflows requiring human approval
 
 from langgraph.types import interrupt, Command
-from caspar.handoff.approval import needs_approval, get_approval_reason
+from caspar.handoff.approval import approval_reasons
 
 
 async def check_approval_needed(state: AgentState) -> dict:
@@ -157,11 +230,12 @@ async def check_approval_needed(state: AgentState) -> dict:
     
     If approval is needed, interrupts the graph and waits for human decision.
     """
-    if not needs_approval(state):
+    reasons = approval_reasons(state)
+    if not reasons:
         return {"approval_status": "not_required"}
     
     pending_response = state.get("pending_response", "")
-    reason = get_approval_reason(state)
+    reason = "; ".join(reasons)
     
     logger.info(
         "approval_required",
@@ -216,13 +290,12 @@ def build_graph_with_approval() -> StateGraph:
     graph = StateGraph(AgentState)
     
     # Add all standard nodes
-    graph.add_node("classify_intent", classify_intent)
+    graph.add_node("classify_and_check_sentiment", classify_and_check_sentiment)
     graph.add_node("handle_faq", handle_faq)
     graph.add_node("handle_order_inquiry", handle_order_inquiry)
     graph.add_node("handle_account", handle_account)
     graph.add_node("handle_complaint", handle_complaint)
     graph.add_node("handle_general", handle_general)
-    graph.add_node("check_sentiment", check_sentiment)
     graph.add_node("respond", respond)
     graph.add_node("human_handoff", human_handoff)
     
@@ -231,11 +304,11 @@ def build_graph_with_approval() -> StateGraph:
     graph.add_node("send_response", send_response)
     
     # Set entry point
-    graph.set_entry_point("classify_intent")
+    graph.set_entry_point("classify_and_check_sentiment")
     
     # Route by intent
     graph.add_conditional_edges(
-        "classify_intent",
+        "classify_and_check_sentiment",
         route_by_intent,
         {
             "handle_faq": "handle_faq",
@@ -247,17 +320,15 @@ def build_graph_with_approval() -> StateGraph:
         }
     )
     
-    # Handlers -> sentiment check
+    # Sentiment was scored up front, so handlers route straight on
+    # to respond or escalate
     for handler in ["handle_faq", "handle_order_inquiry", "handle_account", 
                     "handle_complaint", "handle_general"]:
-        graph.add_edge(handler, "check_sentiment")
-    
-    # Sentiment -> respond or escalate
-    graph.add_conditional_edges(
-        "check_sentiment",
-        route_after_sentiment,
-        {"respond": "respond", "human_handoff": "human_handoff"}
-    )
+        graph.add_conditional_edges(
+            handler,
+            route_after_sentiment,
+            {"respond": "respond", "human_handoff": "human_handoff"}
+        )
     
     # Respond -> approval check
     graph.add_edge("respond", "check_approval_needed")
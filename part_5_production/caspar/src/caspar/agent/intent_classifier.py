@@ -0,0 +1,198 @@
+# File: src/caspar/agent/intent_classifier.py
+
+"""
+Embedding-based Intent Classifier
+
+Classifies customer messages by comparing their embedding to a handful of
+labeled examples per intent (k-nearest neighbors). One embedding lookup is
+much faster and cheaper than a chat completion, so the LLM is only asked
+about messages the examples don't cover well.
+"""
+
+import asyncio
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from caspar.config import get_logger
+from caspar.knowledge import get_retriever
+
+logger = get_logger(__name__)
+
+
+# Labeled examples per intent - keep these short and varied.
+# Mirrors the guidance in the LLM classification prompt.
+INTENT_EXAMPLES: dict[str, list[str]] = {
+    "faq": [
+        "What is your return policy?",
+        "How long does shipping take?",
+        "Do you offer warranties?",
+        "What payment methods do you accept?",
+        "Do you ship internationally?",
+        "How do I return an item?",
+        "What are your business hours?",
+        "Do you price match?",
+    ],
+    "order_inquiry": [
+        "Where is my order?",
+        "Track order #TF-10001",
+        "What's the status of order 10005?",
+        "When will my package arrive?",
+        "My order hasn't shipped yet",
+        "Can I get the tracking number for my order?",
+        "Has my package been delivered?",
+        "I want to check on my recent order",
+    ],
+    "account": [
+        "I can't log into my account",
+        "How do I reset my password?",
+        "I need to update my email address",
+        "How do I change my account settings?",
+        "What loyalty tier am I?",
+        "Update the shipping address on my profile",
+        "How many reward points do I have?",
+        "I want to delete my account",
+    ],
+    "complaint": [
+        "This product is terrible and broke after one day",
+        "I'm very unhappy with the service I received",
+        "I want a refund, this is unacceptable",
+        "The item arrived damaged",
+        "I've been waiting forever and nobody has helped me",
+        "This is the worst experience I've ever had",
+        "You sent me the wrong item",
+        "I'm frustrated, my laptop keeps crashing",
+    ],
+    "handoff_request": [
+        "I want to talk to a human",
+        "Let me speak to a real person",
+        "Transfer me to a representative",
+        "Can I talk to a manager?",
+        "I need a human agent please",
+        "Get me a real person, not a bot",
+        "Connect me with customer service staff",
+        "Is there a person I can chat with?",
+    ],
+    "general": [
+        "Hello",
+        "Hi there",
+        "Thanks for your help",
+        "Good morning",
+        "What can you do?",
+        "Who are you?",
+        "Okay",
+        "Goodbye",
+    ],
+}
+
+
+class IntentClassifier:
+    """
+    k-nearest-neighbor intent classifier over labeled example embeddings.
+    
+    Confidence is the share of the k nearest examples that agree with
+    the winning label, so callers can fall back to the LLM when the
+    neighbors disagree.
+    """
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        examples: dict[str, list[str]] | None = None,
+        k: int = 5
+    ):
+        """
+        Initialize the classifier.
+        
+        Args:
+            embeddings: Embeddings model used for examples and messages
+            examples: Intent label -> example messages (default: INTENT_EXAMPLES)
+            k: Number of nearest examples that vote on the label
+        """
+        self.embeddings = embeddings
+        self.examples = examples or INTENT_EXAMPLES
+        self.k = k
+        
+        self._labels: list[str] = []
+        self._matrix: np.ndarray | None = None
+        self._fit_lock = threading.Lock()
+    
+    def predict(self, text: str) -> tuple[str, float]:
+        """
+        Classify a message.
+        
+        Returns:
+            (intent, confidence) with confidence between 0 and 1
+        """
+        self._fit()
+        return self._vote(self.embeddings.embed_query(text))
+    
+    async def apredict(self, text: str) -> tuple[str, float]:
+        """Async version of predict() - neither embedding call blocks the loop."""
+        if self._matrix is None:
+            await asyncio.to_thread(self._fit)
+        return self._vote(await self.embeddings.aembed_query(text))
+    
+    def _fit(self) -> None:
+        """
+        Embed the labeled examples on first use (one batched call).
+        
+        The lock keeps concurrent first calls from embedding the examples
+        twice. Labels and matrix are only set once the embedding succeeds,
+        and the matrix last, since it's what marks the classifier ready.
+        """
+        with self._fit_lock:
+            if self._matrix is not None:
+                return
+            
+            texts = []
+            labels = []
+            for label, label_examples in self.examples.items():
+                texts.extend(label_examples)
+                labels.extend([label] * len(label_examples))
+            
+            matrix = _normalize(np.asarray(self.embeddings.embed_documents(texts), dtype=np.float32))
+            self._labels = labels
+            self._matrix = matrix
+        
+        logger.info("intent_classifier_ready", examples=len(texts), labels=len(self.examples))
+    
+    def _vote(self, vector: list[float]) -> tuple[str, float]:
+        """Majority vote among the k most similar examples."""
+        query = _normalize(np.asarray(vector, dtype=np.float32))
+        similarities = self._matrix @ query
+        
+        k = min(self.k, len(self._labels))
+        nearest = np.argpartition(-similarities, k - 1)[:k]
+        
+        votes: dict[str, int] = {}
+        for index in nearest:
+            label = self._labels[index]
+            votes[label] = votes.get(label, 0) + 1
+        
+        # Ties go to the label with the single closest example
+        best = max(votes, key=lambda label: (
+            votes[label],
+            max(similarities[i] for i in nearest if self._labels[i] == label)
+        ))
+        
+        return best, votes[best] / k
+
+
+def _normalize(vectors: np.ndarray) -> np.ndarray:
+    """Scale vectors to unit length so dot products are cosine similarities."""
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return vectors / np.where(norms == 0, 1, norms)
+
+
+# Singleton instance
+_intent_classifier: IntentClassifier | None = None
+
+
+def get_intent_classifier() -> IntentClassifier:
+    """Get or create the global intent classifier (shares the retriever's embeddings)."""
+    global _intent_classifier
+    if _intent_classifier is None:
+        _intent_classifier = IntentClassifier(get_retriever().embeddings)
+    return _intent_classifier
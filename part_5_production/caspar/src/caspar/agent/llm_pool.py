@@ -0,0 +1,104 @@
+# File: src/caspar/agent/llm_pool.py
+
+"""
+Shared LLM Clients
+
+Nodes used to build a new ChatOpenAI client on every call. Clients are
+now created once per (model, temperature) and share one HTTP connection
+pool, so turns reuse warm keep-alive connections instead of paying for
+new TCP/TLS handshakes.
+
+Pooled connections belong to the event loop that opened them, so each
+loop gets its own pool and clients. Callers without a running loop get
+clients that use the OpenAI SDK's default HTTP client.
+"""
+
+import asyncio
+from weakref import WeakKeyDictionary
+
+import httpx
+from langchain_openai import ChatOpenAI
+
+from caspar.config import settings
+
+# (model, temperature, max_retries)
+_LLMKey = tuple[str, float, int]
+
+# Entries go away with their loop; the None key holds loop-less clients
+_http_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient] = WeakKeyDictionary()
+_loop_llms: WeakKeyDictionary[asyncio.AbstractEventLoop, dict[_LLMKey, ChatOpenAI]] = WeakKeyDictionary()
+_loopless_llms: dict[_LLMKey, ChatOpenAI] = {}
+
+
+def _running_loop() -> asyncio.AbstractEventLoop | None:
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:
+        return None
+
+
+def _http_async_client(loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+    """The connection pool shared by every LLM client on this loop."""
+    client = _http_clients.get(loop)
+    if client is None:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=settings.llm_max_connections,
+                max_keepalive_connections=settings.llm_max_keepalive_connections,
+            ),
+            timeout=httpx.Timeout(60.0, connect=5.0),
+        )
+        _http_clients[loop] = client
+    return client
+
+
+def get_llm(model: str, temperature: float, max_retries: int = 2) -> ChatOpenAI:
+    """
+    Get the shared chat client for a model and temperature.
+    
+    Args:
+        model: OpenAI model name (usually settings.default_model)
+        temperature: Sampling temperature
+        max_retries: Retries (with exponential backoff) on rate limits and
+            transient errors
+    
+    Returns:
+        A ChatOpenAI client reused across calls on the same event loop
+    """
+    key = (model, temperature, max_retries)
+    loop = _running_loop()
+    
+    if loop is None:
+        llms = _loopless_llms
+    else:
+        llms = _loop_llms.get(loop)
+        if llms is None:
+            llms = _loop_llms[loop] = {}
+    
+    llm = llms.get(key)
+    if llm is None:
+        llm = ChatOpenAI(
+            model=model,
+            api_key=settings.openai_api_key,
+            temperature=temperature,
+            max_retries=max_retries,
+            **({} if loop is None else {"http_async_client": _http_async_client(loop)}),
+        )
+        llms[key] = llm
+    return llm
+
+
+async def aclose_llm_pool() -> None:
+    """Close the running loop's connection pool and forget its clients."""
+    loop = asyncio.get_running_loop()
+    _loop_llms.pop(loop, None)
+    client = _http_clients.pop(loop, None)
+    if client is not None:
+        await client.aclose()
+
+
+def clear_llm_pool() -> None:
+    """Forget every cached client (for tests). Open pools aren't closed."""
+    _http_clients.clear()
+    _loop_llms.clear()
+    _loopless_llms.clear()
@@ -11,17 +11,21 @@ Each node function:
 """
 
 from datetime import datetime, timezone
+import re
+import uuid
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage, HumanMessage
 
 from caspar.config import settings, get_logger
-from caspar.knowledge import get_retriever
 from caspar.tools import (
     get_order_status,
     get_account_info,
     create_ticket,
 )
+from .intent_classifier import get_intent_classifier
+from .llm_pool import get_llm
+from .plan_cache import cached_retrieve, response_cache_key, get_cached_response, cache_response
+from .state import RECENT_HISTORY_LIMIT, history_entry
 
 logger = get_logger(__name__)
 
@@ -30,6 +34,9 @@ logger = get_logger(__name__)
 # Intent Classification Node
 # ════════════════════════════════════════════════════════════════════════════
 
+VALID_INTENTS = frozenset({"faq", "order_inquiry", "account", "complaint", "handoff_request", "general"})
+
+
 async def classify_intent(state: dict) -> dict:
     """
     Classify the customer's intent from their message.
@@ -42,14 +49,33 @@ async def classify_intent(state: dict) -> dict:
     if not messages:
         return {"intent": "general"}
     
-    # Get the last customer message
-    last_message = messages[-1].content if messages else ""
+    intent = await classify_message(messages[-1].content)
     
-    llm = ChatOpenAI(
-        model=settings.default_model,
-        api_key=settings.openai_api_key,
-        temperature=0  # Deterministic for classification
-    )
+    logger.info("classify_intent_complete", intent=intent)
+    
+    return {
+        "intent": intent,
+        "recent_history": [history_entry(messages[-1])],
+        "last_updated": datetime.now(timezone.utc).isoformat()
+    }
+
+
+async def classify_message(last_message: str) -> str:
+    """
+    Decide which intent category a customer message belongs to.
+    
+    The embedding classifier answers most messages locally; the LLM is
+    only asked when the classifier isn't confident. Shared by
+    classify_intent and the fused classify-and-sentiment node.
+    """
+    if settings.intent_classifier_enabled:
+        intent, confidence = await get_intent_classifier().apredict(last_message)
+        if confidence >= settings.intent_confidence_threshold:
+            logger.debug("intent_classifier_hit", intent=intent, confidence=confidence)
+            return intent
+        logger.debug("intent_classifier_fallback", intent=intent, confidence=confidence)
+    
+    llm = get_llm(settings.default_model, 0)  # Deterministic for classification
     
     classification_prompt = f"""Classify the customer's intent into ONE of these categories:
 
@@ -68,20 +94,15 @@ Customer message: "{last_message}"
 
 Respond with just the category name, nothing else."""
 
-    response = llm.invoke([HumanMessage(content=classification_prompt)])
+    # ainvoke keeps the event loop free while we wait on the API
+    response = await llm.ainvoke([HumanMessage(content=classification_prompt)])
     intent = response.content.strip().lower()
     
     # Validate intent
-    valid_intents = ["faq", "order_inquiry", "account", "complaint", "handoff_request", "general"]
-    if intent not in valid_intents:
+    if intent not in VALID_INTENTS:
         intent = "general"
     
-    logger.info("classify_intent_complete", intent=intent)
-    
-    return {
-        "intent": intent,
-        "last_updated": datetime.now(timezone.utc).isoformat()
-    }
+    return intent
 
 
 # ════════════════════════════════════════════════════════════════════════════
@@ -97,9 +118,8 @@ async def handle_faq(state: dict) -> dict:
     messages = state["messages"]
     last_message = messages[-1].content if messages else ""
     
-    # Retrieve relevant knowledge
-    retriever = get_retriever()
-    docs = retriever.retrieve(last_message)
+    # Retrieve relevant knowledge (paraphrased repeats hit the cache)
+    docs = await cached_retrieve(last_message)
     
     context = "\n\n".join([doc.page_content for doc in docs]) if docs else ""
     
@@ -110,6 +130,40 @@ async def handle_faq(state: dict) -> dict:
     }
 
 
+# Order IDs look like TF-10001, TF10001, "TF 10001", or just the number
+ORDER_ID_PATTERN = re.compile(r"\bTF[-\s#]?(\d{4,6})\b|(?<![\w-])(\d{5,6})\b", re.IGNORECASE)
+
+ORDER_WORDS_PATTERN = re.compile(r"\b(?:order|tracking|package|shipment)\b", re.IGNORECASE)
+
+
+def extract_order_id(message: str) -> str | None:
+    """Find an order ID in a message, normalized to TF-XXXXX."""
+    match = ORDER_ID_PATTERN.search(message)
+    if match is None:
+        return None
+    return f"TF-{match.group(1) or match.group(2)}"
+
+
+def _may_contain_order_id(message: str) -> bool:
+    """True when an order ID might be written in a form the regex misses."""
+    return bool(ORDER_WORDS_PATTERN.search(message)) and any(c.isdigit() for c in message)
+
+
+async def _extract_order_id_with_llm(message: str) -> str:
+    """Ask the LLM for an order ID the regex couldn't find ("NONE" if absent)."""
+    llm = get_llm(settings.default_model, 0)
+    
+    extract_prompt = f"""Extract the order ID from this message if present.
+Order IDs look like: TF-XXXXX (e.g., TF-10001) or just the number (e.g., 10001)
+
+Message: "{message}"
+
+Respond with just the order ID (e.g., TF-10001 or 10001), or "NONE" if not found."""
+
+    response = await llm.ainvoke([HumanMessage(content=extract_prompt)])
+    return response.content.strip()
+
+
 async def handle_order_inquiry(state: dict) -> dict:
     """
     Handle order-related inquiries by looking up order information.
@@ -119,22 +173,14 @@ async def handle_order_inquiry(state: dict) -> dict:
     messages = state["messages"]
     last_message = messages[-1].content if messages else ""
     
-    # Try to extract order ID from message
-    llm = ChatOpenAI(
-        model=settings.default_model,
-        api_key=settings.openai_api_key,
-        temperature=0
-    )
-    
-    extract_prompt = f"""Extract the order ID from this message if present.
-Order IDs look like: TF-XXXXX (e.g., TF-10001) or just the number (e.g., 10001)
-
-Message: "{last_message}"
-
-Respond with just the order ID (e.g., TF-10001 or 10001), or "NONE" if not found."""
-
-    response = llm.invoke([HumanMessage(content=extract_prompt)])
-    order_id = response.content.strip()
+    # Order IDs follow a fixed format, so a regex finds them without an LLM call
+    order_id = extract_order_id(last_message)
+    if order_id is None:
+        # Only unusual formats are worth an LLM call
+        if _may_contain_order_id(last_message):
+            order_id = await _extract_order_id_with_llm(last_message)
+        else:
+            order_id = "NONE"
     
     context = ""
     order_info = None
@@ -262,8 +308,7 @@ async def handle_general(state: dict) -> dict:
     messages = state["messages"]
     last_message = messages[-1].content if messages else ""
     
-    retriever = get_retriever()
-    docs = retriever.retrieve(last_message)
+    docs = await cached_retrieve(last_message)
     
     context = "\n\n".join([doc.page_content for doc in docs]) if docs else ""
     
@@ -278,11 +323,30 @@ async def handle_general(state: dict) -> dict:
 # Response Generation Node
 # ════════════════════════════════════════════════════════════════════════════
 
+# Static - built once at import instead of on every response
+RESPONSE_SYSTEM_PROMPT = """You are CASPAR, a friendly and helpful customer service assistant for TechFlow Solutions.
+
+Your personality:
+- Warm, professional, and empathetic
+- Clear and concise in explanations
+- Always helpful and solution-oriented
+- Acknowledge customer feelings when appropriate
+
+Guidelines:
+- If you have specific information from the context, use it
+- If you don't have enough information, ask clarifying questions
+- Never make up information about orders, accounts, or policies
+- For complaints, acknowledge feelings first, then offer solutions
+- Keep responses conversational, not robotic"""
+
+
 async def respond(state: dict) -> dict:
     """
     Generate the final response to the customer.
     
     Uses all gathered context to craft a helpful, empathetic response.
+    Tokens are streamed from the LLM, so graph.astream(stream_mode="messages")
+    can forward them to the client as they arrive.
     """
     logger.info("respond_start", conversation_id=state.get("conversation_id"))
     
@@ -291,33 +355,21 @@ async def respond(state: dict) -> dict:
     intent = state.get("intent", "general")
     handler_used = state.get("handler_used", "general")
     
-    # Build conversation history for context
-    conversation_history = "\n".join([
-        f"{'Customer' if isinstance(m, HumanMessage) else 'Agent'}: {m.content}"
-        for m in messages[-5:]  # Last 5 messages for context
-    ])
+    # Opening FAQ questions we've answered before skip the LLM entirely
+    cache_key = response_cache_key(state)
+    cached = get_cached_response(cache_key)
+    if cached is not None:
+        logger.info("respond_cache_hit", handler_used=handler_used)
+        return _response_update(cached)
     
-    llm = ChatOpenAI(
-        model=settings.default_model,
-        api_key=settings.openai_api_key,
-        temperature=0.7  # Slightly creative for natural responses
-    )
+    # Conversation history for context, already rendered by earlier nodes
+    recent_history = state.get("recent_history")
+    if recent_history is None:
+        recent_history = [history_entry(m) for m in messages[-RECENT_HISTORY_LIMIT:]]
+    conversation_history = "\n".join(line for _, line in recent_history)
+    
+    llm = get_llm(settings.default_model, 0.7)  # Slightly creative for natural responses
     
-    system_prompt = """You are CASPAR, a friendly and helpful customer service assistant for TechFlow Solutions.
-
-Your personality:
-- Warm, professional, and empathetic
-- Clear and concise in explanations
-- Always helpful and solution-oriented
-- Acknowledge customer feelings when appropriate
-
-Guidelines:
-- If you have specific information from the context, use it
-- If you don't have enough information, ask clarifying questions
-- Never make up information about orders, accounts, or policies
-- For complaints, acknowledge feelings first, then offer solutions
-- Keep responses conversational, not robotic"""
-
     user_prompt = f"""Intent: {intent}
 Handler: {handler_used}
 
@@ -329,17 +381,31 @@ Recent conversation:
 
 Generate a helpful response to the customer's last message. Be natural and conversational."""
 
-    response = llm.invoke([
-        {"role": "system", "content": system_prompt},
-        {"role": "user", "content": user_prompt}
-    ])
+    chunks = [
+        chunk.content
+        async for chunk in llm.astream([
+            {"role": "system", "content": RESPONSE_SYSTEM_PROMPT},
+            {"role": "user", "content": user_prompt}
+        ])
+    ]
     
-    ai_response = response.content
+    ai_response = "".join(chunks)
+    cache_response(cache_key, ai_response)
     
     logger.info("respond_complete", response_length=len(ai_response))
     
+    return _response_update(ai_response)
+
+
+def _response_update(ai_response: str) -> dict:
+    """State update that sends a response and records it in the history."""
+    message = AIMessage(content=ai_response, id=str(uuid.uuid4()))
     return {
-        "messages": [AIMessage(content=ai_response)],
+        "messages": [message],
+        "recent_history": [history_entry(message)],
         "pending_response": ai_response,  # For approval workflow
+        # The handler's context has been used - don't carry it in every
+        # later checkpoint (each turn's handler gathers fresh context)
+        "context": None,
         "last_updated": datetime.now(timezone.utc).isoformat()
     }
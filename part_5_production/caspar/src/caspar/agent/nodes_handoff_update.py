@@ -6,12 +6,14 @@ Updated nodes for human handoff functionality.
 
 These functions extend the agent with handoff support:
 - check_sentiment: Analyze customer emotion and detect escalation needs
+- classify_and_check_sentiment: Intent + sentiment in one concurrent step
 - human_handoff: Handle the transition to a human agent
 """
 
+import asyncio
 from datetime import datetime, timezone
+import uuid
 
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import AIMessage, HumanMessage
 
 from caspar.config import settings, get_logger
@@ -24,6 +26,10 @@ from caspar.handoff import (
     check_sensitive_topics,
 )
 from caspar.tools import get_account_info, create_ticket
+from .llm_pool import get_llm
+from .nodes import classify_message
+from .sentiment_prefilter import prefilter_sentiment
+from .state import history_entry, merge_recent_history
 
 logger = get_logger(__name__)
 
@@ -47,19 +53,83 @@ async def check_sentiment(state: dict) -> dict:
             "last_updated": datetime.now(timezone.utc).isoformat()
         }
     
-    # Get last few messages for context
-    recent_messages = messages[-3:] if len(messages) >= 3 else messages
-    conversation_text = "\n".join([
-        f"{'Customer' if isinstance(m, HumanMessage) else 'Agent'}: {m.content}"
-        for m in recent_messages
-    ])
-    
-    llm = ChatOpenAI(
-        model=settings.default_model,
-        api_key=settings.openai_api_key,
-        temperature=0
+    sentiment_score, frustration_level = await analyze_sentiment(
+        messages, state.get("recent_history")
     )
     
+    return _sentiment_result(state, sentiment_score, frustration_level)
+
+
+async def classify_and_check_sentiment(state: dict) -> dict:
+    """
+    Classify intent and analyze sentiment in a single node.
+    
+    Both LLM calls only read the conversation so far, so they run
+    concurrently - each turn waits for one round-trip instead of two.
+    The handlers then route straight on using the precomputed sentiment.
+    """
+    logger.info("classify_and_check_sentiment_start", conversation_id=state.get("conversation_id"))
+    
+    messages = state["messages"]
+    if not messages:
+        return {
+            "intent": "general",
+            "sentiment_score": 0.0,
+            "frustration_level": "low",
+            "last_updated": datetime.now(timezone.utc).isoformat()
+        }
+    
+    entry = history_entry(messages[-1])
+    recent_history = merge_recent_history(state.get("recent_history"), [entry])
+    
+    intent, (sentiment_score, frustration_level) = await asyncio.gather(
+        classify_message(messages[-1].content),
+        analyze_sentiment(messages, recent_history),
+    )
+    
+    logger.info("classify_intent_complete", intent=intent)
+    
+    return {
+        "intent": intent,
+        "recent_history": [entry],
+        **_sentiment_result(state, sentiment_score, frustration_level),
+    }
+
+
+async def analyze_sentiment(
+    messages: list,
+    recent_history: list | None = None
+) -> tuple[float, str]:
+    """
+    Ask the LLM for the customer's sentiment score and frustration level.
+    
+    Clearly neutral or positive customer messages are scored lexically
+    and never reach the LLM.
+    
+    Args:
+        messages: Conversation messages
+        recent_history: Pre-rendered history entries from state, if available
+    
+    Returns:
+        (sentiment_score, frustration_level)
+    """
+    if settings.sentiment_prefilter_enabled:
+        last_customer_message = next(
+            (m.content for m in reversed(messages) if isinstance(m, HumanMessage)),
+            ""
+        )
+        score = prefilter_sentiment(last_customer_message)
+        if score is not None:
+            logger.debug("sentiment_prefilter_hit", sentiment_score=score)
+            return score, "low"
+    
+    # Last few messages for context, already rendered as "Speaker: text"
+    if recent_history is None:
+        recent_history = [history_entry(m) for m in messages[-3:]]
+    conversation_text = "\n".join(line for _, line in recent_history[-3:])
+    
+    llm = get_llm(settings.default_model, 0)
+    
     sentiment_prompt = f"""Analyze the customer's emotional state in this conversation.
 
 Conversation:
@@ -69,7 +139,7 @@ Provide your analysis in this exact format:
 SENTIMENT: [number from -1.0 to 1.0, where -1 is very negative, 0 is neutral, 1 is very positive]
 FRUSTRATION: [low, medium, or high]"""
 
-    response = llm.invoke([HumanMessage(content=sentiment_prompt)])
+    response = await llm.ainvoke([HumanMessage(content=sentiment_prompt)])
     
     # Parse response
     sentiment_score = 0.0
@@ -87,6 +157,13 @@ FRUSTRATION: [low, medium, or high]"""
             if level in ["low", "medium", "high"]:
                 frustration_level = level
     
+    return sentiment_score, frustration_level
+
+
+def _sentiment_result(state: dict, sentiment_score: float, frustration_level: str) -> dict:
+    """Build the state update for a sentiment analysis, including escalation checks."""
+    messages = state["messages"]
+    
     result = {
         "sentiment_score": sentiment_score,
         "frustration_level": frustration_level,
@@ -131,10 +208,13 @@ async def human_handoff(state: dict) -> dict:
     customer_id = state.get("customer_id") or "UNKNOWN"
     conversation_id = state.get("conversation_id")
     
+    # Tool calls go through worker threads - they're in-memory here, but
+    # become network calls once backed by a real CRM/ticketing system
+    
     # Get customer info for context
     customer_info = None
     if customer_id != "UNKNOWN":
-        account_result = get_account_info(customer_id)
+        account_result = await asyncio.to_thread(get_account_info, customer_id)
         if account_result["found"]:
             customer_info = account_result["account"]
     
@@ -142,31 +222,36 @@ async def human_handoff(state: dict) -> dict:
     customer_tier = customer_info.get("loyalty_tier") if customer_info else None
     escalation_result = check_escalation_triggers(state, customer_tier)
     
-    # Create ticket for tracking
-    ticket_result = create_ticket(
-        customer_id=customer_id,
-        category="general",
-        subject="Human Agent Requested",
-        description=escalation_result.reason,
-        priority=escalation_result.priority,
-        conversation_id=conversation_id,
-    )
-    
-    # Add to handoff queue
+    # Create the tracking ticket and the queue entry concurrently,
+    # then link them once both exist
     queue = get_handoff_queue()
-    handoff_request = queue.add(
-        conversation_id=conversation_id,
-        customer_id=customer_id,
-        priority=escalation_result.priority,
-        triggers=[t.value for t in escalation_result.triggers],
-        reason=escalation_result.reason,
-        ticket_id=ticket_result["ticket"]["ticket_id"],
+    ticket_result, handoff_request = await asyncio.gather(
+        asyncio.to_thread(
+            create_ticket,
+            customer_id=customer_id,
+            category="general",
+            subject="Human Agent Requested",
+            description=escalation_result.reason,
+            priority=escalation_result.priority,
+            conversation_id=conversation_id,
+        ),
+        asyncio.to_thread(
+            queue.add,
+            conversation_id=conversation_id,
+            customer_id=customer_id,
+            priority=escalation_result.priority,
+            triggers=escalation_result.trigger_values(),
+            reason=escalation_result.reason,
+        ),
     )
+    if handoff_request.ticket_id is None:
+        handoff_request.ticket_id = ticket_result["ticket"]["ticket_id"]
+        await asyncio.to_thread(queue.link_ticket, handoff_request.request_id, handoff_request.ticket_id)
     
     # Package context for human agent
     state_with_triggers = {
         **state,
-        "escalation_triggers": [t.value for t in escalation_result.triggers],
+        "escalation_triggers": escalation_result.trigger_values(),
     }
     context = package_context_for_agent(
         state=state_with_triggers,
@@ -174,15 +259,15 @@ async def human_handoff(state: dict) -> dict:
         customer_info=customer_info,
     )
     
-    # Notify available agents
+    # Notify available agents - sending carries on in the background
     notifications = notify_available_agents(handoff_request, context)
     
-    # Log the full context (in production, this would go to the agent dashboard)
-    context_display = format_context_for_display(context)
-    logger.info("handoff_context_prepared", context_length=len(context_display))
+    # Render the context for the log
+    # (in production, the display would go to the agent dashboard)
+    context_display = await asyncio.to_thread(format_context_for_display, context)
     
     # Build customer-facing message
-    position = queue.get_queue_position(handoff_request.request_id)
+    position = await asyncio.to_thread(queue.get_queue_position, handoff_request.request_id)
     wait_time = handoff_request.estimated_wait or 5
     
     handoff_message = _build_handoff_message(
@@ -196,11 +281,15 @@ async def human_handoff(state: dict) -> dict:
         "human_handoff_complete",
         request_id=handoff_request.request_id,
         ticket_id=ticket_result["ticket"]["ticket_id"],
-        agents_notified=len(notifications)
+        agents_notified=len(notifications),
+        context_length=len(context_display)
     )
     
+    message = AIMessage(content=handoff_message, id=str(uuid.uuid4()))
+    
     return {
-        "messages": [AIMessage(content=handoff_message)],
+        "messages": [message],
+        "recent_history": [history_entry(message)],
         "needs_escalation": True,
         "escalation_reason": escalation_result.reason,
         "ticket_id": ticket_result["ticket"]["ticket_id"],
@@ -208,6 +297,30 @@ async def human_handoff(state: dict) -> dict:
     }
 
 
+# Customer-facing handoff message, formatted once per escalation
+_HANDOFF_TEMPLATE = """I understand you'd like to speak with a human agent, and I've arranged that for you.
+
+**Your Reference Number: {ticket_id}**
+
+{priority_line}
+
+{position_line}Estimated wait time: approximately {wait_time} minutes.
+
+While you wait:
+• You don't need to stay on this chat - we'll reach out to you
+• You can reference your ticket number in any follow-up
+• Our team has the full context of our conversation
+
+Is there anything else I can help you with while you wait?"""
+
+_PRIORITY_LINES = {
+    "urgent": "I've flagged this as urgent, and a team member will be with you very shortly.",
+    "high": "I've marked this as high priority. A team member will be with you soon.",
+    "medium": "A team member will be with you as soon as possible.",
+    "low": "A team member will reach out to help you.",
+}
+
+
 def _build_handoff_message(
     ticket_id: str,
     position: int,
@@ -215,35 +328,9 @@ def _build_handoff_message(
     priority: str,
 ) -> str:
     """Build the customer-facing handoff message."""
-    
-    priority_messages = {
-        "urgent": "I've flagged this as urgent, and a team member will be with you very shortly.",
-        "high": "I've marked this as high priority. A team member will be with you soon.",
-        "medium": "A team member will be with you as soon as possible.",
-        "low": "A team member will reach out to help you.",
-    }
-    
-    message_parts = [
-        "I understand you'd like to speak with a human agent, and I've arranged that for you.",
-        "",
-        f"**Your Reference Number: {ticket_id}**",
-        "",
-        priority_messages.get(priority, priority_messages["medium"]),
-        "",
-    ]
-    
-    if position > 0:
-        message_parts.append(f"You're currently #{position} in our queue.")
-    
-    message_parts.extend([
-        f"Estimated wait time: approximately {wait_time} minutes.",
-        "",
-        "While you wait:",
-        "• You don't need to stay on this chat - we'll reach out to you",
-        "• You can reference your ticket number in any follow-up",
-        "• Our team has the full context of our conversation",
-        "",
-        "Is there anything else I can help you with while you wait?",
-    ])
-    
-    return "\n".join(message_parts)
+    return _HANDOFF_TEMPLATE.format_map({
+        "ticket_id": ticket_id,
+        "priority_line": _PRIORITY_LINES.get(priority, _PRIORITY_LINES["medium"]),
+        "position_line": f"You're currently #{position} in our queue.\n" if position > 0 else "",
+        "wait_time": wait_time,
+    })
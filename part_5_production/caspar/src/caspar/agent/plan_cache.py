@@ -0,0 +1,122 @@
+# File: src/caspar/agent/plan_cache.py
+
+"""
+Plan and Response Caching
+
+Customers ask the same handful of questions in slightly different words.
+This module canonicalizes a question down to its content words so those
+paraphrases share one cache entry, then caches:
+
+- knowledge base retrievals, keyed by the canonical question
+- final responses, keyed by (intent, handler, canonical question, context)
+
+Only FAQ-style handlers are cached. Complaints, accounts and orders depend
+on who is asking, so caching them could leak one customer's details to
+another.
+"""
+
+import hashlib
+import re
+
+from langchain_core.documents import Document
+
+from caspar.config import settings, get_logger
+from caspar.knowledge import get_retriever
+from caspar.knowledge.ttl_cache import TTLCache
+
+logger = get_logger(__name__)
+
+
+# Handlers whose responses only depend on the question and the knowledge base
+CACHEABLE_HANDLERS = {"faq", "general"}
+
+# Words that don't change what is being asked about
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "been", "am",
+    "do", "does", "did", "can", "could", "would", "will", "should", "may",
+    "i", "me", "my", "we", "our", "you", "your", "it", "its", "this", "that",
+    "what", "whats", "how", "when", "where", "which", "who", "why",
+    "of", "to", "for", "in", "on", "at", "by", "with", "about", "from",
+    "and", "or", "if", "so", "any", "there", "please", "hi", "hello", "hey",
+    "tell", "know", "want", "like", "just", "thanks", "thank",
+}
+
+
+def canonicalize(text: str) -> str:
+    """
+    Reduce a question to its sorted content words.
+    
+    "What's your return policy?" and "tell me about the return policy"
+    both become "policy return".
+    """
+    words = re.findall(r"[a-z0-9]+", text.lower().replace("'", ""))
+    return " ".join(sorted({word for word in words if word not in STOPWORDS}))
+
+
+_retrieval_cache = TTLCache(settings.plan_cache_max_size, settings.plan_cache_ttl_seconds)
+_response_cache = TTLCache(settings.plan_cache_max_size, settings.plan_cache_ttl_seconds)
+
+
+async def cached_retrieve(query: str) -> list[Document]:
+    """Retrieve from the knowledge base, reusing results for paraphrased questions."""
+    key = canonicalize(query)
+    
+    if settings.plan_cache_enabled and key:
+        docs = _retrieval_cache.get(key)
+        if docs is not None:
+            logger.debug("retrieval_cache_hit", key=key)
+            return list(docs)
+    
+    docs = await get_retriever().aretrieve(query)
+    
+    if settings.plan_cache_enabled and key:
+        _retrieval_cache.set(key, tuple(docs))
+    
+    return docs
+
+
+def response_cache_key(state: dict) -> tuple | None:
+    """
+    Cache key for the response to this turn, or None if it shouldn't be cached.
+    
+    The context hash is part of the key, so a knowledge base update
+    naturally stops old answers from being served.
+    """
+    if not settings.plan_cache_enabled:
+        return None
+    
+    handler_used = state.get("handler_used") or "general"
+    if handler_used not in CACHEABLE_HANDLERS or state.get("intent") in {"complaint", "account"}:
+        return None
+    
+    # The response prompt includes the recent conversation, so only an
+    # opening question is answered the same way every time
+    messages = state.get("messages") or []
+    if len(messages) != 1:
+        return None
+    
+    question = canonicalize(messages[0].content)
+    if not question:
+        return None
+    
+    context_hash = hashlib.sha256((state.get("context") or "").encode("utf-8")).hexdigest()
+    return (state.get("intent"), handler_used, question, context_hash)
+
+
+def get_cached_response(key: tuple | None) -> str | None:
+    """Look up a cached response."""
+    if key is None:
+        return None
+    return _response_cache.get(key)
+
+
+def cache_response(key: tuple | None, response: str) -> None:
+    """Store a response for later turns asking the same question."""
+    if key is not None:
+        _response_cache.set(key, response)
+
+
+def clear_plan_cache() -> None:
+    """Drop all cached retrievals and responses (e.g. after a KB rebuild)."""
+    _retrieval_cache.clear()
+    _response_cache.clear()
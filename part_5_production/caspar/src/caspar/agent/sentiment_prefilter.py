@@ -0,0 +1,94 @@
+# File: src/caspar/agent/sentiment_prefilter.py
+
+"""
+Lexical Sentiment Pre-filter
+
+Most customer messages are plainly neutral or positive, and asking the LLM
+to confirm that costs a full round-trip. This module scores a message
+lexically and only hands it to the LLM when there is some sign of trouble.
+
+Uses VADER when the optional `vaderSentiment` package is installed, and a
+small built-in lexicon otherwise.
+"""
+
+import math
+import re
+
+try:
+    from vaderSentiment.vaderSentiment import SentimentIntensityAnalyzer
+    _vader = SentimentIntensityAnalyzer()
+except ImportError:
+    _vader = None
+
+
+# Compound scores at or below this go to the LLM
+NEGATIVE_THRESHOLD = -0.2
+
+# Words that mean the customer may be upset, whatever the overall score
+FRUSTRATION_KEYWORDS = [
+    "angry", "furious", "upset", "frustrated", "frustrating", "annoyed",
+    "terrible", "horrible", "awful", "worst", "useless", "ridiculous",
+    "unacceptable", "disappointed", "disappointing", "hate", "garbage",
+    "refund", "complaint", "lawsuit", "lawyer", "scam", "never again",
+    "waste", "broken", "damaged", "still waiting", "nobody",
+]
+
+_FRUSTRATION_PATTERN = re.compile(
+    r"\b(?:" + "|".join(re.escape(keyword) for keyword in FRUSTRATION_KEYWORDS) + r")"
+)
+
+# Fallback lexicon - word -> valence, roughly on VADER's -4..4 scale
+_LEXICON = {
+    "thanks": 1.9, "thank": 1.5, "great": 3.1, "good": 1.9, "love": 3.2,
+    "awesome": 3.1, "perfect": 2.7, "happy": 2.7, "helpful": 1.9, "nice": 1.8,
+    "excellent": 2.7, "appreciate": 2.3, "glad": 2.0, "fine": 0.8, "please": 1.3,
+    "bad": -2.5, "poor": -2.1, "wrong": -2.1, "problem": -1.7, "issue": -1.0,
+    "slow": -1.0, "late": -1.2, "missing": -1.2, "lost": -1.3, "confused": -1.3,
+    "unhappy": -1.8, "sad": -2.1, "fail": -2.3, "failed": -2.3, "error": -1.4,
+}
+_NEGATIONS = {"not", "no", "never", "dont", "doesnt", "didnt", "isnt", "wasnt", "cant", "wont"}
+
+
+def prefilter_sentiment(message: str) -> float | None:
+    """
+    Score a message if it is clearly not negative.
+    
+    Returns:
+        A sentiment score (-1.0 to 1.0) when the message is safe to treat as
+        low frustration, or None when the LLM should take a closer look.
+    """
+    text = message.lower()
+    
+    if _FRUSTRATION_PATTERN.search(text) or "!!" in message or _shouting(message):
+        return None
+    
+    compound = _vader.polarity_scores(message)["compound"] if _vader else _lexicon_score(text)
+    
+    if compound <= NEGATIVE_THRESHOLD:
+        return None
+    
+    return round(compound, 2)
+
+
+def _shouting(message: str) -> bool:
+    """True for messages written mostly in capitals."""
+    letters = [c for c in message if c.isalpha()]
+    return len(letters) >= 12 and sum(c.isupper() for c in letters) / len(letters) > 0.7
+
+
+def _lexicon_score(text: str) -> float:
+    """VADER-style compound score from the fallback lexicon."""
+    words = re.findall(r"[a-z]+", text.replace("'", ""))
+    
+    total = 0.0
+    for i, word in enumerate(words):
+        valence = _LEXICON.get(word)
+        if valence is None:
+            continue
+        # "not happy", "never good" - flip when a negation comes just before
+        if any(w in _NEGATIONS for w in words[max(0, i - 3):i]):
+            valence = -valence * 0.74
+        total += valence
+    
+    # Same normalization VADER uses to squash the sum into -1..1
+    return total / math.sqrt(total * total + 15)
@@ -10,11 +10,36 @@ Every node reads from and writes to this shared state.
 
 from typing import Annotated, Literal
 from typing_extensions import TypedDict
+from langchain_core.messages import BaseMessage, HumanMessage
 from langgraph.graph.message import add_messages
 from pydantic import BaseModel, Field
 from datetime import datetime, timezone
 
 
+# How many "Customer: ..." / "Agent: ..." lines respond puts in its prompt
+RECENT_HISTORY_LIMIT = 5
+
+
+def history_entry(message: BaseMessage) -> tuple[str, str]:
+    """Render a message as a (message_id, "Speaker: text") history entry."""
+    speaker = "Customer" if isinstance(message, HumanMessage) else "Agent"
+    return (message.id, f"{speaker}: {message.content}")
+
+
+def merge_recent_history(left: list | None, right: list | None) -> list:
+    """
+    Reducer for recent_history: append new entries, keep the last few.
+    
+    Entries are keyed by message ID, so re-sending state that already
+    contains them (as the API does each turn) doesn't duplicate lines.
+    """
+    merged = {message_id: line for message_id, line in (left or [])}
+    for message_id, line in right or []:
+        merged.pop(message_id, None)
+        merged[message_id] = line
+    return list(merged.items())[-RECENT_HISTORY_LIMIT:]
+
+
 # Message handling - LangGraph's add_messages reducer handles conversation history
 class AgentState(TypedDict):
     """
@@ -27,6 +52,10 @@ class AgentState(TypedDict):
     # Conversation messages - uses add_messages reducer to append new messages
     messages: Annotated[list, add_messages]
     
+    # Last few messages pre-rendered for prompts, kept up to date by the
+    # nodes so respond doesn't re-render the history every turn
+    recent_history: Annotated[list, merge_recent_history]
+    
     # Customer identification
     customer_id: str | None
     conversation_id: str
@@ -41,6 +70,8 @@ class AgentState(TypedDict):
     
     # Context from tools and knowledge base
     retrieved_context: str | None  # RAG results
+    context: str | None  # Information gathered by the handler for respond
+    handler_used: str | None  # Which handler ran this turn
     order_info: dict | None  # From order lookup tool
     ticket_id: str | None  # If a support ticket was created
     
@@ -69,6 +100,28 @@ class ConversationMetadata(BaseModel):
     resolution_status: Literal["resolved", "escalated", "abandoned", "ongoing"] = "ongoing"
 
 
+# Defaults for every field of a new conversation's state. Mutable fields
+# (the message lists) are created fresh per conversation below.
+_INITIAL_STATE_TEMPLATE = {
+    "customer_id": None,
+    "conversation_id": None,
+    "intent": None,
+    "confidence": None,
+    "sentiment_score": None,
+    "frustration_level": None,
+    "retrieved_context": None,
+    "context": None,
+    "handler_used": None,
+    "order_info": None,
+    "ticket_id": None,
+    "needs_escalation": False,
+    "escalation_reason": None,
+    "turn_count": 0,
+    "created_at": None,
+    "last_updated": None,
+}
+
+
 def create_initial_state(
     conversation_id: str,
     customer_id: str | None = None
@@ -85,20 +138,10 @@ def create_initial_state(
     """
     now = datetime.now(timezone.utc).isoformat()
     
-    return AgentState(
-        messages=[],
-        customer_id=customer_id,
-        conversation_id=conversation_id,
-        intent=None,
-        confidence=None,
-        sentiment_score=None,
-        frustration_level=None,
-        retrieved_context=None,
-        order_info=None,
-        ticket_id=None,
-        needs_escalation=False,
-        escalation_reason=None,
-        turn_count=0,
-        created_at=now,
-        last_updated=now,
-    )
+    state = _INITIAL_STATE_TEMPLATE.copy()
+    state["messages"] = []
+    state["recent_history"] = []
+    state["customer_id"] = customer_id
+    state["conversation_id"] = conversation_id
+    state["created_at"] = state["last_updated"] = now
+    return state
@@ -0,0 +1,78 @@
+# File: src/caspar/agent/warmup.py
+
+"""
+Startup Warm-up
+
+The retriever, intent classifier, LLM clients and tools are all created
+lazily, so without warm-up the first customer of each worker pays for
+loading the vector store, embedding the classifier examples, opening
+connections to OpenAI and generating the tools' data. Calling warmup()
+at startup moves that work off the request path.
+"""
+
+import asyncio
+import time
+
+from langchain_core.messages import HumanMessage
+
+from caspar.config import settings, get_logger
+from caspar.knowledge import get_retriever
+from caspar.tools.accounts import get_account_tool
+from caspar.tools.orders import get_order_tool
+from caspar.tools.tickets import get_ticket_tool
+from .intent_classifier import get_intent_classifier
+from .llm_pool import get_llm
+
+logger = get_logger(__name__)
+
+
+async def warmup() -> None:
+    """
+    Initialize shared resources before serving traffic.
+    
+    Every step is best-effort: a failure is logged and the resource is
+    simply initialized on first use instead.
+    """
+    start = time.perf_counter()
+    
+    steps = {
+        "retriever": _warm_retriever(),
+        "intent_classifier": _warm_intent_classifier(),
+        "llm": _warm_llm(),
+        "tools": _warm_tools(),
+    }
+    results = await asyncio.gather(*steps.values(), return_exceptions=True)
+    
+    for name, result in zip(steps, results):
+        if isinstance(result, Exception):
+            logger.warning("warmup_step_failed", step=name, error=str(result))
+    
+    logger.info("warmup_complete", duration_ms=round((time.perf_counter() - start) * 1000))
+
+
+async def _warm_retriever() -> None:
+    """Open the vector store (building it if needed)."""
+    await asyncio.to_thread(get_retriever().initialize)
+
+
+async def _warm_intent_classifier() -> None:
+    """Embed the classifier examples; also opens the embeddings connection."""
+    if settings.intent_classifier_enabled:
+        await get_intent_classifier().apredict("hello")
+
+
+async def _warm_llm() -> None:
+    """Create the shared clients and open a keep-alive connection."""
+    get_llm(settings.default_model, 0.7)
+    llm = get_llm(settings.default_model, 0)
+    await llm.bind(max_tokens=1).ainvoke([HumanMessage(content="ping")])
+
+
+async def _warm_tools() -> None:
+    """Create the tool singletons (and their mock data) in a worker thread."""
+    def create_tools() -> None:
+        get_account_tool()
+        get_order_tool()
+        get_ticket_tool()
+    
+    await asyncio.to_thread(create_tools)
@@ -1,4 +1,11 @@
-"""CASPAR API module."""
+"""
+CASPAR API module.
+
+Run with uvicorn, e.g. `uvicorn caspar.api.main:app`. uvicorn[standard] is
+a dependency, so uvicorn's default `--loop auto --http auto` picks uvloop
+and httptools (faster than the asyncio loop and h11 parser) wherever they
+are available, and quietly falls back to the standard ones elsewhere.
+"""
 
 from caspar.api.main import app
 from caspar.api.metrics import metrics, track_latency
@@ -0,0 +1,218 @@
+# Save as: src/caspar/api/conversations.py
+
+"""
+Conversation storage for the CASPAR API.
+
+Each conversation record is {"customer_id": ..., "state": AgentState}.
+With REDIS_URL set, records live in Redis so every API worker sees every
+conversation; otherwise they stay in this process's memory. Either way,
+idle conversations expire, so clients that never end a conversation
+can't grow memory without bound.
+"""
+
+import asyncio
+from collections import OrderedDict
+from contextlib import asynccontextmanager, suppress
+import time
+
+from langchain_core.messages import messages_from_dict, messages_to_dict
+
+from caspar.config import settings, get_logger
+
+try:
+    import orjson
+    import redis.asyncio as aioredis
+except ImportError:
+    aioredis = None
+
+logger = get_logger(__name__)
+
+
+class InMemoryConversationStore:
+    """
+    Keeps conversations in this process's memory - only visible to this process.
+    
+    Holds at most max_conversations, dropping the least recently used when
+    full, and forgets conversations idle for longer than ttl_seconds.
+    """
+    
+    def __init__(self, max_conversations: int | None = None, ttl_seconds: float | None = None):
+        self.max_conversations = max_conversations or settings.max_conversations
+        self.ttl_seconds = ttl_seconds or settings.conversation_ttl_seconds
+        # conversation_id -> (record, last access time), oldest first
+        self._conversations: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+    
+    async def get(self, conversation_id: str) -> dict | None:
+        """Return the conversation record, or None if it doesn't exist."""
+        entry = self._conversations.get(conversation_id)
+        if entry is None:
+            return None
+        
+        conversation, last_access = entry
+        now = time.monotonic()
+        if now - last_access > self.ttl_seconds:
+            del self._conversations[conversation_id]
+            return None
+        
+        self._conversations[conversation_id] = (conversation, now)
+        self._conversations.move_to_end(conversation_id)
+        return conversation
+    
+    async def set(self, conversation_id: str, conversation: dict) -> None:
+        """Store (or replace) a conversation record."""
+        self._conversations[conversation_id] = (conversation, time.monotonic())
+        self._conversations.move_to_end(conversation_id)
+        
+        while len(self._conversations) > self.max_conversations:
+            evicted_id, _ = self._conversations.popitem(last=False)
+            logger.debug("conversation_evicted", conversation_id=evicted_id)
+    
+    async def delete(self, conversation_id: str) -> bool:
+        """Remove a conversation. Returns False if it didn't exist."""
+        return self._conversations.pop(conversation_id, None) is not None
+    
+    def evict_expired(self) -> int:
+        """Drop every conversation idle for longer than the TTL."""
+        cutoff = time.monotonic() - self.ttl_seconds
+        evicted = 0
+        
+        # Oldest first, so stop at the first conversation still in use
+        while self._conversations:
+            conversation_id, (_, last_access) = next(iter(self._conversations.items()))
+            if last_access > cutoff:
+                break
+            del self._conversations[conversation_id]
+            evicted += 1
+        
+        return evicted
+    
+    def __len__(self) -> int:
+        return len(self._conversations)
+    
+    async def close(self) -> None:
+        self._conversations.clear()
+
+
+class RedisConversationStore:
+    """
+    Keeps each conversation in a Redis hash shared by all API workers.
+    
+    Hash fields are customer_id and the orjson-encoded state. Every write
+    refreshes the key's TTL, so abandoned conversations expire on their own.
+    """
+    
+    KEY_PREFIX = "conv:"
+    
+    def __init__(self, client, ttl_seconds: int):
+        self._client = client
+        self.ttl_seconds = ttl_seconds
+    
+    def _key(self, conversation_id: str) -> str:
+        return f"{self.KEY_PREFIX}{conversation_id}"
+    
+    async def get(self, conversation_id: str) -> dict | None:
+        """Return the conversation record, or None if it doesn't exist."""
+        data = await self._client.hgetall(self._key(conversation_id))
+        if not data:
+            return None
+        
+        return {
+            "customer_id": data[b"customer_id"].decode("utf-8"),
+            "state": _load_state(data[b"state"]),
+        }
+    
+    async def set(self, conversation_id: str, conversation: dict) -> None:
+        """Store (or replace) a conversation record and refresh its TTL."""
+        key = self._key(conversation_id)
+        
+        async with self._client.pipeline(transaction=True) as pipe:
+            pipe.hset(key, mapping={
+                "customer_id": conversation["customer_id"],
+                "state": _dump_state(conversation["state"]),
+            })
+            pipe.expire(key, self.ttl_seconds)
+            await pipe.execute()
+    
+    async def delete(self, conversation_id: str) -> bool:
+        """Remove a conversation. Returns False if it didn't exist."""
+        return await self._client.delete(self._key(conversation_id)) > 0
+    
+    async def close(self) -> None:
+        await self._client.aclose()
+
+
+def _dump_state(state: dict) -> bytes:
+    """Encode an AgentState; messages go through LangChain's dict format."""
+    return orjson.dumps(
+        {**state, "messages": messages_to_dict(state.get("messages", []))},
+        default=str,
+    )
+
+
+def _load_state(data: bytes) -> dict:
+    """Decode a state written by _dump_state."""
+    state = orjson.loads(data)
+    state["messages"] = messages_from_dict(state["messages"])
+    return state
+
+
+@asynccontextmanager
+async def create_conversation_store():
+    """
+    Create the conversation store for the API's lifetime.
+    
+    Uses Redis when REDIS_URL is set and reachable, falling back to
+    in-memory storage like the checkpointer does.
+    
+    Usage:
+        async with create_conversation_store() as conversations:
+            record = await conversations.get(conversation_id)
+    """
+    store = None
+    
+    if settings.redis_url:
+        if aioredis is None:
+            logger.warning(
+                "redis_unavailable",
+                message="REDIS_URL is set but the redis package isn't installed"
+            )
+        else:
+            client = aioredis.Redis.from_url(
+                settings.redis_url,
+                max_connections=settings.redis_max_connections,
+            )
+            try:
+                await client.ping()
+                store = RedisConversationStore(client, settings.conversation_ttl_seconds)
+                logger.info("conversation_store_ready", backend="redis")
+            except Exception as e:
+                logger.warning("redis_connection_failed", error=str(e))
+                await client.aclose()
+    
+    sweeper = None
+    if store is None:
+        store = InMemoryConversationStore()
+        sweeper = asyncio.create_task(_sweep_expired(store))
+        logger.info(
+            "conversation_store_ready",
+            backend="memory",
+            max_conversations=store.max_conversations
+        )
+    
+    try:
+        yield store
+    finally:
+        if sweeper is not None:
+            sweeper.cancel()
+            with suppress(asyncio.CancelledError):
+                await sweeper
+        await store.close()
+
+
+async def _sweep_expired(store: InMemoryConversationStore, interval_seconds: float = 60) -> None:
+    """Periodically drop expired conversations nobody is reading any more."""
+    while True:
+        await asyncio.sleep(interval_seconds)
+        evicted = store.evict_expired()
+        if evicted:
+            logger.info("expired_conversations_evicted", count=evicted)
@@ -6,21 +6,34 @@ CASPAR API - Production-ready FastAPI application.
 Provides REST endpoints for the customer service agent.
 """
 
-from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from fastapi import FastAPI, HTTPException, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
+from langchain_core.messages import HumanMessage
 from pydantic import BaseModel, Field
-import uuid
+import json
+import secrets
 
 from caspar.config import settings, get_logger
-from caspar.agent import create_checkpointer_context, create_agent, create_initial_state
+from caspar.agent import (
+    create_checkpointer_context,
+    create_agent,
+    create_initial_state,
+    run_agent,
+    stream_agent,
+)
+from caspar.agent.llm_pool import aclose_llm_pool
+from caspar.agent.warmup import warmup
+from caspar.api.conversations import InMemoryConversationStore, create_conversation_store
 from caspar.knowledge import get_retriever
 
 logger = get_logger(__name__)
 
-# Store active conversations in memory
-# Note: For horizontal scaling, use Redis instead
-conversations: dict = {}
+# Active conversations - replaced on startup by a Redis-backed store
+# (shared by all workers) when REDIS_URL is set
+conversations = InMemoryConversationStore()
 
 # The agent instance (initialized on startup)
 agent = None
@@ -38,17 +51,32 @@ async def lifespan(app: FastAPI):
     The checkpointer context manager MUST wrap the yield to keep
     the database connection open during the server's lifetime.
     """
-    global agent
+    global agent, conversations
     
     logger.info("starting_caspar_api", version="1.0.0")
     
-    # Step 1: Initialize knowledge base (validates it's ready)
-    retriever = get_retriever()
-    logger.info("knowledge_base_ready")
-    
-    # Step 2: Create checkpointer context
-    # The 'async with' keeps the database connection open
-    async with create_checkpointer_context() as checkpointer:
+    # Startup steps don't depend on each other, so they run concurrently -
+    # startup takes as long as the slowest one rather than all of them.
+    # The exit stack keeps the database connections open until shutdown.
+    async with AsyncExitStack() as stack:
+        # Registered first so the LLM connection pool closes last
+        stack.push_async_callback(aclose_llm_pool)
+        
+        async with asyncio.TaskGroup() as startup:
+            # Step 1: Warm up the knowledge base, intent classifier and LLM
+            # clients so the first request doesn't pay for their initialization
+            startup.create_task(_warm_up())
+            
+            # Step 2: Open the checkpointer and conversation store
+            checkpointer_task = startup.create_task(
+                stack.enter_async_context(create_checkpointer_context())
+            )
+            store_task = startup.create_task(
+                stack.enter_async_context(create_conversation_store())
+            )
+        
+        checkpointer = checkpointer_task.result()
+        conversations = store_task.result()
         
         # Step 3: Create the agent with the checkpointer
         agent = await create_agent(checkpointer=checkpointer)
@@ -62,9 +90,18 @@ async def lifespan(app: FastAPI):
         
         # Step 5: Cleanup on shutdown
         logger.info("shutting_down_caspar_api")
-        conversations.clear()
     
-    # Database connection closes automatically when we exit 'async with'
+    # Database connections and the LLM connection pool close automatically
+    # when we exit 'async with'
+
+
+async def _warm_up():
+    """Startup step 1 - prepare the knowledge base (and optionally more)."""
+    if settings.warmup_on_startup:
+        await warmup()
+    else:
+        await asyncio.to_thread(get_retriever)
+    logger.info("knowledge_base_ready")
 
 
 # ─────────────────────────────────────────────────────────────
@@ -169,7 +206,8 @@ async def start_conversation(request: StartConversationRequest):
     Returns a conversation ID to use for subsequent messages.
     """
     # Generate a unique ID for this conversation
-    conversation_id = f"conv-{uuid.uuid4().hex[:12]}"
+    # 72 random bits in 12 URL-safe characters (hex[:12] of a UUID kept only 48)
+    conversation_id = f"conv-{secrets.token_urlsafe(9)}"
     
     # Initialize the agent's state for this conversation
     state = create_initial_state(
@@ -177,11 +215,11 @@ async def start_conversation(request: StartConversationRequest):
         customer_id=request.customer_id,
     )
     
-    # Store in memory (keyed by conversation_id)
-    conversations[conversation_id] = {
+    # Store it (keyed by conversation_id)
+    await conversations.set(conversation_id, {
         "state": state,
         "customer_id": request.customer_id,
-    }
+    })
     
     logger.info(
         "conversation_started",
@@ -216,14 +254,27 @@ async def send_message(conversation_id: str, request: SendMessageRequest):
     The agent will process the message and return a response.
     """
     # Check if conversation exists
-    if conversation_id not in conversations:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Conversation {conversation_id} not found",
-        )
+    conv = await _get_conversation_or_404(conversation_id)
     
     # Process the message (see helper function below)
-    return await _process_message(conversation_id, request.message)
+    return await _process_message(conversation_id, request.message, conv)
+
+
+@app.post("/conversations/{conversation_id}/messages/stream", tags=["Conversations"])
+async def stream_message(conversation_id: str, request: SendMessageRequest):
+    """
+    Send a message and stream the reply as Server-Sent Events.
+    
+    Emits {"type": "token", "content": ...} events while the response is
+    generated, then one {"type": "done", ...} event with the same fields
+    as the non-streaming endpoint.
+    """
+    conv = await _get_conversation_or_404(conversation_id)
+    
+    return StreamingResponse(
+        _stream_message(conversation_id, request.message, conv),
+        media_type="text/event-stream",
+    )
 
 
 @app.get(
@@ -233,13 +284,7 @@ async def send_message(conversation_id: str, request: SendMessageRequest):
 )
 async def get_conversation(conversation_id: str):
     """Get the current status of a conversation."""
-    if conversation_id not in conversations:
-        raise HTTPException(
-            status_code=404,
-            detail=f"Conversation {conversation_id} not found",
-        )
-    
-    conv = conversations[conversation_id]
+    conv = await _get_conversation_or_404(conversation_id)
     state = conv["state"]
     
     return ConversationStatus(
@@ -255,14 +300,12 @@ async def get_conversation(conversation_id: str):
 @app.delete("/conversations/{conversation_id}", tags=["Conversations"])
 async def end_conversation(conversation_id: str):
     """End a conversation and clean up resources."""
-    if conversation_id not in conversations:
+    if not await conversations.delete(conversation_id):
         raise HTTPException(
             status_code=404,
             detail=f"Conversation {conversation_id} not found",
         )
     
-    del conversations[conversation_id]
-    
     logger.info("conversation_ended", conversation_id=conversation_id)
     
     return {"status": "ended", "conversation_id": conversation_id}
@@ -272,16 +315,23 @@ async def end_conversation(conversation_id: str):
 # METRICS ENDPOINT
 # ─────────────────────────────────────────────────────────────
 
-from caspar.api.metrics import metrics
+from caspar.api.metrics import PROMETHEUS_AVAILABLE, metrics, node_latency_tracker, prometheus_metrics
 
 @app.get("/metrics", tags=["System"])
-async def get_metrics():
+async def get_metrics(format: str | None = None):
     """
     Get current metrics.
     
     Returns counters, latencies, and uptime.
     Useful for monitoring dashboards.
+    
+    With prometheus_client installed this is the Prometheus text format,
+    ready to scrape; pass ?format=json for the JSON summary instead.
     """
+    if PROMETHEUS_AVAILABLE and format != "json":
+        body, content_type = prometheus_metrics()
+        return Response(content=body, media_type=content_type)
+    
     return metrics.get_stats()
 
 
@@ -289,17 +339,31 @@ async def get_metrics():
 # HELPER FUNCTIONS
 # ─────────────────────────────────────────────────────────────
 
-async def _process_message(conversation_id: str, message: str) -> SendMessageResponse:
+async def _get_conversation_or_404(conversation_id: str) -> dict:
+    """Load a conversation record, raising 404 if it doesn't exist."""
+    conv = await conversations.get(conversation_id)
+    if conv is None:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Conversation {conversation_id} not found",
+        )
+    return conv
+
+
+async def _process_message(
+    conversation_id: str,
+    message: str,
+    conv: dict | None = None
+) -> SendMessageResponse:
     """
     Process a message through the agent.
     
     This is a helper function used by multiple endpoints.
     The underscore prefix indicates it's private (not an endpoint).
     """
-    from langchain_core.messages import HumanMessage
-    
-    # Get the conversation from memory
-    conv = conversations[conversation_id]
+    # Get the conversation from the store
+    if conv is None:
+        conv = await _get_conversation_or_404(conversation_id)
     state = conv["state"]
     
     # Add the user's message to the conversation history
@@ -307,39 +371,23 @@ async def _process_message(conversation_id: str, message: str) -> SendMessageRes
     
     # Configure the agent with this conversation's thread_id
     # This enables persistence (if checkpointer is available)
-    config = {"configurable": {"thread_id": conversation_id}}
+    # The callback records per-node timings for /metrics
+    config = {
+        "configurable": {"thread_id": conversation_id},
+        "callbacks": [node_latency_tracker],
+    }
     
     try:
         # ═══════════════════════════════════════════════════════
         # THIS IS THE KEY LINE - Run the LangGraph agent!
         # ═══════════════════════════════════════════════════════
-        result = await agent.ainvoke(state, config)
+        result = await run_agent(agent, state, config)
         
         # Update stored state with the result
         conv["state"] = result
+        await conversations.set(conversation_id, conv)
         
-        # Extract the AI's response (last message)
-        ai_response = result["messages"][-1].content if result["messages"] else \
-            "I apologize, but I couldn't process your request."
-        
-        logger.info(
-            "message_processed",
-            conversation_id=conversation_id,
-            intent=result.get("intent"),
-            needs_escalation=result.get("needs_escalation", False),
-        )
-        
-        # Build and return the response
-        return SendMessageResponse(
-            response=ai_response,
-            intent=result.get("intent"),
-            needs_escalation=result.get("needs_escalation", False),
-            ticket_id=result.get("ticket_id"),
-            metadata={
-                "sentiment_score": result.get("sentiment_score"),
-                "frustration_level": result.get("frustration_level"),
-            },
-        )
+        return _build_response(conversation_id, result)
         
     except Exception as e:
         logger.error(
@@ -351,3 +399,60 @@ async def _process_message(conversation_id: str, message: str) -> SendMessageRes
             status_code=500,
             detail="An error occurred processing your message. Please try again.",
         )
+
+
+async def _stream_message(conversation_id: str, message: str, conv: dict):
+    """Run the agent for one message, yielding Server-Sent Events."""
+    state = conv["state"]
+    state["messages"].append(HumanMessage(content=message))
+    
+    config = {
+        "configurable": {"thread_id": conversation_id},
+        "callbacks": [node_latency_tracker],
+    }
+    
+    try:
+        async for kind, payload in stream_agent(agent, state, config):
+            if kind == "token":
+                yield f"data: {json.dumps({'type': 'token', 'content': payload})}\n\n"
+            else:
+                conv["state"] = payload
+                await conversations.set(conversation_id, conv)
+                response = _build_response(conversation_id, payload)
+                yield f"data: {json.dumps({'type': 'done', **response.model_dump()})}\n\n"
+        
+    except Exception as e:
+        # Headers are already sent, so report the failure in-stream
+        logger.error(
+            "message_processing_error", 
+            error=str(e), 
+            conversation_id=conversation_id
+        )
+        error = "An error occurred processing your message. Please try again."
+        yield f"data: {json.dumps({'type': 'error', 'detail': error})}\n\n"
+
+
+def _build_response(conversation_id: str, result: dict) -> SendMessageResponse:
+    """Turn the agent's final state into the API response."""
+    
+    # Extract the AI's response (last message)
+    ai_response = result["messages"][-1].content if result["messages"] else \
+        "I apologize, but I couldn't process your request."
+    
+    logger.info(
+        "message_processed",
+        conversation_id=conversation_id,
+        intent=result.get("intent"),
+        needs_escalation=result.get("needs_escalation", False),
+    )
+    
+    return SendMessageResponse(
+        response=ai_response,
+        intent=result.get("intent"),
+        needs_escalation=result.get("needs_escalation", False),
+        ticket_id=result.get("ticket_id"),
+        metadata={
+            "sentiment_score": result.get("sentiment_score"),
+            "frustration_level": result.get("frustration_level"),
+        },
+    )
@@ -4,12 +4,48 @@
 Simple metrics tracking for CASPAR.
 
 In production, you'd use Prometheus, DataDog, or similar.
-This simple implementation demonstrates the concepts.
+This simple implementation demonstrates the concepts - and when the
+optional `prometheus_client` package is installed, every counter and
+latency is also exported in Prometheus format.
 """
 
-from datetime import datetime, timezone
+from bisect import bisect_left
 from collections import defaultdict
+import math
 import threading
+import time
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+try:
+    from prometheus_client import CONTENT_TYPE_LATEST, Counter, Histogram, generate_latest
+except ImportError:
+    generate_latest = None
+
+
+# Histogram bucket upper bounds in seconds (Prometheus-style)
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1, 5)
+
+PROMETHEUS_AVAILABLE = generate_latest is not None
+
+if PROMETHEUS_AVAILABLE:
+    _prometheus_events = Counter(
+        "caspar_events_total",
+        "CASPAR events by name",
+        ["name"],
+    )
+    _prometheus_latency = Histogram(
+        "caspar_latency_seconds",
+        "CASPAR operation latency",
+        ["operation"],
+        buckets=LATENCY_BUCKETS,
+    )
+    _prometheus_node_latency = Histogram(
+        "caspar_node_latency_seconds",
+        "CASPAR agent graph node latency",
+        ["node"],
+        buckets=LATENCY_BUCKETS,
+    )
 
 
 class SimpleMetrics:
@@ -18,6 +54,10 @@ class SimpleMetrics:
     
     Why thread-safe? FastAPI handles multiple requests at once.
     Without locks, concurrent updates could corrupt our data.
+    
+    Latencies are kept as running totals plus a fixed histogram rather
+    than a list of samples, so each update is O(1) and reading the stats
+    doesn't depend on how many measurements were taken.
     """
     
     def __init__(self):
@@ -29,11 +69,12 @@ class SimpleMetrics:
         self._counters = defaultdict(int)
         
         # Latencies track "how long did X take?"
-        # We store lists of measurements for each operation
-        self._latencies = defaultdict(list)
+        # Per operation: count, sum, min, max and bucket counts
+        self._latencies: dict[str, dict] = {}
         
         # Track when we started (for uptime calculation)
-        self._started_at = datetime.now(timezone.utc)
+        # monotonic() never jumps backwards when the wall clock is adjusted
+        self._started_at = time.monotonic()
     
     def increment(self, name: str, value: int = 1):
         """
@@ -47,23 +88,41 @@ class SimpleMetrics:
         with self._lock:  # Acquire lock before modifying
             self._counters[name] += value
         # Lock automatically released when we exit 'with' block
+        
+        if PROMETHEUS_AVAILABLE:
+            _prometheus_events.labels(name).inc(value)
     
     def record_latency(self, name: str, seconds: float):
         """
         Record how long an operation took.
         
         Usage:
-            start = time.time()
+            start = time.monotonic()
             do_something()
-            metrics.record_latency("llm_call", time.time() - start)
+            metrics.record_latency("llm_call", time.monotonic() - start)
         """
+        bucket = bisect_left(LATENCY_BUCKETS, seconds)
+        
         with self._lock:
-            self._latencies[name].append(seconds)
+            stats = self._latencies.get(name)
+            if stats is None:
+                stats = self._latencies[name] = {
+                    "count": 0,
+                    "sum": 0.0,
+                    "min": math.inf,
+                    "max": -math.inf,
+                    # One slot per bucket, plus one for slower than the last
+                    "buckets": [0] * (len(LATENCY_BUCKETS) + 1),
+                }
             
-            # Keep only last 1000 measurements to prevent memory bloat
-            # Older measurements "fall off" as new ones come in
-            if len(self._latencies[name]) > 1000:
-                self._latencies[name] = self._latencies[name][-1000:]
+            stats["count"] += 1
+            stats["sum"] += seconds
+            stats["min"] = min(stats["min"], seconds)
+            stats["max"] = max(stats["max"], seconds)
+            stats["buckets"][bucket] += 1
+        
+        if PROMETHEUS_AVAILABLE:
+            _prometheus_latency.labels(name).observe(seconds)
     
     def get_stats(self) -> dict:
         """
@@ -74,9 +133,7 @@ class SimpleMetrics:
         with self._lock:
             stats = {
                 # How long has the server been running?
-                "uptime_seconds": (
-                    datetime.now(timezone.utc) - self._started_at
-                ).total_seconds(),
+                "uptime_seconds": time.monotonic() - self._started_at,
                 
                 # All counter values
                 "counters": dict(self._counters),
@@ -85,19 +142,39 @@ class SimpleMetrics:
                 "latencies": {},
             }
             
-            # Calculate latency statistics for each tracked operation
-            for name, values in self._latencies.items():
-                if values:
-                    stats["latencies"][name] = {
-                        "count": len(values),
-                        "avg_ms": sum(values) * 1000 / len(values),
-                        "max_ms": max(values) * 1000,
-                        "min_ms": min(values) * 1000,
-                    }
+            # Latency statistics for each tracked operation
+            for name, latency in self._latencies.items():
+                stats["latencies"][name] = {
+                    "count": latency["count"],
+                    "avg_ms": latency["sum"] * 1000 / latency["count"],
+                    "max_ms": latency["max"] * 1000,
+                    "min_ms": latency["min"] * 1000,
+                    "histogram": _cumulative_histogram(latency["buckets"]),
+                }
             
             return stats
 
 
+def _cumulative_histogram(buckets: list[int]) -> dict[str, int]:
+    """Bucket counts as Prometheus-style cumulative "le" counts."""
+    histogram = {}
+    total = 0
+    for upper_bound, count in zip((*LATENCY_BUCKETS, "+Inf"), buckets):
+        total += count
+        histogram[str(upper_bound)] = total
+    return histogram
+
+
+def prometheus_metrics() -> tuple[bytes, str]:
+    """
+    Render every metric in the Prometheus text exposition format.
+    
+    Returns:
+        (body, content_type) - only call when PROMETHEUS_AVAILABLE is True
+    """
+    return generate_latest(), CONTENT_TYPE_LATEST
+
+
 # Create a single global instance
 # All parts of the app use this same instance
 metrics = SimpleMetrics()
@@ -119,7 +196,8 @@ def track_latency(name: str):
     """
     def decorator(func):
         async def wrapper(*args, **kwargs):
-            start = datetime.now(timezone.utc)
+            # An integer clock read - much cheaper than building datetimes
+            start = time.monotonic_ns()
             try:
                 result = await func(*args, **kwargs)
                 metrics.increment(f"{name}_success")
@@ -129,7 +207,54 @@ def track_latency(name: str):
                 raise  # Re-raise the exception
             finally:
                 # 'finally' runs whether success or failure
-                elapsed = (datetime.now(timezone.utc) - start).total_seconds()
+                elapsed = (time.monotonic_ns() - start) / 1e9
                 metrics.record_latency(name, elapsed)
         return wrapper
     return decorator
+
+
+class NodeLatencyTracker(BaseCallbackHandler):
+    """
+    Callback that records how long each agent graph node takes.
+    
+    Pass it in the run config (config["callbacks"]) when invoking the
+    agent. Each node's latency is recorded as "node.<name>" and, with
+    prometheus_client installed, in caspar_node_latency_seconds{node=...} -
+    so a change that makes a node slower (or stops intent and sentiment
+    running concurrently) shows up in the dashboards.
+    """
+    
+    # Timing is cheap, so run during the graph instead of on a thread pool
+    run_inline = True
+    
+    def __init__(self, metrics: SimpleMetrics):
+        self.metrics = metrics
+        self._started: dict = {}  # run_id -> (node, start_ns)
+    
+    def on_chain_start(self, serialized, inputs, *, run_id, metadata=None, **kwargs):
+        # A node's own run is named after the node; chains inside it
+        # (routing functions, prompts) carry the same node metadata
+        node = (metadata or {}).get("langgraph_node")
+        if node is not None and kwargs.get("name") == node:
+            self._started[run_id] = (node, time.monotonic_ns())
+    
+    def on_chain_end(self, outputs, *, run_id, **kwargs):
+        self._finish(run_id)
+    
+    def on_chain_error(self, error, *, run_id, **kwargs):
+        self._finish(run_id)
+    
+    def _finish(self, run_id) -> None:
+        started = self._started.pop(run_id, None)
+        if started is None:
+            return
+        
+        node, start = started
+        elapsed = (time.monotonic_ns() - start) / 1e9
+        self.metrics.record_latency(f"node.{node}", elapsed)
+        if PROMETHEUS_AVAILABLE:
+            _prometheus_node_latency.labels(node).observe(elapsed)
+
+
+# Shared by every agent run
+node_latency_tracker = NodeLatencyTracker(metrics)
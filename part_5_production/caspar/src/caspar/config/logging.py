@@ -8,43 +8,83 @@ Provides structured logging using structlog for better
 observability in production environments.
 """
 
+from functools import lru_cache
 import logging
 import structlog
 from .settings import settings
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Resolved once - settings are read from the environment at import anyway
+_LOG_LEVEL = getattr(logging, settings.log_level.upper(), logging.INFO)
+_DEVELOPMENT = settings.environment == "development"
+
+
+def json_log_output() -> tuple[structlog.processors.JSONRenderer, object]:
+    """
+    JSON renderer and matching logger factory for production logs.
+    
+    Uses orjson when it's installed - it serializes straight to bytes, so
+    the logger writes bytes too; otherwise falls back to the stdlib json module.
+    """
+    if orjson is not None:
+        return (
+            structlog.processors.JSONRenderer(serializer=orjson.dumps),
+            structlog.BytesLoggerFactory(),
+        )
+    return structlog.processors.JSONRenderer(), structlog.PrintLoggerFactory()
+
 
 def setup_logging() -> None:
     """Configure structured logging for the application."""
     
-    # Set the log level based on settings
-    log_level = getattr(logging, settings.log_level.upper(), logging.INFO)
+    if _DEVELOPMENT:
+        renderer, logger_factory = structlog.dev.ConsoleRenderer(), structlog.PrintLoggerFactory()
+    else:
+        renderer, logger_factory = json_log_output()
+    
+    # Lines below the level never reach these processors - the filtering
+    # bound logger drops them first - so only lines that get written pay
+    # for stack and exception rendering.
+    processors = [
+        structlog.contextvars.merge_contextvars,
+        structlog.processors.add_log_level,
+        structlog.processors.StackInfoRenderer(),
+        structlog.dev.set_exc_info,
+        # ISO timestamps for people reading the console; in production a
+        # unix timestamp is cheaper and log aggregators parse it natively
+        structlog.processors.TimeStamper(fmt="iso")
+        if _DEVELOPMENT
+        else structlog.processors.TimeStamper(fmt=None, utc=True, key="ts"),
+        # Use console renderer in development, JSON in production
+        renderer,
+    ]
     
     # Configure structlog
     structlog.configure(
-        processors=[
-            structlog.contextvars.merge_contextvars,
-            structlog.processors.add_log_level,
-            structlog.processors.StackInfoRenderer(),
-            structlog.dev.set_exc_info,
-            structlog.processors.TimeStamper(fmt="iso"),
-            # Use console renderer in development, JSON in production
-            structlog.dev.ConsoleRenderer()
-            if settings.environment == "development"
-            else structlog.processors.JSONRenderer(),
-        ],
-        wrapper_class=structlog.make_filtering_bound_logger(log_level),
+        processors=processors,
+        wrapper_class=structlog.make_filtering_bound_logger(_LOG_LEVEL),
         context_class=dict,
-        logger_factory=structlog.PrintLoggerFactory(),
+        logger_factory=logger_factory,
         cache_logger_on_first_use=True,
     )
     
     # Also configure standard logging for third-party libraries
     logging.basicConfig(
         format="%(message)s",
-        level=log_level,
+        level=_LOG_LEVEL,
     )
 
 
+@lru_cache(maxsize=256)
 def get_logger(name: str) -> structlog.BoundLogger:
-    """Get a logger instance with the given name."""
+    """
+    Get a logger instance with the given name.
+    
+    Cached, so every caller asking for a name shares one logger. The returned
+    proxy still picks up setup_logging() if it runs after this is called.
+    """
     return structlog.get_logger(name)
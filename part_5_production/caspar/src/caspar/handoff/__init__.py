@@ -7,30 +7,44 @@ Manages escalation to human agents, including queue management,
 context packaging, agent notifications, and approval workflows.
 """
 
-from .triggers import EscalationTrigger, check_escalation_triggers, check_sensitive_topics
-from .queue import HandoffQueue, HandoffRequest, get_handoff_queue
-from .context import ConversationContext, package_context_for_agent, format_context_for_display
-from .notifications import notify_available_agents
-from .approval import ApprovalStatus, PendingApproval, needs_approval, get_approval_reason
+from .triggers import EscalationTrigger, check_escalation_triggers, check_sensitive_topics, check_sensitive_topics_batch
+from .queue import HandoffQueue, HandoffRequest, encode_request, get_handoff_queue
+from .context import ConversationContext, TranscriptTurn, package_context_for_agent, format_context_for_display
+from .notifications import (
+    notify_available_agents,
+    notify_available_agents_async,
+    register_agent,
+    remove_agent,
+    set_agent_status,
+)
+from .approval import ApprovalStatus, PendingApproval, approval_reasons, needs_approval, get_approval_reason
 
 __all__ = [
     # Escalation triggers
     "EscalationTrigger",
     "check_escalation_triggers",
     "check_sensitive_topics",
+    "check_sensitive_topics_batch",
     # Queue management
     "HandoffQueue",
     "HandoffRequest",
+    "encode_request",
     "get_handoff_queue",
     # Context packaging
     "ConversationContext",
+    "TranscriptTurn",
     "package_context_for_agent",
     "format_context_for_display",
     # Notifications
     "notify_available_agents",
+    "notify_available_agents_async",
+    "register_agent",
+    "remove_agent",
+    "set_agent_status",
     # HITL Approval
     "ApprovalStatus",
     "PendingApproval",
+    "approval_reasons",
     "needs_approval",
     "get_approval_reason",
 ]
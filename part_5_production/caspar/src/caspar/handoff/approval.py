@@ -38,47 +38,48 @@ class PendingApproval:
     reviewed_at: datetime | None = None
 
 
-def needs_approval(state: dict) -> bool:
+def approval_reasons(state: dict) -> list[str]:
     """
-    Determine if a response needs human approval before sending.
+    Evaluate every approval rule once.
     
-    This is checked BEFORE the response is sent to the customer.
+    Returns:
+        Human-readable reasons the response needs approval (empty if none)
     """
+    refund_amount = state.get("pending_refund_amount", 0)
+    policy_exception = state.get("policy_exception_requested")
+    sentiment = state.get("sentiment_score", 0)
+    intent = state.get("intent")
+    
+    reasons = []
+    
     # High-value actions need approval
-    if state.get("pending_refund_amount", 0) > 100:
-        return True
+    if refund_amount > 100:
+        reasons.append(f"High-value refund: ${refund_amount}")
     
     # Policy exceptions need approval
-    if state.get("policy_exception_requested"):
-        return True
+    if policy_exception:
+        reasons.append("Policy exception requested")
     
     # Very negative sentiment needs human review
-    sentiment = state.get("sentiment_score", 0)
     if sentiment < -0.7:
-        return True
+        reasons.append("Customer appears very upset")
     
     # New customers with complaints
-    if state.get("intent") == "complaint" and state.get("customer_tenure_days", 365) < 30:
-        return True
+    if intent == "complaint" and state.get("customer_tenure_days", 365) < 30:
+        reasons.append("New customer complaint - retention risk")
+    
+    return reasons
+
+
+def needs_approval(state: dict) -> bool:
+    """
+    Determine if a response needs human approval before sending.
     
-    return False
+    This is checked BEFORE the response is sent to the customer.
+    """
+    return bool(approval_reasons(state))
 
 
 def get_approval_reason(state: dict) -> str:
     """Get a human-readable reason for why approval is needed."""
-    reasons = []
-    
-    if state.get("pending_refund_amount", 0) > 100:
-        amount = state.get("pending_refund_amount")
-        reasons.append(f"High-value refund: ${amount}")
-    
-    if state.get("policy_exception_requested"):
-        reasons.append("Policy exception requested")
-    
-    if state.get("sentiment_score", 0) < -0.7:
-        reasons.append("Customer appears very upset")
-    
-    if state.get("intent") == "complaint" and state.get("customer_tenure_days", 365) < 30:
-        reasons.append("New customer complaint - retention risk")
-    
-    return "; ".join(reasons) if reasons else "Manual review requested"
+    return "; ".join(approval_reasons(state)) or "Manual review requested"
@@ -6,18 +6,38 @@ Context Packaging for Human Agents
 
 Prepares comprehensive context to help human agents
 quickly understand and resolve customer issues.
+
+Each conversation's latest packaged context is kept, and the next
+handoff for that conversation starts from it, so only messages added
+since then are processed. Everything else (triggers, sentiment, customer
+and order info) is read fresh from the state every time.
 """
 
+from collections import OrderedDict
+from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from pydantic import BaseModel
+from typing import NamedTuple
 from langchain_core.messages import HumanMessage, AIMessage
 
 from caspar.config import get_logger
 
 logger = get_logger(__name__)
 
+# Latest context per conversation - the starting point for the next one.
+# Least recently packaged first, capped at _CONTEXT_CACHE_SIZE
+_CONTEXT_CACHE_SIZE = 256
+_latest_contexts: OrderedDict[str, "ConversationContext"] = OrderedDict()
+
+
+class TranscriptTurn(NamedTuple):
+    """One message of the transcript."""
+    
+    role: str  # "customer" or "caspar"
+    content: str
+
 
-class ConversationContext(BaseModel):
+@dataclass(slots=True, kw_only=True)
+class ConversationContext:
     """Complete context package for human agent."""
     
     # Identification
@@ -33,7 +53,9 @@ class ConversationContext(BaseModel):
     
     # Conversation Summary
     conversation_summary: str
-    message_count: int
+    message_count: int  # Also where the next packaging picks up
+    initial_inquiry: str | None = None
+    latest_inquiry: str | None = None
     conversation_duration: str | None = None
     
     # Issue Details
@@ -48,14 +70,31 @@ class ConversationContext(BaseModel):
     ticket_id: str | None = None
     retrieved_knowledge: str | None = None
     
-    # Full Transcript
-    transcript: list[dict]
+    # Full Transcript (see also the transcript property)
+    turns: list[TranscriptTurn]
     
     # Recommendations
     suggested_actions: list[str]
     
     # Metadata
     packaged_at: str
+    
+    _display_text: str | None = field(default=None, init=False, repr=False, compare=False)
+    _transcript: list[dict] | None = field(default=None, init=False, repr=False, compare=False)
+    
+    @property
+    def transcript(self) -> list[dict]:
+        """The transcript as role/content dicts, built on first access."""
+        if self._transcript is None:
+            self._transcript = [turn._asdict() for turn in self.turns]
+        return self._transcript
+    
+    @property
+    def display_text(self) -> str:
+        """Readable text for the agent interface, rendered once."""
+        if self._display_text is None:
+            self._display_text = _render_context(self)
+        return self._display_text
 
 
 def package_context_for_agent(
@@ -75,17 +114,33 @@ def package_context_for_agent(
         ConversationContext with all relevant information
     """
     messages = state.get("messages") or []
-    
-    # Build transcript
-    transcript = []
-    for msg in messages:
-        transcript.append({
-            "role": "customer" if isinstance(msg, HumanMessage) else "caspar",
-            "content": msg.content,
-        })
+    conversation_id = state.get("conversation_id") or "unknown"
+    
+    # Continue from the last context packaged for this conversation, if
+    # the messages it covered are still the start of this conversation
+    previous = _latest_contexts.get(conversation_id)
+    if previous is not None and _continues(previous, messages):
+        turns = list(previous.turns)
+        first_customer_msg = previous.initial_inquiry
+        last_customer_msg = previous.latest_inquiry
+        new_messages = messages[previous.message_count:]
+    else:
+        turns = []
+        first_customer_msg = last_customer_msg = None
+        new_messages = messages
+    
+    # Extend the transcript, noting the first and last customer messages
+    # for the summary as we go
+    for msg in new_messages:
+        is_customer = isinstance(msg, HumanMessage)
+        turns.append(TranscriptTurn("customer" if is_customer else "caspar", msg.content))
+        if is_customer:
+            if first_customer_msg is None:
+                first_customer_msg = msg.content
+            last_customer_msg = msg.content
     
     # Generate conversation summary
-    summary = _generate_summary(messages)
+    summary = _generate_summary(first_customer_msg, last_customer_msg, len(messages))
     
     # Extract customer info if provided
     customer_name = None
@@ -103,7 +158,7 @@ def package_context_for_agent(
     suggested_actions = _generate_suggestions(state)
     
     context = ConversationContext(
-        conversation_id=state.get("conversation_id") or "unknown",
+        conversation_id=conversation_id,
         customer_id=state.get("customer_id") or "unknown",
         request_id=request_id,
         customer_name=customer_name,
@@ -112,6 +167,8 @@ def package_context_for_agent(
         customer_history=customer_history,
         conversation_summary=summary,
         message_count=len(messages),
+        initial_inquiry=first_customer_msg,
+        latest_inquiry=last_customer_msg,
         detected_intent=state.get("intent") or "unknown",
         escalation_triggers=state.get("escalation_triggers") or [],
         escalation_reason=state.get("escalation_reason") or "Unknown",
@@ -120,7 +177,7 @@ def package_context_for_agent(
         order_info=state.get("order_info"),
         ticket_id=state.get("ticket_id"),
         retrieved_knowledge=state.get("retrieved_context"),
-        transcript=transcript,
+        turns=turns,
         suggested_actions=suggested_actions,
         packaged_at=datetime.now(timezone.utc).isoformat(),
     )
@@ -131,45 +188,57 @@ def package_context_for_agent(
         message_count=context.message_count
     )
     
+    _latest_contexts[conversation_id] = context
+    _latest_contexts.move_to_end(conversation_id)
+    if len(_latest_contexts) > _CONTEXT_CACHE_SIZE:
+        _latest_contexts.popitem(last=False)
+    
     return context
 
 
-def _generate_summary(messages: list) -> str:
-    """Generate a brief summary of the conversation."""
+def _continues(previous: ConversationContext, messages: list) -> bool:
+    """True if messages start with the ones previous was packaged from."""
+    count = previous.message_count
+    if count > len(messages):
+        return False
+    return count == 0 or messages[count - 1].content == previous.turns[-1].content
+
+
+def _generate_summary(
+    first_customer_msg: str | None,
+    last_customer_msg: str | None,
+    message_count: int
+) -> str:
+    """
+    Generate a brief summary of the conversation.
     
-    if not messages:
-        return "No messages in conversation."
+    Args:
+        first_customer_msg: The initial inquiry
+        last_customer_msg: The most recent concern
+        message_count: Total messages in the conversation
+    """
     
-    # Get first customer message (the initial inquiry)
-    first_customer_msg = None
-    for msg in messages:
-        if isinstance(msg, HumanMessage):
-            first_customer_msg = msg.content
-            break
-    
-    # Get last customer message (most recent concern)
-    last_customer_msg = None
-    for msg in reversed(messages):
-        if isinstance(msg, HumanMessage):
-            last_customer_msg = msg.content
-            break
+    if not message_count:
+        return "No messages in conversation."
     
     summary_parts = []
     
     if first_customer_msg:
-        # Truncate if too long
-        initial = first_customer_msg[:150] + "..." if len(first_customer_msg) > 150 else first_customer_msg
-        summary_parts.append(f"Initial inquiry: {initial}")
+        summary_parts.append(f"Initial inquiry: {_truncate(first_customer_msg, 150)}")
     
     if last_customer_msg and last_customer_msg != first_customer_msg:
-        recent = last_customer_msg[:150] + "..." if len(last_customer_msg) > 150 else last_customer_msg
-        summary_parts.append(f"Most recent message: {recent}")
+        summary_parts.append(f"Most recent message: {_truncate(last_customer_msg, 150)}")
     
-    summary_parts.append(f"Total exchanges: {len(messages)} messages")
+    summary_parts.append(f"Total exchanges: {message_count} messages")
     
     return "\n".join(summary_parts)
 
 
+def _truncate(text: str, limit: int) -> str:
+    """Shorten text to limit characters, marking the cut with '...'."""
+    return text if len(text) <= limit else text[:limit] + "..."
+
+
 def _generate_suggestions(state: dict) -> list[str]:
     """Generate suggested actions for the human agent."""
     
@@ -214,61 +283,79 @@ def _generate_suggestions(state: dict) -> list[str]:
 
 def format_context_for_display(context: ConversationContext) -> str:
     """Format context as readable text for agent interface."""
+    return context.display_text
+
+
+# Display templates - each section ends with a blank line
+_RULE = "=" * 60
+_DIVIDER = "-" * 40
+
+_HEADER_TPL = (
+    f"{_RULE}\n🎫 HANDOFF CONTEXT\n{_RULE}\n\n"
+    "Request ID: {request_id}\n"
+    "Conversation: {conversation_id}\n"
+    "Customer: {customer_id}\n"
+)
+
+_ISSUE_TPL = (
+    f"📋 ISSUE SUMMARY\n{_DIVIDER}\n"
+    "Intent: {intent}\n"
+    "Sentiment: {sentiment:.2f} ({frustration} frustration)\n"
+    "Reason: {reason}\n"
+)
+
+_SUMMARY_TPL = f"📝 CONVERSATION SUMMARY\n{_DIVIDER}\n{{summary}}\n"
+
+_CUSTOMER_HEADING = f"👤 CUSTOMER INFO\n{_DIVIDER}"
+_SUGGESTIONS_HEADING = f"💡 SUGGESTED ACTIONS\n{_DIVIDER}"
+_TRANSCRIPT_HEADING = f"💬 TRANSCRIPT\n{_DIVIDER}\n"
+
+_DISPLAY_ROLES = {"customer": "Customer"}
+
+
+def _render_context(context: ConversationContext) -> str:
+    """Build the display text for a context."""
     
-    lines = [
-        "=" * 60,
-        "🎫 HANDOFF CONTEXT",
-        "=" * 60,
-        "",
-        f"Request ID: {context.request_id}",
-        f"Conversation: {context.conversation_id}",
-        f"Customer: {context.customer_id}",
-        "",
-    ]
+    sections = [_HEADER_TPL.format(
+        request_id=context.request_id,
+        conversation_id=context.conversation_id,
+        customer_id=context.customer_id,
+    )]
     
     # Customer info if available
     if context.customer_name:
-        lines.append("👤 CUSTOMER INFO")
-        lines.append("-" * 40)
-        lines.append(f"Name: {context.customer_name}")
+        rows = [_CUSTOMER_HEADING, f"Name: {context.customer_name}"]
         if context.customer_email:
-            lines.append(f"Email: {context.customer_email}")
+            rows.append(f"Email: {context.customer_email}")
         if context.customer_tier:
-            lines.append(f"Tier: {context.customer_tier.upper()}")
+            rows.append(f"Tier: {context.customer_tier.upper()}")
         if context.customer_history:
-            lines.append(f"History: {context.customer_history}")
-        lines.append("")
+            rows.append(f"History: {context.customer_history}")
+        rows.append("")
+        sections.append("\n".join(rows))
     
     # Issue summary
-    lines.append("📋 ISSUE SUMMARY")
-    lines.append("-" * 40)
-    lines.append(f"Intent: {context.detected_intent}")
-    lines.append(f"Sentiment: {context.sentiment_score:.2f} ({context.frustration_level} frustration)")
-    lines.append(f"Reason: {context.escalation_reason}")
-    lines.append("")
+    sections.append(_ISSUE_TPL.format(
+        intent=context.detected_intent,
+        sentiment=context.sentiment_score,
+        frustration=context.frustration_level,
+        reason=context.escalation_reason,
+    ))
     
     # Suggested actions
-    lines.append("💡 SUGGESTED ACTIONS")
-    lines.append("-" * 40)
-    for action in context.suggested_actions:
-        lines.append(f"  • {action}")
-    lines.append("")
+    sections.append("\n".join([
+        _SUGGESTIONS_HEADING,
+        *(f"  • {action}" for action in context.suggested_actions),
+        "",
+    ]))
     
     # Conversation summary
-    lines.append("📝 CONVERSATION SUMMARY")
-    lines.append("-" * 40)
-    lines.append(context.conversation_summary)
-    lines.append("")
+    sections.append(_SUMMARY_TPL.format(summary=context.conversation_summary))
     
     # Transcript
-    lines.append("💬 TRANSCRIPT")
-    lines.append("-" * 40)
-    for msg in context.transcript:
-        role = "Customer" if msg["role"] == "customer" else "CASPAR"
-        content = msg["content"][:200] + "..." if len(msg["content"]) > 200 else msg["content"]
-        lines.append(f"{role}: {content}")
-        lines.append("")
-    
-    lines.append("=" * 60)
+    sections.append(_TRANSCRIPT_HEADING + "".join(
+        f"{_DISPLAY_ROLES.get(turn.role, 'CASPAR')}: {_truncate(turn.content, 200)}\n\n"
+        for turn in context.turns
+    ) + _RULE)
     
-    return "\n".join(lines)
+    return "\n".join(sections)
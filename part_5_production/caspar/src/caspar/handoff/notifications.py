@@ -6,19 +6,31 @@ Agent Notification System
 
 Notifies available human agents about pending handoffs.
 In production, this would integrate with Slack, email, or a dashboard.
+
+Standard notifications go out as one message per channel addressed to
+every target agent (Slack @mentions, a dashboard target list); urgent
+alerts still reach each agent individually. Sending is blocking I/O, so
+it runs on a small thread pool: notify_available_agents() returns as soon
+as the sends are submitted, and notify_available_agents_async() waits
+for all of them in parallel.
 """
 
-from datetime import datetime, timezone
-from pydantic import BaseModel
+import asyncio
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
+import time
 
 from caspar.config import get_logger
-from .queue import HandoffRequest
+from .queue import HandoffRequest, format_timestamp
 from .context import ConversationContext
 
 logger = get_logger(__name__)
 
+_notify_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="notify")
+
 
-class AgentNotification(BaseModel):
+@dataclass(slots=True, frozen=True, kw_only=True)
+class AgentNotification:
     """A notification sent to human agents."""
     
     notification_id: str
@@ -27,30 +39,89 @@ class AgentNotification(BaseModel):
     customer_id: str
     brief_reason: str
     estimated_wait: int | None
-    sent_at: str
+    sent_at: int  # time.time_ns()
     channel: str  # "dashboard", "slack", "email"
+    
+    @property
+    def sent_at_iso(self) -> str:
+        return format_timestamp(self.sent_at)
 
 
-# Simulated agent pool
-AVAILABLE_AGENTS = [
-    {"id": "AGENT-001", "name": "Sarah Johnson", "status": "available", "skills": ["technical", "billing"]},
-    {"id": "AGENT-002", "name": "Mike Chen", "status": "available", "skills": ["returns", "shipping"]},
-    {"id": "AGENT-003", "name": "Emily Davis", "status": "busy", "skills": ["vip", "complaints"]},
-]
+# Simulated agent pool, keyed by agent ID. Private so every change goes
+# through register_agent()/set_agent_status()/remove_agent(), which keep
+# the lookup structures below in step with it.
+_agents: dict[str, dict] = {
+    agent["id"]: agent
+    for agent in (
+        {"id": "AGENT-001", "name": "Sarah Johnson", "status": "available", "skills": ["technical", "billing"]},
+        {"id": "AGENT-002", "name": "Mike Chen", "status": "available", "skills": ["returns", "shipping"]},
+        {"id": "AGENT-003", "name": "Emily Davis", "status": "busy", "skills": ["vip", "complaints"]},
+    )
+}
 
+# Each known skill gets one bit, so "has any of these skills" is a single AND
+_skill_bits: dict[str, int] = {}
+_skill_masks: dict[str, int] = {}  # agent ID -> bitmask of its skills
+_available_agents: list[dict] = []
 
-def get_available_agents(required_skills: list[str] | None = None) -> list[dict]:
-    """Get list of available agents, optionally filtered by skills."""
+
+def _skill_mask(skills: list[str]) -> int:
+    """Bitmask of the known skills in skills (unknown skills have no bit)."""
+    mask = 0
+    for skill in skills:
+        mask |= _skill_bits.get(skill, 0)
+    return mask
+
+
+def _rebuild_agent_index() -> None:
+    """Recompute the skill bits, masks and available list from the pool."""
+    global _skill_bits, _skill_masks, _available_agents
+    
+    _skill_bits = {
+        skill: 1 << i
+        for i, skill in enumerate(sorted({s for agent in _agents.values() for s in agent["skills"]}))
+    }
+    _skill_masks = {agent_id: _skill_mask(agent["skills"]) for agent_id, agent in _agents.items()}
+    _available_agents = [a for a in _agents.values() if a["status"] == "available"]
+
+
+_rebuild_agent_index()
+
+
+def register_agent(agent_id: str, name: str, skills: list[str], status: str = "available") -> None:
+    """Add an agent to the pool (or replace the one with this ID)."""
+    _agents[agent_id] = {"id": agent_id, "name": name, "status": status, "skills": list(skills)}
+    _rebuild_agent_index()
+
+
+def remove_agent(agent_id: str) -> None:
+    """Take an agent out of the pool."""
+    if _agents.pop(agent_id, None) is None:
+        raise ValueError(f"Unknown agent: {agent_id}")
+    _rebuild_agent_index()
+
+
+def set_agent_status(agent_id: str, status: str) -> None:
+    """Update an agent's status (e.g. "available", "busy")."""
+    agent = _agents.get(agent_id)
+    if agent is None:
+        raise ValueError(f"Unknown agent: {agent_id}")
     
-    available = [a for a in AVAILABLE_AGENTS if a["status"] == "available"]
+    agent["status"] = status
+    _rebuild_agent_index()
+
+
+def get_available_agents(required_skills: list[str] | None = None) -> list[dict]:
+    """
+    Get list of available agents, optionally filtered by skills.
     
-    if required_skills:
-        available = [
-            a for a in available
-            if any(skill in a["skills"] for skill in required_skills)
-        ]
+    Returns copies - use set_agent_status() to change an agent.
+    """
+    if not required_skills:
+        return [dict(a) for a in _available_agents]
     
-    return available
+    required = _skill_mask(required_skills)
+    return [dict(a) for a in _available_agents if _skill_masks[a["id"]] & required]
 
 
 def notify_available_agents(
@@ -71,9 +142,42 @@ def notify_available_agents(
         context: Optional conversation context
         
     Returns:
-        List of notifications sent
+        List of notifications sent (delivery continues in the background)
+    """
+    notifications, sends = _prepare_notifications(request)
+    
+    for send in sends:
+        _notify_executor.submit(*send).add_done_callback(_log_send_failure)
+    
+    return notifications
+
+
+async def notify_available_agents_async(
+    request: HandoffRequest,
+    context: ConversationContext | None = None,
+) -> list[AgentNotification]:
     """
-    notifications = []
+    Notify available agents, returning once every notification is sent.
+    
+    Same as notify_available_agents(), but for async callers that want
+    delivery to have finished; the sends still run in parallel.
+    """
+    notifications, sends = _prepare_notifications(request)
+    
+    results = await asyncio.gather(
+        *(asyncio.to_thread(*send) for send in sends),
+        return_exceptions=True,
+    )
+    for result in results:
+        if isinstance(result, Exception):
+            logger.warning("agent_notification_failed", error=str(result))
+    
+    return notifications
+
+
+def _prepare_notifications(request: HandoffRequest) -> tuple[list[AgentNotification], list[tuple]]:
+    """Build the notifications for a request and the sends that deliver them."""
+    sends = []
     
     # Determine required skills based on triggers
     required_skills = []
@@ -91,37 +195,55 @@ def notify_available_agents(
     
     # Create notification content
     brief_reason = request.reason[:100] + "..." if len(request.reason) > 100 else request.reason
+    sent_at = time.time_ns()
+    id_prefix = f"NOTIF-{request.request_id}-"
     
-    for agent in agents:
-        notification = AgentNotification(
-            notification_id=f"NOTIF-{request.request_id}-{agent['id']}",
+    notifications = [
+        AgentNotification(
+            notification_id=id_prefix + agent["id"],
             request_id=request.request_id,
             priority=request.priority,
             customer_id=request.customer_id,
             brief_reason=brief_reason,
             estimated_wait=request.estimated_wait,
-            sent_at=datetime.now(timezone.utc).isoformat(),
+            sent_at=sent_at,
             channel="dashboard",
         )
-        
-        notifications.append(notification)
-        
-        # Log the "notification" (in production, this would actually send)
-        logger.info(
-            "agent_notified",
-            agent_id=agent["id"],
-            agent_name=agent["name"],
-            request_id=request.request_id,
-            priority=request.priority
-        )
-        
-        # Simulate different notification channels based on priority
+        for agent in agents
+    ]
+    
+    by_channel: dict[str, list[dict]] = {}
+    for agent, notification in zip(agents, notifications):
+        by_channel.setdefault(notification.channel, []).append(agent)
+    
+    # Log the "notifications" (in production, this would actually send)
+    logger.info(
+        "agents_notified",
+        request_id=request.request_id,
+        priority=request.priority,
+        agent_ids=[agent["id"] for agent in agents],
+        agent_count=len(agents),
+        channels=list(by_channel)
+    )
+    
+    for channel, channel_agents in by_channel.items():
+        # Urgent alerts page each agent; everything else is one message
         if request.priority == "urgent":
-            _send_urgent_notification(agent, request, brief_reason)
+            sends.extend(
+                (_send_urgent_notification, agent, request, brief_reason)
+                for agent in channel_agents
+            )
         else:
-            _send_standard_notification(agent, request, brief_reason)
+            sends.append((_send_standard_batch, channel, channel_agents, request, brief_reason))
     
-    return notifications
+    return notifications, sends
+
+
+def _log_send_failure(future: Future) -> None:
+    """Log a notification that failed to send in the background."""
+    error = future.exception()
+    if error is not None:
+        logger.warning("agent_notification_failed", error=str(error))
 
 
 def _send_urgent_notification(agent: dict, request: HandoffRequest, reason: str):
@@ -132,9 +254,9 @@ def _send_urgent_notification(agent: dict, request: HandoffRequest, reason: str)
     print(f"   → Immediate attention required\n")
 
 
-def _send_standard_notification(agent: dict, request: HandoffRequest, reason: str):
-    """Simulate standard notification (would update dashboard)."""
-    print(f"\n📋 New handoff request for {agent['name']}")
+def _send_standard_batch(channel: str, agents: list[dict], request: HandoffRequest, reason: str):
+    """Simulate one standard notification to several agents (would update dashboard)."""
+    print(f"\n📋 New handoff request on {channel} for {', '.join(a['name'] for a in agents)}")
     print(f"   Priority: {request.priority.upper()}")
     print(f"   Customer: {request.customer_id}")
     print(f"   Reason: {reason}\n")
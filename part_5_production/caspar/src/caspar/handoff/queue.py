@@ -5,19 +5,50 @@
 Handoff Queue Management
 
 Manages the queue of conversations waiting for human agents.
+
+HandoffQueue keeps the queue in this process's memory. With
+HANDOFF_BACKEND=redis, RedisHandoffQueue keeps it in Redis instead, so
+every API worker sees (and serves) the same queue.
 """
 
+from bisect import bisect_left
 from datetime import datetime, timezone
-from enum import Enum
+from enum import Enum, IntEnum
+from itertools import count
+from dataclasses import dataclass, field, fields
+import json
 from typing import Literal
-from pydantic import BaseModel, Field
+import time
 import uuid
 
-from caspar.config import get_logger
+from caspar.config import settings, get_logger
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import redis
+except ImportError:
+    redis = None
 
 logger = get_logger(__name__)
 
 
+class Priority(IntEnum):
+    """Handoff priority rank (urgent gets served first)."""
+    
+    URGENT = 0
+    HIGH = 1
+    MEDIUM = 2
+    LOW = 3
+
+
+# Priority name -> rank
+PRIORITY_ORDER = {priority.name.lower(): priority for priority in Priority}
+
+
 class HandoffStatus(str, Enum):
     """Status of a handoff request."""
     
@@ -28,10 +59,18 @@ class HandoffStatus(str, Enum):
     ABANDONED = "abandoned"
 
 
-class HandoffRequest(BaseModel):
+def format_timestamp(timestamp_ns: int | None) -> str | None:
+    """Render a time.time_ns() timestamp as an ISO 8601 UTC string."""
+    if timestamp_ns is None:
+        return None
+    return datetime.fromtimestamp(timestamp_ns / 1e9, timezone.utc).isoformat()
+
+
+@dataclass(slots=True, kw_only=True)
+class HandoffRequest:
     """A request for human agent assistance."""
     
-    request_id: str = Field(default_factory=lambda: f"HO-{uuid.uuid4().hex[:8].upper()}")
+    request_id: str = field(default_factory=lambda: f"HO-{uuid.uuid4().hex[:8].upper()}")
     conversation_id: str
     customer_id: str
     ticket_id: str | None = None
@@ -43,26 +82,100 @@ class HandoffRequest(BaseModel):
     status: HandoffStatus = HandoffStatus.QUEUED
     assigned_agent: str | None = None
     
-    created_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    updated_at: str = Field(default_factory=lambda: datetime.now(timezone.utc).isoformat())
-    assigned_at: str | None = None
-    resolved_at: str | None = None
+    # Timestamps are time.time_ns() values; format_timestamp() renders them
+    created_at: int = field(default_factory=time.time_ns)
+    updated_at: int = field(default_factory=time.time_ns)
+    assigned_at: int | None = None
+    resolved_at: int | None = None
     
     # Estimated wait time in minutes (calculated based on queue position)
     estimated_wait: int | None = None
+    
+    # Priority as a rank, so the queue compares ints rather than names
+    priority_rank: Priority = field(init=False, repr=False)
+    
+    def __post_init__(self):
+        self.priority_rank = PRIORITY_ORDER.get(self.priority, Priority.MEDIUM)
+    
+    @property
+    def created_at_iso(self) -> str:
+        return format_timestamp(self.created_at)
+    
+    @property
+    def updated_at_iso(self) -> str:
+        return format_timestamp(self.updated_at)
+    
+    @property
+    def assigned_at_iso(self) -> str | None:
+        return format_timestamp(self.assigned_at)
+    
+    @property
+    def resolved_at_iso(self) -> str | None:
+        return format_timestamp(self.resolved_at)
+
+
+_TIMESTAMP_FIELDS = ("created_at", "updated_at", "assigned_at", "resolved_at")
+
+
+def request_to_dict(request: HandoffRequest) -> dict:
+    """
+    Plain-dict view of a request for dashboards and APIs.
+    
+    Timestamps are rendered as ISO strings - nanosecond ints are too
+    large for JavaScript numbers.
+    """
+    data = {f.name: getattr(request, f.name) for f in fields(request) if f.init}
+    for name in _TIMESTAMP_FIELDS:
+        data[name] = format_timestamp(data[name])
+    return data
+
+
+def encode_request(request: HandoffRequest) -> bytes:
+    """Encode a request as JSON (via orjson when it's installed)."""
+    return _json_dumps(request_to_dict(request))
+
+
+def _json_dumps(data: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data).encode("utf-8")
+
+
+def _wait_estimate(priority_rank: Priority, ahead_count: int) -> int:
+    """Estimated wait in minutes for a request with ahead_count requests ahead."""
+    
+    # Assume ~5 minutes per request ahead
+    base_wait = ahead_count * 5
+    
+    # Adjust by priority
+    if priority_rank == Priority.URGENT:
+        return max(2, base_wait // 2)
+    elif priority_rank == Priority.HIGH:
+        return max(5, base_wait)
+    else:
+        return base_wait + 5
 
 
 class HandoffQueue:
     """
     Manages the queue of pending handoff requests.
     
-    In production, this would be backed by Redis or a database.
-    For demo purposes, we use in-memory storage.
+    Keeps everything in this process's memory - see RedisHandoffQueue
+    for a queue shared by several workers.
+    
+    Waiting requests are also indexed per priority, in arrival order, so
+    queue positions, wait estimates and pending counts don't have to scan
+    (and sort) every request ever queued.
     """
     
     def __init__(self):
         self._queue: dict[str, HandoffRequest] = {}
         self._by_conversation: dict[str, str] = {}  # conversation_id -> request_id
+        
+        # priority rank -> arrival numbers of its QUEUED requests (always sorted)
+        self._waiting: list[list[int]] = [[] for _ in Priority]
+        self._arrival: dict[str, int] = {}  # request_id -> arrival number, while queued
+        self._arrivals = count()
     
     def add(
         self,
@@ -76,8 +189,8 @@ class HandoffQueue:
         """Add a new handoff request to the queue."""
         
         # Check if conversation already has a pending request
-        if conversation_id in self._by_conversation:
-            existing_id = self._by_conversation[conversation_id]
+        existing_id = self._by_conversation.get(conversation_id)
+        if existing_id is not None:
             existing = self._queue.get(existing_id)
             if existing and existing.status == HandoffStatus.QUEUED:
                 logger.info("handoff_already_queued", conversation_id=conversation_id)
@@ -95,6 +208,7 @@ class HandoffQueue:
         
         self._queue[request.request_id] = request
         self._by_conversation[conversation_id] = request.request_id
+        self._enqueue(request)
         
         logger.info(
             "handoff_queued",
@@ -106,31 +220,31 @@ class HandoffQueue:
         
         return request
     
+    def _enqueue(self, request: HandoffRequest) -> None:
+        """Index a newly queued request behind everything already waiting."""
+        arrival = next(self._arrivals)
+        self._arrival[request.request_id] = arrival
+        self._waiting[request.priority_rank].append(arrival)
+    
+    def _dequeue(self, request: HandoffRequest) -> None:
+        """Drop a request from the waiting index once it leaves the queue."""
+        arrival = self._arrival.pop(request.request_id, None)
+        if arrival is None:
+            return
+        
+        waiting = self._waiting[request.priority_rank]
+        del waiting[bisect_left(waiting, arrival)]
+    
+    def _waiting_ahead(self, priority_rank: Priority, inclusive: bool) -> int:
+        """Count waiting requests with a higher (or, if inclusive, equal) priority."""
+        return sum(map(len, self._waiting[:priority_rank + inclusive]))
+    
     def _estimate_wait_time(self, priority: str) -> int:
         """Estimate wait time based on queue and priority."""
+        rank = PRIORITY_ORDER.get(priority, Priority.MEDIUM)
         
         # Count requests ahead in queue by priority
-        queued = [r for r in self._queue.values() if r.status == HandoffStatus.QUEUED]
-        
-        # Priority weights (urgent gets served first)
-        priority_order = {"urgent": 0, "high": 1, "medium": 2, "low": 3}
-        my_priority = priority_order.get(priority, 2)
-        
-        ahead_count = sum(
-            1 for r in queued 
-            if priority_order.get(r.priority, 2) <= my_priority
-        )
-        
-        # Assume ~5 minutes per request ahead
-        base_wait = ahead_count * 5
-        
-        # Adjust by priority
-        if priority == "urgent":
-            return max(2, base_wait // 2)
-        elif priority == "high":
-            return max(5, base_wait)
-        else:
-            return base_wait + 5
+        return _wait_estimate(rank, self._waiting_ahead(rank, inclusive=True))
     
     def get(self, request_id: str) -> HandoffRequest | None:
         """Get a handoff request by ID."""
@@ -143,26 +257,23 @@ class HandoffQueue:
             return self._queue.get(request_id)
         return None
     
+    def link_ticket(self, request_id: str, ticket_id: str) -> None:
+        """Record the support ticket tracking a request."""
+        request = self._queue.get(request_id)
+        if request:
+            request.ticket_id = ticket_id
+    
     def get_queue_position(self, request_id: str) -> int:
         """Get position in queue (1-indexed)."""
         request = self._queue.get(request_id)
-        if not request or request.status != HandoffStatus.QUEUED:
+        arrival = self._arrival.get(request_id)
+        if not request or arrival is None:
             return 0
         
-        # Sort by priority then by created_at
-        priority_order = {"urgent": 0, "high": 1, "medium": 2, "low": 3}
-        
-        queued = [
-            r for r in self._queue.values() 
-            if r.status == HandoffStatus.QUEUED
-        ]
-        queued.sort(key=lambda r: (priority_order.get(r.priority, 2), r.created_at))
-        
-        for i, r in enumerate(queued, 1):
-            if r.request_id == request_id:
-                return i
-        
-        return 0
+        # Everyone with a higher priority, then those of the same
+        # priority who arrived earlier
+        ahead = self._waiting_ahead(request.priority_rank, inclusive=False)
+        return ahead + bisect_left(self._waiting[request.priority_rank], arrival) + 1
     
     def assign(self, request_id: str, agent_id: str) -> HandoffRequest | None:
         """Assign a request to a human agent."""
@@ -170,10 +281,10 @@ class HandoffQueue:
         if not request:
             return None
         
+        self._dequeue(request)
         request.status = HandoffStatus.ASSIGNED
         request.assigned_agent = agent_id
-        request.assigned_at = datetime.now(timezone.utc).isoformat()
-        request.updated_at = datetime.now(timezone.utc).isoformat()
+        request.assigned_at = request.updated_at = time.time_ns()
         
         logger.info(
             "handoff_assigned",
@@ -189,36 +300,249 @@ class HandoffQueue:
         if not request:
             return None
         
+        self._dequeue(request)
         request.status = HandoffStatus.RESOLVED
-        request.resolved_at = datetime.now(timezone.utc).isoformat()
-        request.updated_at = datetime.now(timezone.utc).isoformat()
+        request.resolved_at = request.updated_at = time.time_ns()
         
         # Clean up conversation mapping
-        if request.conversation_id in self._by_conversation:
-            del self._by_conversation[request.conversation_id]
+        self._by_conversation.pop(request.conversation_id, None)
         
         logger.info("handoff_resolved", request_id=request_id)
         
         return request
     
     def get_pending_count(self) -> dict[str, int]:
-        """Get count of pending requests by priority."""
-        counts = {"urgent": 0, "high": 0, "medium": 0, "low": 0}
+        """Get count of pending requests by priority (no scan of the queue)."""
+        return {name: len(self._waiting[rank]) for name, rank in PRIORITY_ORDER.items()}
+
+
+class RedisHandoffQueue:
+    """
+    The handoff queue kept in Redis, shared by every API worker.
+    
+    Same interface as HandoffQueue. Waiting requests live in one sorted
+    set scored by priority rank, then arrival, so positions (ZRANK) and
+    counts (ZCOUNT over a rank's score range) are O(log N) on the
+    server. Request bodies are JSON strings; resolved ones expire.
+    """
+    
+    KEY_PREFIX = "handoff:"
+    
+    # Arrivals within a rank stay below this, keeping scores exact doubles
+    _RANK_SPAN = 2 ** 40
+    
+    def __init__(self, client):
+        self._client = client
+        self._waiting_key = f"{self.KEY_PREFIX}waiting"
+        self._arrivals_key = f"{self.KEY_PREFIX}arrivals"
+    
+    def _request_key(self, request_id: str) -> str:
+        return f"{self.KEY_PREFIX}req:{request_id}"
+    
+    def _conversation_key(self, conversation_id: str) -> str:
+        return f"{self.KEY_PREFIX}conv:{conversation_id}"
+    
+    def _save(self, request: HandoffRequest, pipe=None) -> None:
+        """Write a request, as part of pipe when one is given."""
+        target = self._client if pipe is None else pipe
+        target.set(self._request_key(request.request_id), _dump_request(request))
+    
+    def _waiting_below(self, score_limit: int) -> int:
+        """Count waiting requests scored below score_limit."""
+        return self._client.zcount(self._waiting_key, "-inf", f"({score_limit}")
+    
+    def add(
+        self,
+        conversation_id: str,
+        customer_id: str,
+        priority: str,
+        triggers: list[str],
+        reason: str,
+        ticket_id: str | None = None,
+    ) -> HandoffRequest:
+        """
+        Add a new handoff request to the queue.
+        
+        The conversation key is WATCHed while it's checked, so when two
+        workers add for the same conversation at once only one request is
+        queued and the other worker gets that request back.
+        """
+        rank = PRIORITY_ORDER.get(priority, Priority.MEDIUM)
+        request = HandoffRequest(
+            conversation_id=conversation_id,
+            customer_id=customer_id,
+            ticket_id=ticket_id,
+            priority=priority,
+            triggers=triggers,
+            reason=reason,
+            estimated_wait=_wait_estimate(rank, self._waiting_below((rank + 1) * self._RANK_SPAN)),
+        )
         
-        for request in self._queue.values():
-            if request.status == HandoffStatus.QUEUED:
-                counts[request.priority] = counts.get(request.priority, 0) + 1
+        arrival = self._client.incr(self._arrivals_key)
+        conversation_key = self._conversation_key(conversation_id)
         
-        return counts
+        with self._client.pipeline(transaction=True) as pipe:
+            while True:
+                try:
+                    pipe.watch(conversation_key)
+                    
+                    # Check if conversation already has a pending request
+                    existing_id = pipe.get(conversation_key)
+                    existing = self.get(existing_id.decode("utf-8")) if existing_id else None
+                    if existing and existing.status == HandoffStatus.QUEUED:
+                        pipe.unwatch()
+                        logger.info("handoff_already_queued", conversation_id=conversation_id)
+                        return existing
+                    
+                    pipe.multi()
+                    self._save(request, pipe)
+                    pipe.set(conversation_key, request.request_id)
+                    pipe.zadd(self._waiting_key, {request.request_id: rank * self._RANK_SPAN + arrival})
+                    pipe.execute()
+                    break
+                except redis.WatchError:
+                    # Another worker claimed the conversation first - look again
+                    continue
+        
+        logger.info(
+            "handoff_queued",
+            request_id=request.request_id,
+            conversation_id=conversation_id,
+            priority=priority,
+            position=self.get_queue_position(request.request_id)
+        )
+        
+        return request
+    
+    def get(self, request_id: str) -> HandoffRequest | None:
+        """Get a handoff request by ID."""
+        data = self._client.get(self._request_key(request_id))
+        return _load_request(data) if data else None
+    
+    def get_by_conversation(self, conversation_id: str) -> HandoffRequest | None:
+        """Get the handoff request for a conversation."""
+        request_id = self._client.get(self._conversation_key(conversation_id))
+        if request_id:
+            return self.get(request_id.decode("utf-8"))
+        return None
+    
+    def link_ticket(self, request_id: str, ticket_id: str) -> None:
+        """Record the support ticket tracking a request."""
+        request = self.get(request_id)
+        if request:
+            request.ticket_id = ticket_id
+            self._save(request)
+    
+    def get_queue_position(self, request_id: str) -> int:
+        """Get position in queue (1-indexed)."""
+        rank = self._client.zrank(self._waiting_key, request_id)
+        return 0 if rank is None else rank + 1
+    
+    def assign(self, request_id: str, agent_id: str) -> HandoffRequest | None:
+        """Assign a request to a human agent."""
+        request = self.get(request_id)
+        if not request:
+            return None
+        
+        request.status = HandoffStatus.ASSIGNED
+        request.assigned_agent = agent_id
+        request.assigned_at = request.updated_at = time.time_ns()
+        
+        with self._client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._waiting_key, request_id)
+            self._save(request, pipe)
+            pipe.execute()
+        
+        logger.info(
+            "handoff_assigned",
+            request_id=request_id,
+            agent_id=agent_id
+        )
+        
+        return request
+    
+    def resolve(self, request_id: str, resolution: str = "resolved") -> HandoffRequest | None:
+        """Mark a handoff request as resolved."""
+        request = self.get(request_id)
+        if not request:
+            return None
+        
+        request.status = HandoffStatus.RESOLVED
+        request.resolved_at = request.updated_at = time.time_ns()
+        
+        with self._client.pipeline(transaction=True) as pipe:
+            pipe.zrem(self._waiting_key, request_id)
+            self._save(request, pipe)
+            pipe.expire(self._request_key(request_id), settings.conversation_ttl_seconds)
+            pipe.delete(self._conversation_key(request.conversation_id))
+            pipe.execute()
+        
+        logger.info("handoff_resolved", request_id=request_id)
+        
+        return request
+    
+    def get_pending_count(self) -> dict[str, int]:
+        """Get count of pending requests by priority."""
+        with self._client.pipeline(transaction=False) as pipe:
+            for rank in PRIORITY_ORDER.values():
+                pipe.zcount(
+                    self._waiting_key,
+                    rank * self._RANK_SPAN,
+                    f"({(rank + 1) * self._RANK_SPAN}"
+                )
+            counts = pipe.execute()
+        return dict(zip(PRIORITY_ORDER, counts))
+
+
+def _dump_request(request: HandoffRequest) -> bytes:
+    """Encode a request for storage, keeping its raw timestamps."""
+    return _json_dumps({f.name: getattr(request, f.name) for f in fields(request) if f.init})
+
+
+def _load_request(data: bytes) -> HandoffRequest:
+    """Decode a request written by _dump_request."""
+    values = json.loads(data)
+    values["status"] = HandoffStatus(values["status"])
+    return HandoffRequest(**values)
 
 
 # Singleton instance
-_handoff_queue: HandoffQueue | None = None
+_handoff_queue: HandoffQueue | RedisHandoffQueue | None = None
 
 
-def get_handoff_queue() -> HandoffQueue:
+def get_handoff_queue() -> HandoffQueue | RedisHandoffQueue:
     """Get or create the global handoff queue."""
     global _handoff_queue
     if _handoff_queue is None:
-        _handoff_queue = HandoffQueue()
+        _handoff_queue = _create_handoff_queue()
     return _handoff_queue
+
+
+def _create_handoff_queue() -> HandoffQueue | RedisHandoffQueue:
+    """
+    Create the queue for settings.handoff_backend.
+    
+    Falls back to the in-memory queue when Redis isn't installed,
+    configured or reachable, like the conversation store does.
+    """
+    if settings.handoff_backend == "redis":
+        if redis is None or not settings.redis_url:
+            logger.warning(
+                "handoff_redis_unavailable",
+                message="HANDOFF_BACKEND=redis needs the redis package and REDIS_URL"
+            )
+        else:
+            client = redis.Redis.from_url(
+                settings.redis_url,
+                max_connections=settings.redis_max_connections,
+            )
+            try:
+                client.ping()
+                logger.info("handoff_queue_ready", backend="redis")
+                return RedisHandoffQueue(client)
+            except Exception as e:
+                logger.warning("handoff_redis_connection_failed", error=str(e))
+                client.close()
+    
+    logger.info("handoff_queue_ready", backend="memory")
+    return HandoffQueue()
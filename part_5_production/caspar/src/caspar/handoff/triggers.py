@@ -7,15 +7,65 @@ Escalation Trigger Detection
 Identifies situations that require human intervention.
 """
 
+from bisect import bisect_right
+from collections.abc import Iterable
+from dataclasses import dataclass
 from enum import Enum
-from pydantic import BaseModel
+from functools import lru_cache
+from itertools import accumulate
+import re
 from langchain_core.messages import HumanMessage
 
 from caspar.config import settings, get_logger
 
+try:
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
 logger = get_logger(__name__)
 
 
+# Phrases that need a human, matched anywhere in the message
+# (so "scammed" still matches "scam")
+SENSITIVE_KEYWORDS = (
+    "lawyer", "lawsuit", "legal action", "sue",
+    "police", "fraud", "scam", "stolen",
+    "safety", "dangerous", "injury", "injured", "hurt",
+    "discrimination", "harassment",
+    "cancel account", "delete my data", "gdpr",
+)
+
+
+def _build_sensitive_matcher():
+    """
+    Build a scanner that finds every sensitive keyword in one pass.
+    
+    Uses an Aho-Corasick automaton when `pyahocorasick` is installed, and a
+    single compiled alternation otherwise - either way there is one scan
+    over the message instead of one per keyword.
+    
+    Returns (prepare, find): `prepare` puts a message in the form the
+    scanner expects, and `find` yields an offset inside each match.
+    """
+    if ahocorasick is not None:
+        automaton = ahocorasick.Automaton()
+        for keyword in SENSITIVE_KEYWORDS:
+            automaton.add_word(keyword, keyword)
+        automaton.make_automaton()
+        return str.lower, lambda text: (end for end, _ in automaton.iter(text))
+    
+    pattern = re.compile("|".join(map(re.escape, SENSITIVE_KEYWORDS)), re.IGNORECASE)
+    return (lambda message: message), lambda text: (match.start() for match in pattern.finditer(text))
+
+
+_prepare_for_scan, _find_sensitive_keywords = _build_sensitive_matcher()
+
+# Joins messages for a batch scan - no keyword contains it, so no match
+# can run from one message into the next
+_BATCH_SEPARATOR = "\x01"
+
+
 class EscalationTrigger(str, Enum):
     """Types of escalation triggers."""
     
@@ -29,13 +79,36 @@ class EscalationTrigger(str, Enum):
     MAX_TURNS_REACHED = "max_turns_reached"
 
 
-class EscalationResult(BaseModel):
+# Triggers that make a handoff urgent
+URGENT_TRIGGERS = frozenset({
+    EscalationTrigger.EXPLICIT_REQUEST,
+    EscalationTrigger.HIGH_FRUSTRATION,
+    EscalationTrigger.SENSITIVE_TOPIC,
+})
+
+# Triggers that make a handoff high priority
+HIGH_TRIGGERS = frozenset({
+    EscalationTrigger.VIP_CUSTOMER,
+    EscalationTrigger.POLICY_EXCEPTION,
+    EscalationTrigger.REPEATED_FAILURES,
+})
+
+# Loyalty tiers treated as VIP
+VIP_TIERS = frozenset({"gold", "platinum"})
+
+
+@dataclass(slots=True, frozen=True, kw_only=True)
+class EscalationResult:
     """Result of escalation check."""
     
     should_escalate: bool
-    triggers: list[EscalationTrigger]
+    triggers: frozenset[EscalationTrigger]
     priority: str  # "low", "medium", "high", "urgent"
     reason: str
+    
+    def trigger_values(self) -> list[str]:
+        """Trigger names in declaration order (set order varies between runs)."""
+        return [trigger.value for trigger in EscalationTrigger if trigger in self.triggers]
 
 
 def check_escalation_triggers(
@@ -52,12 +125,17 @@ def check_escalation_triggers(
     Returns:
         EscalationResult with triggers found and recommended priority
     """
-    triggers = []
+    triggers = set()
     reasons = []
+    intent = state.get("intent")
+    
+    # Every check runs even once the priority is urgent: the later
+    # triggers (e.g. VIP) decide which agents are notified and what the
+    # handoff context suggests.
     
     # Check explicit request (already classified as handoff_request)
-    if state.get("intent") == "handoff_request":
-        triggers.append(EscalationTrigger.EXPLICIT_REQUEST)
+    if intent == "handoff_request":
+        triggers.add(EscalationTrigger.EXPLICIT_REQUEST)
         reasons.append("Customer requested human agent")
     
     # Check frustration level (handle None values)
@@ -67,32 +145,34 @@ def check_escalation_triggers(
     frustration = state.get("frustration_level") or "low"
     
     if sentiment < settings.sentiment_threshold or frustration == "high":
-        triggers.append(EscalationTrigger.HIGH_FRUSTRATION)
+        triggers.add(EscalationTrigger.HIGH_FRUSTRATION)
         reasons.append(f"High frustration detected (sentiment: {sentiment})")
     
     # Check turn count
     turn_count = state.get("turn_count") or 0
     if turn_count >= settings.max_conversation_turns:
-        triggers.append(EscalationTrigger.MAX_TURNS_REACHED)
+        triggers.add(EscalationTrigger.MAX_TURNS_REACHED)
         reasons.append(f"Conversation exceeded {settings.max_conversation_turns} turns")
     
     # Check for VIP customer
-    if customer_tier in ["gold", "platinum"]:
+    if customer_tier in VIP_TIERS:
         # VIP customers get faster escalation on any issue
-        if state.get("intent") == "complaint" or frustration in ["medium", "high"]:
-            triggers.append(EscalationTrigger.VIP_CUSTOMER)
+        if intent == "complaint" or frustration in ("medium", "high"):
+            triggers.add(EscalationTrigger.VIP_CUSTOMER)
             reasons.append(f"VIP customer ({customer_tier} tier) with issue")
     
     # Check for policy exceptions (would need order info)
     order_info = state.get("order_info") or {}
     if order_info.get("full_order"):
         order_total = order_info["full_order"].get("total", 0)
-        if order_total > 500 and state.get("intent") == "complaint":
-            triggers.append(EscalationTrigger.POLICY_EXCEPTION)
+        if order_total > 500 and intent == "complaint":
+            triggers.add(EscalationTrigger.POLICY_EXCEPTION)
             reasons.append(f"High-value order (${order_total}) with complaint")
     
+    triggers = frozenset(triggers)
+    
     # Determine priority based on triggers
-    priority = _calculate_priority(triggers)
+    priority = _priority_for(triggers)
     
     result = EscalationResult(
         should_escalate=len(triggers) > 0,
@@ -104,36 +184,23 @@ def check_escalation_triggers(
     if result.should_escalate:
         logger.info(
             "escalation_triggers_detected",
-            triggers=[t.value for t in triggers],
+            triggers=result.trigger_values(),
             priority=priority
         )
     
     return result
 
 
-def _calculate_priority(triggers: list[EscalationTrigger]) -> str:
-    """Calculate escalation priority based on triggers."""
+@lru_cache(maxsize=256)
+def _priority_for(triggers: frozenset[EscalationTrigger]) -> str:
+    """Priority for a set of triggers - there are only 2^8 possible sets."""
     
     if not triggers:
         return "low"
     
-    # Urgent triggers
-    urgent_triggers = {
-        EscalationTrigger.EXPLICIT_REQUEST,
-        EscalationTrigger.HIGH_FRUSTRATION,
-        EscalationTrigger.SENSITIVE_TOPIC,
-    }
-    
-    # High priority triggers
-    high_triggers = {
-        EscalationTrigger.VIP_CUSTOMER,
-        EscalationTrigger.POLICY_EXCEPTION,
-        EscalationTrigger.REPEATED_FAILURES,
-    }
-    
-    if any(t in urgent_triggers for t in triggers):
+    if triggers & URGENT_TRIGGERS:
         return "urgent"
-    elif any(t in high_triggers for t in triggers):
+    elif triggers & HIGH_TRIGGERS:
         return "high"
     elif len(triggers) >= 2:
         # Multiple medium triggers escalate to high
@@ -144,14 +211,22 @@ def _calculate_priority(triggers: list[EscalationTrigger]) -> str:
 
 def check_sensitive_topics(message: str) -> bool:
     """Check if message contains sensitive topics requiring human handling."""
+    return next(_find_sensitive_keywords(_prepare_for_scan(message)), None) is not None
+
+
+def check_sensitive_topics_batch(messages: Iterable[str]) -> list[bool]:
+    """
+    Check several messages for sensitive topics with a single scan.
+    
+    Returns one flag per message, in order - the same answers as calling
+    check_sensitive_topics() on each.
+    """
+    prepared = [_prepare_for_scan(message) for message in messages]
     
-    sensitive_keywords = [
-        "lawyer", "lawsuit", "legal action", "sue",
-        "police", "fraud", "scam", "stolen",
-        "safety", "dangerous", "injury", "injured", "hurt",
-        "discrimination", "harassment",
-        "cancel account", "delete my data", "gdpr",
-    ]
+    # Offset where each message starts in the joined text
+    starts = list(accumulate((len(message) + 1 for message in prepared[:-1]), initial=0))
     
-    message_lower = message.lower()
-    return any(keyword in message_lower for keyword in sensitive_keywords)
+    flagged = [False] * len(prepared)
+    for offset in _find_sensitive_keywords(_BATCH_SEPARATOR.join(prepared)):
+        flagged[bisect_right(starts, offset) - 1] = True
+    return flagged
@@ -3,7 +3,11 @@
 
 """CASPAR Knowledge Base Module"""
 
+from .batching import BatchingEmbedder
+from .embedding_cache import CachedEmbeddings
 from .loader import KnowledgeLoader
 from .retriever import KnowledgeRetriever, get_retriever
 
-__all__ = ["KnowledgeLoader", "KnowledgeRetriever", "get_retriever"]
+# The FAISS backend (caspar.knowledge.faiss_backend) isn't imported here:
+# get_retriever() loads it only when RETRIEVAL_BACKEND=faiss
+__all__ = ["BatchingEmbedder", "CachedEmbeddings", "KnowledgeLoader", "KnowledgeRetriever", "get_retriever"]
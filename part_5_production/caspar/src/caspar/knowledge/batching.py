@@ -0,0 +1,150 @@
+# File: src/caspar/knowledge/batching.py
+
+"""
+Micro-batched Query Embedding
+
+Under load many conversations search the knowledge base at the same time,
+and each search needs its query embedded. Instead of one API request per
+query, BatchingEmbedder collects the queries that arrive within a few
+milliseconds of each other and embeds them in a single request.
+
+Bulk embedding (building the knowledge base) goes the other way:
+embed_documents_concurrently() splits the texts into full-size requests
+and keeps several in flight at once.
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import random
+import time
+
+from langchain_core.embeddings import Embeddings
+
+from caspar.config import get_logger
+
+logger = get_logger(__name__)
+
+
+class BatchingEmbedder:
+    """
+    Coalesces concurrent embed() calls into batched embedding requests.
+    
+    A background task on the running event loop waits for the first
+    query, then keeps collecting for up to window_ms (or until batch_size
+    queries are waiting) before sending them all at once.
+    """
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        batch_size: int = 64,
+        window_ms: float = 10.0
+    ):
+        """
+        Initialize the batching embedder.
+        
+        Args:
+            embeddings: The underlying embeddings model
+            batch_size: Maximum queries per embedding request
+            window_ms: How long to wait for more queries after the first
+        """
+        self.embeddings = embeddings
+        self.batch_size = batch_size
+        self.window = window_ms / 1000
+        
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()  # Keeps batch tasks referenced
+    
+    async def embed(self, text: str) -> list[float]:
+        """Embed one query, sharing the API request with concurrent callers."""
+        loop = asyncio.get_running_loop()
+        self._ensure_worker(loop)
+        
+        future = loop.create_future()
+        self._queue.put_nowait((text, future))
+        return await future
+    
+    def _ensure_worker(self, loop: asyncio.AbstractEventLoop) -> None:
+        """Start the collector task, or restart it on a new event loop."""
+        if self._loop is loop and self._worker is not None and not self._worker.done():
+            return
+        
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._worker = loop.create_task(self._collect())
+    
+    async def _collect(self) -> None:
+        """Gather queued queries into batches and dispatch them."""
+        loop = asyncio.get_running_loop()
+        
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            
+            while len(batch) < self.batch_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), remaining))
+                except asyncio.TimeoutError:
+                    break
+            
+            # Don't hold up the next batch while this one is in flight
+            task = loop.create_task(self._embed_batch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+    
+    async def _embed_batch(self, batch: list[tuple[str, asyncio.Future]]) -> None:
+        """Embed a batch and hand each caller its vector."""
+        try:
+            vectors = await self.embeddings.aembed_documents([text for text, _ in batch])
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        
+        for (_, future), vector in zip(batch, vectors):
+            # Callers may have been cancelled while we waited
+            if not future.done():
+                future.set_result(vector)
+        
+        logger.debug("query_batch_embedded", size=len(batch))
+
+
+def embed_documents_concurrently(
+    embeddings: Embeddings,
+    texts: list[str],
+    request_size: int,
+    max_workers: int = 5,
+    jitter_seconds: float = 0.05
+) -> list[list[float]]:
+    """
+    Embed many texts as parallel requests of up to request_size texts.
+    
+    Used when building the knowledge base: with K requests and max_workers
+    in flight, wall time is about ceil(K / max_workers) round-trips instead
+    of K. Each request starts after a small random delay so they don't all
+    hit the rate limiter at the same instant; 429 retries (honoring
+    Retry-After) are left to the OpenAI client.
+    
+    Returns:
+        One vector per text, in the same order as texts
+    """
+    chunks = [texts[start:start + request_size] for start in range(0, len(texts), request_size)]
+    if len(chunks) <= 1 or max_workers <= 1:
+        return embeddings.embed_documents(texts)
+    
+    def embed_chunk(chunk: list[str]) -> list[list[float]]:
+        time.sleep(random.uniform(0, jitter_seconds))
+        return embeddings.embed_documents(chunk)
+    
+    with ThreadPoolExecutor(max_workers=min(max_workers, len(chunks)), thread_name_prefix="embed") as executor:
+        results = list(executor.map(embed_chunk, chunks))
+    
+    logger.info("embedding_requests_completed", requests=len(chunks), texts=len(texts))
+    
+    return [vector for chunk_vectors in results for vector in chunk_vectors]
@@ -0,0 +1,260 @@
+# File: src/caspar/knowledge/embedding_cache.py
+
+"""
+Persistent Embedding Cache
+
+Wraps an embeddings model so each distinct text is only embedded once,
+even across process restarts. Recently used vectors are kept in an
+in-memory LRU; behind it, vectors are stored in a small SQLite file
+keyed by a hash of the model name and the text.
+
+Vectors can be stored as float32 (exact) or int8 with a per-vector scale
+(about 4x smaller, with a tiny reconstruction error). The file is capped
+at max_entries vectors; the oldest are pruned when it's opened.
+"""
+
+from collections import OrderedDict
+from pathlib import Path
+import hashlib
+import sqlite3
+import threading
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+from caspar.config import get_logger
+
+logger = get_logger(__name__)
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that checks its caches before calling the model.
+    
+    Cache hits cost a dict or SQLite lookup instead of an API round-trip,
+    so repeat queries and re-running scripts and tests are nearly free.
+    """
+    
+    def __init__(
+        self,
+        embeddings: Embeddings,
+        cache_path: str | None = None,
+        vector_dtype: str = "float32",
+        memory_capacity: int = 10_000,
+        max_entries: int | None = None
+    ):
+        """
+        Initialize the cached embeddings.
+        
+        Args:
+            embeddings: The underlying embeddings model
+            cache_path: Path to the SQLite cache file (created if missing);
+                None keeps the cache in memory only
+            vector_dtype: Storage format for cached vectors ("float32" or "int8")
+            memory_capacity: Vectors kept in the in-memory LRU (0 to disable)
+            max_entries: Vectors kept in the SQLite file (None for no limit)
+        """
+        if vector_dtype not in VECTOR_CODECS:
+            raise ValueError(
+                f"Unsupported vector_dtype {vector_dtype!r}, "
+                f"expected one of {sorted(VECTOR_CODECS)}"
+            )
+        
+        self.embeddings = embeddings
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.vector_dtype = vector_dtype
+        self.memory_capacity = memory_capacity
+        self.max_entries = max_entries
+        
+        # Part of every key, so switching models (or storage formats)
+        # never returns vectors encoded some other way
+        self.model_name = getattr(embeddings, "model", type(embeddings).__name__)
+        
+        self._memory: OrderedDict[str, list[float]] = OrderedDict()
+        self._conn: sqlite3.Connection | None = None
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+    
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        """Embed documents, only calling the model for uncached texts."""
+        if not texts:
+            return []
+        
+        keys = [self._key(text) for text in texts]
+        
+        with self._lock:
+            cached = self._lookup_memory(keys)
+            if self.cache_path is not None and len(cached) < len(keys):
+                from_disk = self._lookup([key for key in keys if key not in cached])
+                self._remember(from_disk)
+                cached.update(from_disk)
+        
+        # Embed each distinct missing text once, in a single model call
+        missing = {key: text for key, text in zip(keys, texts) if key not in cached}
+        
+        if missing:
+            vectors = self.embeddings.embed_documents(list(missing.values()))
+            new_entries = dict(zip(missing.keys(), vectors))
+            
+            with self._lock:
+                if self.cache_path is not None:
+                    self._store(new_entries)
+                self._remember(new_entries)
+            
+            cached.update(new_entries)
+        
+        hits = len(texts) - len(missing)
+        with self._lock:
+            self._hits += hits
+            self._misses += len(missing)
+        
+        logger.debug(
+            "embedding_cache_lookup",
+            requested=len(texts),
+            hits=hits,
+            misses=len(missing)
+        )
+        
+        return [list(cached[key]) for key in keys]
+    
+    def cache_stats(self) -> dict[str, int]:
+        """Texts served from the cache (hits) vs. sent to the model (misses)."""
+        with self._lock:
+            return {"hits": self._hits, "misses": self._misses, "in_memory": len(self._memory)}
+    
+    def embed_query(self, text: str) -> list[float]:
+        """Embed a query, using the cache when possible."""
+        return self.embed_documents([text])[0]
+    
+    def _key(self, text: str) -> str:
+        """Cache key for a text under the current model and storage format."""
+        return hashlib.sha256(
+            f"{self.model_name}\0{self.vector_dtype}\0{text}".encode("utf-8")
+        ).hexdigest()
+    
+    def _lookup_memory(self, keys: list[str]) -> dict[str, list[float]]:
+        """Fetch vectors held in memory, marking them recently used."""
+        found = {}
+        for key in keys:
+            vector = self._memory.get(key)
+            if vector is not None:
+                self._memory.move_to_end(key)
+                found[key] = vector
+        return found
+    
+    def _remember(self, entries: dict[str, list[float]]) -> None:
+        """Keep vectors in memory, evicting the least recently used."""
+        if not self.memory_capacity:
+            return
+        
+        for key, vector in entries.items():
+            self._memory[key] = vector
+            self._memory.move_to_end(key)
+        
+        while len(self._memory) > self.memory_capacity:
+            self._memory.popitem(last=False)
+    
+    def _connection(self) -> sqlite3.Connection:
+        """Open the cache database on first use."""
+        if self._conn is None:
+            self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+            
+            # Nodes may embed from worker threads; access is serialized by _lock
+            self._conn = sqlite3.connect(str(self.cache_path), check_same_thread=False)
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS embeddings (key TEXT PRIMARY KEY, vector BLOB NOT NULL)"
+            )
+            self._prune()
+        return self._conn
+    
+    def _prune(self) -> None:
+        """Drop the oldest stored vectors beyond max_entries."""
+        if not self.max_entries:
+            return
+        
+        # rowid grows with every insert (and re-insert), so lowest is oldest
+        with self._conn:
+            deleted = self._conn.execute(
+                "DELETE FROM embeddings WHERE rowid <= ("
+                "SELECT rowid FROM embeddings ORDER BY rowid DESC LIMIT 1 OFFSET ?"
+                ")",
+                (self.max_entries,)
+            ).rowcount
+        
+        if deleted:
+            logger.info("embedding_cache_pruned", deleted=deleted, kept=self.max_entries)
+    
+    def _lookup(self, keys: list[str]) -> dict[str, list[float]]:
+        """Fetch cached vectors for the given keys."""
+        conn = self._connection()
+        found = {}
+        
+        # Stay well under SQLite's bound-parameter limit
+        unique_keys = list(dict.fromkeys(keys))
+        for start in range(0, len(unique_keys), 500):
+            batch = unique_keys[start:start + 500]
+            placeholders = ",".join("?" * len(batch))
+            rows = conn.execute(
+                f"SELECT key, vector FROM embeddings WHERE key IN ({placeholders})",
+                batch
+            )
+            decode = VECTOR_CODECS[self.vector_dtype][1]
+            for key, blob in rows:
+                found[key] = decode(blob)
+        
+        return found
+    
+    def _store(self, entries: dict[str, list[float]]) -> None:
+        """Write new vectors to the cache in one transaction."""
+        conn = self._connection()
+        
+        encode = VECTOR_CODECS[self.vector_dtype][0]
+        with conn:
+            conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, vector) VALUES (?, ?)",
+                [(key, encode(vector)) for key, vector in entries.items()]
+            )
+
+
+# ════════════════════════════════════════════════════════════════════════════
+# Vector Encodings
+# ════════════════════════════════════════════════════════════════════════════
+
+def _encode_float32(vector: list[float]) -> bytes:
+    """Store as float32 - what the vector store keeps anyway."""
+    return np.asarray(vector, dtype=np.float32).tobytes()
+
+
+def _decode_float32(blob: bytes) -> list[float]:
+    return np.frombuffer(blob, dtype=np.float32).tolist()
+
+
+def _encode_int8(vector: list[float]) -> bytes:
+    """
+    Scalar-quantize to int8 with one float32 scale per vector.
+    
+    Layout: 4-byte scale followed by one signed byte per dimension.
+    """
+    values = np.asarray(vector, dtype=np.float32)
+    scale = np.float32(np.abs(values).max() / 127) if values.size else np.float32(0)
+    
+    if scale == 0:
+        codes = np.zeros(values.shape, dtype=np.int8)
+    else:
+        codes = np.clip(np.rint(values / scale), -127, 127).astype(np.int8)
+    
+    return scale.tobytes() + codes.tobytes()
+
+
+def _decode_int8(blob: bytes) -> list[float]:
+    scale = np.frombuffer(blob[:4], dtype=np.float32)[0]
+    codes = np.frombuffer(blob[4:], dtype=np.int8)
+    return (codes.astype(np.float32) * scale).tolist()
+
+
+# dtype name -> (encode, decode)
+VECTOR_CODECS = {
+    "float32": (_encode_float32, _decode_float32),
+    "int8": (_encode_int8, _decode_int8),
+}
@@ -0,0 +1,341 @@
+# File: src/caspar/knowledge/faiss_backend.py
+
+"""
+Exact (Flat) Vector Search Backend
+
+The knowledge base is a few hundred chunks, and at that size an HNSW graph
+is pure overhead: scoring every chunk with one matrix-vector product is both
+faster and exact. FAISSRetriever keeps the normalized chunk vectors in
+memory and searches them by inner product (= cosine similarity).
+
+Uses faiss's IndexFlatIP when the optional `faiss-cpu` package is installed,
+and the same search in numpy otherwise. Select it with
+RETRIEVAL_BACKEND=faiss; the index is rebuilt at startup, which the
+embedding cache keeps cheap.
+"""
+
+import asyncio
+
+import numpy as np
+from langchain_core.documents import Document
+
+from caspar.config import settings, get_logger
+from .batching import embed_documents_concurrently
+from .loader import KnowledgeLoader
+from .retriever import KnowledgeRetriever
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+logger = get_logger(__name__)
+
+# Storage formats for the index vectors (int8 also keeps a float32 scale per row)
+VECTOR_DTYPES = {"float32": np.float32, "float16": np.float16, "int8": np.int8}
+
+
+class FlatVectorIndex:
+    """
+    Exact inner-product index over unit-normalized vectors.
+    
+    Texts and metadata are kept in lists parallel to the vector rows.
+    Scores returned by search() are cosine distances (1 - similarity),
+    so lower means more similar, the same as the Chroma backend.
+    
+    Vectors can be held as float32, float16 (half the memory) or int8 (a
+    quarter); the reduced formats cost a little precision in the scores but
+    almost never change the ranking. They're stored once: in a faiss index
+    when faiss is installed, in a numpy matrix (int8 with a per-vector
+    scale) otherwise.
+    """
+    
+    def __init__(
+        self,
+        vectors: list[list[float]],
+        documents: list[Document],
+        dtype: str = "float32"
+    ):
+        if dtype not in VECTOR_DTYPES:
+            raise ValueError(f"dtype must be one of {sorted(VECTOR_DTYPES)}, got {dtype!r}")
+        
+        self.documents = documents
+        self.dtype = dtype
+        
+        matrix = _normalize(np.asarray(vectors, dtype=np.float32).reshape(len(documents), -1)) \
+            if documents else np.zeros((0, 0), dtype=np.float32)
+        
+        self.matrix: np.ndarray | None = None
+        self._scales = None
+        self._faiss_index = None
+        
+        if faiss is not None and len(documents):
+            self._faiss_index = _build_faiss_index(matrix, dtype)
+        elif dtype == "int8":
+            # int8 rows are stored as codes * scale, one scale per row
+            self._scales = np.abs(matrix).max(axis=1) / 127 if len(matrix) else np.zeros(0, np.float32)
+            safe_scales = np.where(self._scales == 0, 1, self._scales)[:, None]
+            self.matrix = np.clip(np.rint(matrix / safe_scales), -127, 127).astype(np.int8)
+        else:
+            self.matrix = matrix.astype(VECTOR_DTYPES[dtype], copy=False)
+    
+    def __len__(self) -> int:
+        return len(self.documents)
+    
+    @property
+    def nbytes(self) -> int:
+        """Memory held by the stored vectors."""
+        if self._faiss_index is not None:
+            return _faiss_index_bytes(self._faiss_index)
+        return self.matrix.nbytes + (self._scales.nbytes if self._scales is not None else 0)
+    
+    def search(
+        self,
+        queries: list[list[float]],
+        k: int,
+        where: dict | None = None
+    ) -> list[list[tuple[Document, float]]]:
+        """
+        Find the k nearest documents for each query vector.
+        
+        Args:
+            queries: Query embeddings
+            k: Number of documents per query
+            where: Optional metadata equality filter, e.g. {"category": "faq"}
+        
+        Returns:
+            One list of (Document, distance) tuples per query, nearest first
+        """
+        if not len(self) or not queries:
+            return [[] for _ in queries]
+        
+        q = _normalize(np.asarray(queries, dtype=np.float32).reshape(len(queries), -1))
+        
+        if where:
+            rows = np.fromiter(
+                (i for i, doc in enumerate(self.documents)
+                 if all(doc.metadata.get(key) == value for key, value in where.items())),
+                dtype=np.int64
+            )
+            if self._faiss_index is not None:
+                return self._faiss_search(q, k, rows)
+            return [self._top_k(scores, k, rows) for scores in self._similarities(q, rows)]
+        
+        if self._faiss_index is not None:
+            return self._faiss_search(q, k)
+        
+        return [self._top_k(scores, k) for scores in self._similarities(q)]
+    
+    def _faiss_search(
+        self,
+        q: np.ndarray,
+        k: int,
+        rows: np.ndarray | None = None
+    ) -> list[list[tuple[Document, float]]]:
+        """Search the faiss index, restricted to the given rows when there are any."""
+        params = None
+        if rows is not None:
+            if not len(rows):
+                return [[] for _ in q]
+            params = faiss.SearchParameters(sel=faiss.IDSelectorBatch(rows))
+        
+        k = min(k, len(self) if rows is None else len(rows))
+        similarities, indices = self._faiss_index.search(q, k, params=params)
+        return [
+            [(self.documents[i], float(1 - s)) for i, s in zip(row, sims) if i >= 0]
+            for row, sims in zip(indices, similarities)
+        ]
+    
+    def _similarities(self, q: np.ndarray, rows: np.ndarray | None = None) -> np.ndarray:
+        """Cosine similarity of each query to each (selected) row, as float32."""
+        matrix = self.matrix if rows is None else self.matrix[rows]
+        # numpy has no fast half/int8 matmul, so widen to float32 for the product
+        similarities = q @ matrix.astype(np.float32, copy=False).T
+        
+        if self._scales is not None:
+            similarities *= self._scales if rows is None else self._scales[rows]
+        
+        return similarities
+    
+    def _top_k(
+        self,
+        similarities: np.ndarray,
+        k: int,
+        rows: np.ndarray | None = None
+    ) -> list[tuple[Document, float]]:
+        """Pick the k best scores without sorting the whole array."""
+        k = min(k, len(similarities))
+        if k == 0:
+            return []
+        
+        best = np.argpartition(-similarities, k - 1)[:k]
+        best = best[np.argsort(-similarities[best])]
+        
+        positions = best if rows is None else rows[best]
+        return [
+            (self.documents[i], float(1 - similarities[j]))
+            for i, j in zip(positions, best)
+        ]
+
+
+class FAISSRetriever(KnowledgeRetriever):
+    """
+    KnowledgeRetriever that searches an in-memory flat index instead of Chroma.
+    
+    Embeddings, caching and query micro-batching are inherited unchanged;
+    only storage and search differ.
+    """
+    
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.index: FlatVectorIndex | None = None
+    
+    def initialize(
+        self,
+        force_reload: bool = False,
+        batch_size: int | None = None,
+        incremental: bool = False,
+        loader: KnowledgeLoader | None = None
+    ) -> None:
+        """
+        Load, embed and index the knowledge base.
+        
+        Args:
+            force_reload: Ignored - the index is always built fresh
+            batch_size: Ignored - there's no store to insert into in batches
+            incremental: Ignored - the index is always built fresh
+            loader: Loader to read the knowledge files with
+        """
+        documents = (loader or KnowledgeLoader()).load_and_split()
+        self.clear_cache()
+        self._initialized = True
+        
+        if not documents:
+            logger.warning("no_documents_to_embed")
+            self.index = FlatVectorIndex([], [])
+            return
+        
+        vectors = embed_documents_concurrently(
+            self.embeddings,
+            [doc.page_content for doc in documents],
+            request_size=settings.embedding_request_size,
+            max_workers=settings.embedding_max_concurrency
+        )
+        self.index = FlatVectorIndex(vectors, documents, dtype=settings.flat_index_dtype)
+        
+        logger.info(
+            "flat_index_built",
+            document_count=len(documents),
+            dtype=self.index.dtype,
+            index_bytes=self.index.nbytes,
+            engine="faiss" if faiss is not None else "numpy"
+        )
+    
+    def _search(
+        self,
+        queries: list[list[float]],
+        k: int | None,
+        category_filter: str | None = None
+    ) -> list[list[tuple[Document, float]]]:
+        where_filter = {"category": category_filter} if category_filter else None
+        return self.index.search(queries, k or settings.retrieval_k, where_filter)
+    
+    def retrieve(
+        self,
+        query: str,
+        k: int | None = None,
+        category_filter: str | None = None
+    ) -> list[Document]:
+        """Retrieve relevant documents for a query."""
+        if not self._initialized:
+            self.initialize()
+        
+        cache_key = (query, k or settings.retrieval_k, category_filter)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        results = self._search([self.embeddings.embed_query(query)], k, category_filter)[0]
+        
+        logger.info("documents_retrieved", query=query[:50], count=len(results))
+        
+        docs = [doc for doc, _ in results]
+        self._store_cached(cache_key, docs)
+        return docs
+    
+    async def aretrieve(
+        self,
+        query: str,
+        k: int | None = None,
+        category_filter: str | None = None
+    ) -> list[Document]:
+        """Async version of retrieve(); the query embedding is micro-batched."""
+        if not self._initialized:
+            await asyncio.to_thread(self.initialize)
+        
+        cache_key = (query, k or settings.retrieval_k, category_filter)
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        # Scoring a few hundred rows is sub-millisecond - no need for a thread
+        embedding = await self.query_embedder.embed(query)
+        results = self._search([embedding], k, category_filter)[0]
+        
+        logger.info("documents_retrieved", query=query[:50], count=len(results))
+        
+        docs = [doc for doc, _ in results]
+        self._store_cached(cache_key, docs)
+        return docs
+    
+    def retrieve_with_scores(
+        self,
+        query: str,
+        k: int | None = None
+    ) -> list[tuple[Document, float]]:
+        """Retrieve documents with cosine distances, lower = more similar."""
+        if not self._initialized:
+            self.initialize()
+        
+        return self._search([self.embeddings.embed_query(query)], k)[0]
+    
+    def retrieve_batch(
+        self,
+        queries: list[str],
+        k: int | None = None
+    ) -> list[list[tuple[Document, float]]]:
+        """Retrieve documents with scores for several queries in one matrix product."""
+        if not self._initialized:
+            self.initialize()
+        
+        if not queries:
+            return []
+        
+        return self._search(self.embeddings.embed_documents(queries), k)
+
+
+def _build_faiss_index(matrix: np.ndarray, dtype: str):
+    """IndexFlatIP for float32; a scalar-quantized inner-product index otherwise."""
+    if dtype == "float32":
+        index = faiss.IndexFlatIP(matrix.shape[1])
+    else:
+        quantizer = faiss.ScalarQuantizer.QT_fp16 if dtype == "float16" else faiss.ScalarQuantizer.QT_8bit
+        index = faiss.IndexScalarQuantizer(matrix.shape[1], quantizer, faiss.METRIC_INNER_PRODUCT)
+        index.train(matrix)
+    
+    index.add(matrix)
+    return index
+
+
+def _faiss_index_bytes(index) -> int:
+    """Memory held by a flat faiss index: its codes, plus the trained ranges if quantized."""
+    nbytes = index.sa_code_size() * index.ntotal
+    if isinstance(index, faiss.IndexScalarQuantizer):
+        nbytes += faiss.vector_to_array(index.sq.trained).nbytes
+    return nbytes
+
+
+def _normalize(matrix: np.ndarray) -> np.ndarray:
+    """Scale each row to unit length so inner product is cosine similarity."""
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return np.ascontiguousarray(matrix / np.where(norms == 0, 1, norms))
@@ -8,14 +8,59 @@ Loads and processes knowledge base documents from markdown files,
 splits them into chunks, and prepares them for embedding.
 """
 
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from pathlib import Path
+from typing import Callable, Iterable, Iterator, TypeVar
 from langchain_core.documents import Document
 from langchain_text_splitters import RecursiveCharacterTextSplitter
+import hashlib
 
 from caspar.config import get_logger
 
 logger = get_logger(__name__)
 
+T = TypeVar("T")
+
+# Files read at once - reads are I/O-bound, so threads overlap the waits
+MAX_READ_WORKERS = 32
+
+
+# Split on markdown headings first, then paragraphs, lines and words
+SEPARATORS = ("\n## ", "\n### ", "\n\n", "\n", " ", "")
+
+
+@lru_cache(maxsize=8)
+def get_text_splitter(chunk_size: int, chunk_overlap: int) -> RecursiveCharacterTextSplitter:
+    """
+    Get a shared text splitter for these settings.
+    
+    Splitters hold no per-document state, so every loader with the same
+    chunk settings can reuse one instead of building its own.
+    """
+    return RecursiveCharacterTextSplitter(
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap,
+        length_function=len,
+        separators=list(SEPARATORS)
+    )
+
+
+def _map_files(read: Callable[[Path], T], paths: list[Path]) -> list[T | Exception]:
+    """Apply read to every path in parallel, returning each result or error in order."""
+    
+    def attempt(path: Path) -> T | Exception:
+        try:
+            return read(path)
+        except Exception as e:
+            return e
+    
+    if len(paths) <= 1:
+        return [attempt(path) for path in paths]
+    
+    with ThreadPoolExecutor(max_workers=min(MAX_READ_WORKERS, len(paths))) as executor:
+        return list(executor.map(attempt, paths))
+
 
 class KnowledgeLoader:
     """
@@ -25,6 +70,14 @@ class KnowledgeLoader:
     splits them into manageable chunks, and prepares them for embedding.
     """
     
+    # File name (without .md) -> category stored in chunk metadata
+    _CATEGORY_MAP: dict[str, str] = {
+        "policies": "policy",
+        "products": "product",
+        "faq": "faq",
+        "troubleshooting": "troubleshooting",
+    }
+    
     def __init__(
         self,
         knowledge_dir: str = "data/knowledge_base",
@@ -43,20 +96,56 @@ class KnowledgeLoader:
         self.chunk_size = chunk_size
         self.chunk_overlap = chunk_overlap
         
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=chunk_size,
-            chunk_overlap=chunk_overlap,
-            length_function=len,
-            separators=["\n## ", "\n### ", "\n\n", "\n", " ", ""]
-        )
+        self.text_splitter = get_text_splitter(chunk_size, chunk_overlap)
+        
+        # Lengths of the chunks yielded by the last iter_chunks() run
+        self.chunk_lengths: list[int] = []
+    
+    def compute_digests(self) -> dict[str, str]:
+        """
+        Compute a SHA-256 digest of every markdown file.
+        
+        Used to tell which files changed since the vector store was built,
+        so only those need to be re-embedded.
+        
+        Returns:
+            Mapping of file name to hex digest
+        """
+        if not self.knowledge_dir.exists():
+            return {}
+        
+        md_files = list(self.knowledge_dir.glob("*.md"))
+        digests = _map_files(lambda path: hashlib.sha256(path.read_bytes()).hexdigest(), md_files)
+        
+        for digest in digests:
+            if isinstance(digest, Exception):
+                raise digest
+        
+        return {file_path.name: digest for file_path, digest in zip(md_files, digests)}
     
-    def load_documents(self) -> list[Document]:
+    def load_documents(self, only: Iterable[str] | None = None) -> list[Document]:
         """
-        Load all markdown files from the knowledge directory.
+        Load markdown files from the knowledge directory.
+        
+        Args:
+            only: Optional file names to load (default: all .md files)
         
         Returns:
             List of Document objects, each representing a chunk
         """
+        md_files = self._markdown_files(only)
+        contents = _map_files(lambda path: path.read_text(encoding="utf-8"), md_files)
+        
+        documents = []
+        for file_path, content in zip(md_files, contents):
+            doc = self._to_document(file_path, content)
+            if doc is not None:
+                documents.append(doc)
+        
+        return documents
+    
+    def _markdown_files(self, only: Iterable[str] | None = None) -> list[Path]:
+        """List the .md files to load, optionally limited to the given names."""
         if not self.knowledge_dir.exists():
             logger.warning(
                 "knowledge_dir_not_found",
@@ -64,77 +153,100 @@ class KnowledgeLoader:
             )
             return []
         
-        documents = []
         md_files = list(self.knowledge_dir.glob("*.md"))
         
+        if only is not None:
+            wanted = set(only)
+            md_files = [f for f in md_files if f.name in wanted]
+        
         logger.info(
             "loading_knowledge_base",
             file_count=len(md_files),
             directory=str(self.knowledge_dir)
         )
         
-        for file_path in md_files:
-            try:
-                content = file_path.read_text(encoding="utf-8")
-                
-                # Create document with metadata
-                doc = Document(
-                    page_content=content,
-                    metadata={
-                        "source": file_path.name,
-                        "category": self._extract_category(file_path.name)
-                    }
-                )
-                documents.append(doc)
-                
-                logger.debug(
-                    "loaded_file",
-                    file=file_path.name,
-                    size=len(content)
-                )
-                
-            except Exception as e:
-                logger.error(
-                    "file_load_error",
-                    file=file_path.name,
-                    error=str(e)
-                )
+        return md_files
+    
+    def _to_document(self, file_path: Path, content: str | Exception) -> Document | None:
+        """Wrap a file's content in a Document, or log and skip a failed read."""
+        if isinstance(content, Exception):
+            logger.error(
+                "file_load_error",
+                file=file_path.name,
+                error=str(content)
+            )
+            return None
         
-        return documents
+        logger.debug(
+            "loaded_file",
+            file=file_path.name,
+            size=len(content)
+        )
+        
+        # Create document with metadata
+        return Document(
+            page_content=content,
+            metadata={
+                "source": file_path.name,
+                "category": self._extract_category(file_path.name)
+            }
+        )
     
-    def load_and_split(self) -> list[Document]:
+    def load_and_split(self, only: Iterable[str] | None = None) -> list[Document]:
         """
         Load documents and split them into chunks.
         
+        Args:
+            only: Optional file names to load (default: all .md files)
+        
         Returns:
             List of chunked Document objects
         """
-        documents = self.load_documents()
+        return list(self.iter_chunks(only))
+    
+    def iter_chunks(self, only: Iterable[str] | None = None) -> Iterator[Document]:
+        """
+        Yield chunks one file at a time instead of building the whole list.
         
-        if not documents:
-            return []
+        Each file is read and split only when the previous file's chunks
+        have been consumed, so the embedding step holds one file and the
+        batch being embedded in memory rather than the whole knowledge base.
+        The length of every chunk yielded is kept in chunk_lengths.
         
-        chunks = self.text_splitter.split_documents(documents)
+        Args:
+            only: Optional file names to load (default: all .md files)
         
-        logger.info(
-            "documents_chunked",
-            original_docs=len(documents),
-            chunks=len(chunks),
-            avg_chunk_size=sum(len(c.page_content) for c in chunks) // len(chunks)
-        )
+        Yields:
+            Chunked Document objects, file by file
+        """
+        self.chunk_lengths = []
+        file_count = 0
+        
+        for file_path in self._markdown_files(only):
+            try:
+                content = file_path.read_text(encoding="utf-8")
+            except Exception as e:
+                content = e
+            
+            doc = self._to_document(file_path, content)
+            if doc is None:
+                continue
+            
+            file_count += 1
+            for chunk in self.text_splitter.split_documents([doc]):
+                self.chunk_lengths.append(len(chunk.page_content))
+                yield chunk
         
-        return chunks
+        if file_count:
+            chunk_count = len(self.chunk_lengths)
+            logger.info(
+                "documents_chunked",
+                original_docs=file_count,
+                chunks=chunk_count,
+                avg_chunk_size=sum(self.chunk_lengths) // chunk_count if chunk_count else 0
+            )
     
     def _extract_category(self, filename: str) -> str:
         """Extract category from filename for filtering."""
         # Remove .md extension and use as category
-        name = filename.replace(".md", "").lower()
-        
-        category_map = {
-            "policies": "policy",
-            "products": "product",
-            "faq": "faq",
-            "troubleshooting": "troubleshooting"
-        }
-        
-        return category_map.get(name, "general")
+        return self._CATEGORY_MAP.get(filename.removesuffix(".md").lower(), "general")
@@ -8,16 +8,28 @@ Handles embedding, storage, and retrieval of knowledge base content
 using ChromaDB for vector similarity search.
 """
 
+from itertools import islice
 from pathlib import Path
+from typing import Iterable
+import asyncio
+import json
+import os
 from langchain_openai import OpenAIEmbeddings
 from langchain_chroma import Chroma
 from langchain_core.documents import Document
+import uuid
 
 from caspar.config import settings, get_logger
+from .batching import BatchingEmbedder, embed_documents_concurrently
+from .embedding_cache import CachedEmbeddings
 from .loader import KnowledgeLoader
+from .ttl_cache import TTLCache
 
 logger = get_logger(__name__)
 
+# Per-file content digests of the last build, stored next to the Chroma data
+DIGEST_FILE = "kb_digests.json"
+
 
 class KnowledgeRetriever:
     """
@@ -30,7 +42,10 @@ class KnowledgeRetriever:
     def __init__(
         self,
         persist_directory: str | None = None,
-        collection_name: str = "techflow_knowledge"
+        collection_name: str = "techflow_knowledge",
+        hnsw_m: int | None = None,
+        hnsw_construction_ef: int | None = None,
+        hnsw_search_ef: int | None = None,
     ):
         """
         Initialize the knowledge retriever.
@@ -38,39 +53,88 @@ class KnowledgeRetriever:
         Args:
             persist_directory: Where to store ChromaDB data (None for in-memory)
             collection_name: Name of the ChromaDB collection
+            hnsw_m: HNSW graph connectivity (default from settings)
+            hnsw_construction_ef: HNSW build-time candidate list size (default from settings)
+            hnsw_search_ef: HNSW query-time candidate list size (default from settings)
         """
         self.persist_directory = persist_directory or settings.chroma_persist_directory
         self.collection_name = collection_name
         
+        # HNSW index settings - only applied when a collection is created
+        self.hnsw_config = {
+            "space": settings.chroma_hnsw_space,
+            "max_neighbors": hnsw_m or settings.chroma_hnsw_m,
+            "ef_construction": hnsw_construction_ef or settings.chroma_hnsw_construction_ef,
+            "ef_search": hnsw_search_ef or settings.chroma_hnsw_search_ef,
+        }
+        
         # Initialize embeddings
         self.embeddings = OpenAIEmbeddings(
             api_key=settings.openai_api_key,
-            model="text-embedding-3-small"  # Fast and cost-effective
+            model="text-embedding-3-small",  # Fast and cost-effective
+            chunk_size=settings.embedding_request_size,
         )
         
+        # Skip the API for texts we've embedded before (across runs, too)
+        if settings.embedding_cache_path or settings.embedding_memory_cache_size:
+            self.embeddings = CachedEmbeddings(
+                self.embeddings,
+                settings.embedding_cache_path or None,
+                vector_dtype=settings.embedding_cache_dtype,
+                memory_capacity=settings.embedding_memory_cache_size,
+                max_entries=settings.embedding_cache_max_entries or None
+            )
+        
+        # Concurrent aretrieve() calls share embedding requests
+        self.query_embedder = BatchingEmbedder(
+            self.embeddings,
+            batch_size=settings.embedding_query_batch_size,
+            window_ms=settings.embedding_query_batch_window_ms
+        )
+        
+        # Repeated FAQ-style questions skip the embedding call and the search
+        self.result_cache: TTLCache | None = None
+        if settings.retrieval_cache_max_size:
+            self.result_cache = TTLCache(
+                settings.retrieval_cache_max_size,
+                settings.retrieval_cache_ttl_seconds
+            )
+        
         self.vectorstore: Chroma | None = None
         self._initialized = False
     
-    def initialize(self, force_reload: bool = False) -> None:
+    def initialize(
+        self,
+        force_reload: bool = False,
+        batch_size: int | None = None,
+        incremental: bool = False,
+        loader: KnowledgeLoader | None = None
+    ) -> None:
         """
         Initialize the vector store, loading documents if needed.
         
         Args:
-            force_reload: If True, reload documents even if store exists
+            force_reload: If True, rebuild the store from scratch even if it
+                exists (this also applies changed HNSW settings)
+            batch_size: Chunks to embed and insert per batch (default from settings)
+            incremental: If True, update an existing store by re-embedding
+                only the files that changed since the last build. Falls back
+                to a full build when there are no recorded digests. Ignored
+                when force_reload is set.
+            loader: Loader to read the knowledge files with; its
+                chunk_lengths then describe the chunks embedded
         """
         persist_path = Path(self.persist_directory)
+        store_exists = persist_path.exists()
+        self.clear_cache()
         
         # Check if we already have a persisted store
-        if persist_path.exists() and not force_reload:
+        if store_exists and not force_reload and not incremental:
             logger.info(
                 "loading_existing_vectorstore",
                 path=str(persist_path)
             )
-            self.vectorstore = Chroma(
-                persist_directory=str(persist_path),
-                collection_name=self.collection_name,
-                embedding_function=self.embeddings
-            )
+            self.vectorstore = self._open_vectorstore(persist_path)
             self._initialized = True
             
             # Log collection stats
@@ -79,38 +143,192 @@ class KnowledgeRetriever:
             logger.info("vectorstore_loaded", document_count=count)
             return
         
+        loader = loader or KnowledgeLoader()
+        digests = loader.compute_digests()
+        previous_digests = None
+        if incremental and not force_reload and store_exists:
+            previous_digests = self._read_digests(persist_path)
+        
+        self.vectorstore = self._open_vectorstore(persist_path)
+        self._initialized = True
+        batch_size = batch_size or settings.embedding_batch_size
+        
+        if previous_digests is not None:
+            self._sync_changed_files(loader, digests, previous_digests, batch_size)
+            self._write_digests(persist_path, digests)
+            return
+        
         # Load and embed documents
         logger.info("creating_new_vectorstore")
         
-        loader = KnowledgeLoader()
-        documents = loader.load_and_split()
+        # Resetting drops any previous build so stale chunks don't pile up
+        # and the collection is recreated with the current HNSW settings
+        if store_exists:
+            self.vectorstore.reset_collection()
         
-        if not documents:
+        # Chunks stream from the loader straight into the embedding batches
+        document_count = self._add_documents_in_batches(loader.iter_chunks(), batch_size)
+        
+        if not document_count:
             logger.warning("no_documents_to_embed")
-            # Create empty store
-            self.vectorstore = Chroma(
-                persist_directory=str(persist_path),
-                collection_name=self.collection_name,
-                embedding_function=self.embeddings
-            )
-            self._initialized = True
             return
         
-        # Create vectorstore with documents
-        self.vectorstore = Chroma.from_documents(
-            documents=documents,
-            embedding=self.embeddings,
-            persist_directory=str(persist_path),
-            collection_name=self.collection_name
-        )
+        self._write_digests(persist_path, digests)
         
-        self._initialized = True
         logger.info(
             "vectorstore_created",
-            document_count=len(documents),
+            document_count=document_count,
             path=str(persist_path)
         )
     
+    def _sync_changed_files(
+        self,
+        loader: KnowledgeLoader,
+        digests: dict[str, str],
+        previous_digests: dict[str, str],
+        batch_size: int
+    ) -> None:
+        """
+        Re-embed only the files whose content changed since the last build.
+        
+        Chunks from changed or deleted files are removed by their "source"
+        metadata; chunks from unchanged files are left in place.
+        """
+        changed = {
+            name for name, digest in digests.items()
+            if previous_digests.get(name) != digest
+        }
+        removed = previous_digests.keys() - digests.keys()
+        
+        collection = self.vectorstore._collection
+        for name in changed | removed:
+            collection.delete(where={"source": name})
+        
+        chunks_embedded = 0
+        if changed:
+            chunks_embedded = self._add_documents_in_batches(loader.iter_chunks(only=changed), batch_size)
+        
+        logger.info(
+            "vectorstore_synced",
+            changed_files=sorted(changed),
+            removed_files=sorted(removed),
+            unchanged_files=len(digests) - len(changed),
+            chunks_embedded=chunks_embedded
+        )
+    
+    def is_up_to_date(self, loader: KnowledgeLoader | None = None) -> bool:
+        """
+        Check whether the persisted store already matches the knowledge files.
+        
+        True only if the store exists and every markdown file has the same
+        digest as at the last build (with no files added or removed).
+        """
+        persist_path = Path(self.persist_directory)
+        if not persist_path.exists():
+            return False
+        
+        previous_digests = self._read_digests(persist_path)
+        if previous_digests is None:
+            return False
+        
+        return (loader or KnowledgeLoader()).compute_digests() == previous_digests
+    
+    def _read_digests(self, persist_path: Path) -> dict[str, str] | None:
+        """Load the file digests recorded by the last build, if any."""
+        digest_path = persist_path / DIGEST_FILE
+        try:
+            return json.loads(digest_path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+    
+    def _write_digests(self, persist_path: Path, digests: dict[str, str]) -> None:
+        """Record the file digests for this build (atomically)."""
+        digest_path = persist_path / DIGEST_FILE
+        tmp_path = digest_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(digests, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, digest_path)
+    
+    def _open_vectorstore(self, persist_path: Path) -> Chroma:
+        """Open (or create) the Chroma collection with our HNSW index settings."""
+        return Chroma(
+            persist_directory=str(persist_path),
+            collection_name=self.collection_name,
+            embedding_function=self.embeddings,
+            collection_configuration={"hnsw": self.hnsw_config}
+        )
+    
+    def _add_documents_in_batches(self, documents: Iterable[Document], batch_size: int) -> int:
+        """
+        Embed and insert documents as they arrive, one window at a time.
+        
+        Each window holds enough chunks for full-size embedding requests,
+        several sent at once, so we don't pay a round-trip per small batch -
+        but only that window is kept in memory, not the whole knowledge base.
+        Inserts are still batched so Chroma commits one transaction per
+        batch instead of one per chunk.
+        
+        Returns:
+            The number of documents added
+        """
+        window_size = settings.embedding_request_size * max(settings.embedding_max_concurrency, 1)
+        documents = iter(documents)
+        collection = self.vectorstore._collection
+        added = 0
+        
+        while window := list(islice(documents, window_size)):
+            texts = [doc.page_content for doc in window]
+            metadatas = [doc.metadata for doc in window]
+            vectors = embed_documents_concurrently(
+                self.embeddings,
+                texts,
+                request_size=settings.embedding_request_size,
+                max_workers=settings.embedding_max_concurrency
+            )
+            
+            logger.info("documents_embedded", count=len(vectors))
+            
+            for start in range(0, len(window), batch_size):
+                end = start + batch_size
+                batch_texts = texts[start:end]
+                
+                collection.add(
+                    ids=[str(uuid.uuid4()) for _ in batch_texts],
+                    documents=batch_texts,
+                    embeddings=vectors[start:end],
+                    metadatas=metadatas[start:end],
+                )
+                
+                logger.debug(
+                    "embedding_batch_added",
+                    start=added + start,
+                    size=len(batch_texts)
+                )
+            
+            added += len(window)
+        
+        return added
+    
+    def clear_cache(self) -> None:
+        """Drop cached search results (e.g. after the knowledge base changes)."""
+        if self.result_cache is not None:
+            self.result_cache.clear()
+    
+    def _get_cached(self, key: tuple) -> list[Document] | None:
+        """Return a copy of the cached results for this search, if any."""
+        if self.result_cache is None:
+            return None
+        
+        docs = self.result_cache.get(key)
+        if docs is None:
+            return None
+        
+        logger.debug("retrieval_result_cache_hit", query=key[0][:50])
+        return list(docs)
+    
+    def _store_cached(self, key: tuple, docs: list[Document]) -> None:
+        if self.result_cache is not None:
+            self.result_cache.set(key, tuple(docs))
+    
     def retrieve(
         self,
         query: str,
@@ -136,6 +354,11 @@ class KnowledgeRetriever:
             return []
         
         k = k or settings.retrieval_k
+        cache_key = (query, k, category_filter)
+        
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
         
         # Build filter if category specified
         where_filter = None
@@ -168,6 +391,68 @@ class KnowledgeRetriever:
             count=len(docs)
         )
         
+        self._store_cached(cache_key, docs)
+        return docs
+    
+    async def aretrieve(
+        self,
+        query: str,
+        k: int | None = None,
+        category_filter: str | None = None
+    ) -> list[Document]:
+        """
+        Async version of retrieve() for use inside agent nodes.
+        
+        The query embedding is micro-batched with other conversations'
+        searches, and the Chroma lookup runs in a worker thread so the
+        event loop keeps serving other requests.
+        
+        Args:
+            query: The search query
+            k: Number of documents to retrieve (default from settings)
+            category_filter: Optional category to filter by
+            
+        Returns:
+            List of relevant Document objects
+        """
+        if not self._initialized:
+            await asyncio.to_thread(self.initialize)
+        
+        if not self.vectorstore:
+            logger.warning("vectorstore_not_available")
+            return []
+        
+        k = k or settings.retrieval_k
+        cache_key = (query, k, category_filter)
+        
+        cached = self._get_cached(cache_key)
+        if cached is not None:
+            return cached
+        
+        where_filter = {"category": category_filter} if category_filter else None
+        
+        logger.debug(
+            "retrieving_documents",
+            query=query[:50],
+            k=k,
+            filter=category_filter
+        )
+        
+        embedding = await self.query_embedder.embed(query)
+        docs = await asyncio.to_thread(
+            self.vectorstore.similarity_search_by_vector,
+            embedding,
+            k=k,
+            filter=where_filter
+        )
+        
+        logger.info(
+            "documents_retrieved",
+            query=query[:50],
+            count=len(docs)
+        )
+        
+        self._store_cached(cache_key, docs)
         return docs
     
     def retrieve_with_scores(
@@ -202,6 +487,51 @@ class KnowledgeRetriever:
         
         return results
     
+    def retrieve_batch(
+        self,
+        queries: list[str],
+        k: int | None = None
+    ) -> list[list[tuple[Document, float]]]:
+        """
+        Retrieve documents with scores for several queries at once.
+        
+        All queries are embedded in one request and searched with a single
+        Chroma query, instead of one embedding call and one search per query.
+        
+        Args:
+            queries: The search queries
+            k: Number of documents to retrieve per query
+            
+        Returns:
+            One list of (Document, score) tuples per query, in input order
+        """
+        if not self._initialized:
+            self.initialize()
+        
+        if not self.vectorstore or not queries:
+            return [[] for _ in queries]
+        
+        k = k or settings.retrieval_k
+        
+        results = self.vectorstore._collection.query(
+            query_embeddings=self.embeddings.embed_documents(queries),
+            n_results=k,
+            include=["documents", "metadatas", "distances"]
+        )
+        
+        return [
+            [
+                (Document(page_content=text, metadata=metadata or {}, id=doc_id), distance)
+                for text, metadata, doc_id, distance in zip(texts, metadatas, ids, distances)
+            ]
+            for texts, metadatas, ids, distances in zip(
+                results["documents"],
+                results["metadatas"],
+                results["ids"],
+                results["distances"]
+            )
+        ]
+    
     def format_context(self, documents: list[Document]) -> str:
         """
         Format retrieved documents into a context string for the LLM.
@@ -215,17 +545,12 @@ class KnowledgeRetriever:
         if not documents:
             return "No relevant information found in knowledge base."
         
-        context_parts = []
-        
-        for i, doc in enumerate(documents, 1):
-            source = doc.metadata.get("source", "unknown")
-            category = doc.metadata.get("category", "general")
-            
-            context_parts.append(
-                f"[Source {i}: {source} ({category})]\n{doc.page_content}"
-            )
-        
-        return "\n\n---\n\n".join(context_parts)
+        # A list (not a generator) lets join size the result in one pass
+        return "\n\n---\n\n".join([
+            f"[Source {i}: {doc.metadata.get('source', 'unknown')} "
+            f"({doc.metadata.get('category', 'general')})]\n{doc.page_content}"
+            for i, doc in enumerate(documents, 1)
+        ])
 
 
 # Singleton instance for easy access
@@ -237,6 +562,10 @@ def get_retriever() -> KnowledgeRetriever:
     global _retriever_instance
     
     if _retriever_instance is None:
-        _retriever_instance = KnowledgeRetriever()
+        if settings.retrieval_backend == "faiss":
+            from .faiss_backend import FAISSRetriever
+            _retriever_instance = FAISSRetriever()
+        else:
+            _retriever_instance = KnowledgeRetriever()
     
     return _retriever_instance
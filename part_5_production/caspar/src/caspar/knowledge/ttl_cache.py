@@ -0,0 +1,52 @@
+# File: src/caspar/knowledge/ttl_cache.py
+
+"""
+TTL/LRU Cache
+
+A small in-memory cache shared by the knowledge retriever (search results)
+and the agent's plan cache (retrievals and responses).
+"""
+
+from collections import OrderedDict
+import threading
+import time
+
+
+class TTLCache:
+    """Thread-safe LRU cache whose entries expire after a fixed time."""
+    
+    def __init__(self, max_size: int, ttl_seconds: float | None = None):
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds
+        self._entries: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def get(self, key):
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            
+            value, stored_at = entry
+            if self.ttl_seconds is not None and time.monotonic() - stored_at > self.ttl_seconds:
+                del self._entries[key]
+                return None
+            
+            self._entries.move_to_end(key)
+            return value
+    
+    def set(self, key, value) -> None:
+        """Store a value, evicting the least recently used entry if full."""
+        with self._lock:
+            self._entries[key] = (value, time.monotonic())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+    
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -8,18 +8,25 @@ Retrieves customer account information.
 In production, this would connect to your CRM or user database.
 """
 
-from datetime import datetime, timedelta, timezone
-from pydantic import BaseModel
+import copy
+from datetime import date, timedelta, timezone
+from functools import lru_cache
+from pydantic import BaseModel, ConfigDict
 import random
 
 from caspar.config import get_logger
 
 logger = get_logger(__name__)
 
+TIER_EMOJI = {"bronze": "🥉", "silver": "🥈", "gold": "🥇", "platinum": "💎"}
+
 
 class CustomerAccount(BaseModel):
     """Customer account information."""
     
+    # Frozen so a formatted summary can never go stale
+    model_config = ConfigDict(frozen=True)
+    
     customer_id: str
     email: str
     name: str
@@ -40,6 +47,8 @@ class AccountTool:
     
     def __init__(self):
         self._mock_accounts = self._generate_mock_accounts()
+        # customer_id -> (account, formatted summary)
+        self._summary_cache: dict[str, tuple[CustomerAccount, str]] = {}
     
     def _generate_mock_accounts(self) -> dict[str, CustomerAccount]:
         """Generate mock customer data."""
@@ -55,17 +64,19 @@ class AccountTool:
         ]
         
         accounts = {}
+        today = date.today()
         for i, (cust_id, email, name) in enumerate(mock_customers):
             tier_index = min(i, len(tiers) - 1)
             orders = (i + 1) * 5
             spent = orders * random.uniform(100, 500)
             
-            accounts[cust_id] = CustomerAccount(
+            # Trusted, internally generated data - skip validation
+            accounts[cust_id] = CustomerAccount.model_construct(
                 customer_id=cust_id,
                 email=email,
                 name=name,
                 phone=f"+1-555-{1000 + i:04d}" if i % 2 == 0 else None,
-                member_since=(datetime.now() - timedelta(days=365 * (i + 1))).strftime("%Y-%m-%d"),
+                member_since=(today - timedelta(days=365 * (i + 1))).isoformat(),
                 loyalty_tier=tiers[tier_index],
                 loyalty_points=int(spent * 10),
                 total_orders=orders,
@@ -97,14 +108,21 @@ class AccountTool:
     
     def format_account_summary(self, account: CustomerAccount) -> str:
         """Format account info for display to customer."""
+        # Accounts are immutable, so the same object always formats the same
+        cached = self._summary_cache.get(account.customer_id)
+        if cached is not None and cached[0] is account:
+            return cached[1]
         
-        tier_emoji = {"bronze": "🥉", "silver": "🥈", "gold": "🥇", "platinum": "💎"}
-        
+        summary = self._render_account_summary(account)
+        self._summary_cache[account.customer_id] = (account, summary)
+        return summary
+    
+    def _render_account_summary(self, account: CustomerAccount) -> str:
         lines = [
             f"**Account Summary for {account.name}**",
             "",
             f"Member Since: {account.member_since}",
-            f"Loyalty Status: {tier_emoji.get(account.loyalty_tier, '')} {account.loyalty_tier.title()}",
+            f"Loyalty Status: {TIER_EMOJI.get(account.loyalty_tier, '')} {account.loyalty_tier.title()}",
             f"Loyalty Points: {account.loyalty_points:,}",
             "",
             f"Total Orders: {account.total_orders}",
@@ -141,8 +159,21 @@ def get_account_tool() -> AccountTool:
 
 
 def get_account_info(customer_id: str) -> dict:
-    """Convenience function to get account information."""
-    tool = get_account_tool()
+    """
+    Convenience function to get account information.
+    
+    Accounts don't change once generated, so lookups are memoized per
+    tool; every caller gets its own copy of the result.
+    """
+    result = _account_info(get_account_tool(), customer_id)
+    # Logged here too, since a memoized result skips the tool's own logging
+    logger.info("account_info", customer_id=customer_id, found=result["found"])
+    return copy.deepcopy(result)
+
+
+@lru_cache(maxsize=4096)
+def _account_info(tool: AccountTool, customer_id: str) -> dict:
+    """Build the get_account_info() result (keyed by tool, so a new tool starts fresh)."""
     account = tool.get_account(customer_id)
     
     if account is None:
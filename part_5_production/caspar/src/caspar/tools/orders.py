@@ -8,19 +8,28 @@ Provides order status and tracking information.
 In production, this would connect to your order management system.
 """
 
-from datetime import datetime, timedelta, timezone
+import copy
+from datetime import date, timedelta, timezone
+from functools import lru_cache
 from typing import Literal
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 import random
+import re
 
 from caspar.config import get_logger
 
 logger = get_logger(__name__)
 
+# Accepts "10001" or "TF-10001" (any case, surrounding whitespace)
+ORDER_ID_PATTERN = re.compile(r"\s*(?:TF-)?(\d+)\s*", re.IGNORECASE)
+
 
 class OrderInfo(BaseModel):
     """Information about a customer order."""
     
+    # Frozen so a formatted summary can never go stale
+    model_config = ConfigDict(frozen=True)
+    
     order_id: str
     customer_id: str
     status: Literal["processing", "shipped", "delivered", "cancelled", "returned"]
@@ -43,6 +52,8 @@ class OrderLookupTool:
     
     def __init__(self):
         self._mock_orders = self._generate_mock_orders()
+        # order_id -> (order, formatted summary)
+        self._summary_cache: dict[str, tuple[OrderInfo, str]] = {}
     
     def _generate_mock_orders(self) -> dict[str, OrderInfo]:
         """Generate mock order data for testing."""
@@ -59,7 +70,8 @@ class OrderLookupTool:
         shipping_methods = ["standard", "express", "overnight"]
         
         orders = {}
-        base_date = datetime.now()
+        # Dates, not datetimes - isoformat() then gives YYYY-MM-DD directly
+        base_date = date.today()
         
         # Generate 20 mock orders
         for i in range(20):
@@ -82,18 +94,19 @@ class OrderLookupTool:
             if status in ["shipped", "delivered"]:
                 tracking = f"1Z999AA{10000000 + i}"
                 est_days = {"standard": 7, "express": 3, "overnight": 1}[shipping]
-                estimated_delivery = (order_date + timedelta(days=est_days)).strftime("%Y-%m-%d")
+                estimated_delivery = (order_date + timedelta(days=est_days)).isoformat()
                 
                 if status == "delivered":
                     delivery_date = estimated_delivery
             
-            orders[order_id] = OrderInfo(
+            # Trusted, internally generated data - skip validation
+            orders[order_id] = OrderInfo.model_construct(
                 order_id=order_id,
                 customer_id=customer_id,
                 status=status,
                 items=order_items,
                 total=total,
-                order_date=order_date.strftime("%Y-%m-%d"),
+                order_date=order_date.isoformat(),
                 shipping_method=shipping,
                 tracking_number=tracking,
                 estimated_delivery=estimated_delivery,
@@ -115,10 +128,12 @@ class OrderLookupTool:
         """
         logger.info("order_lookup", order_id=order_id, customer_id=customer_id)
         
-        # Normalize order ID (accept "10001" or "TF-10001")
-        order_id = order_id.upper().strip()
-        if not order_id.startswith("TF-"):
-            order_id = f"TF-{order_id}"
+        # Normalize order ID - anything that isn't an order number can't match
+        match = ORDER_ID_PATTERN.fullmatch(order_id)
+        if match is None:
+            logger.warning("order_id_malformed", order_id=order_id)
+            return None
+        order_id = f"TF-{match.group(1)}"
         
         order = self._mock_orders.get(order_id)
         
@@ -140,7 +155,16 @@ class OrderLookupTool:
     
     def format_order_summary(self, order: OrderInfo) -> str:
         """Format order information for display to customer."""
-        
+        # Orders are immutable, so the same object always formats the same
+        cached = self._summary_cache.get(order.order_id)
+        if cached is not None and cached[0] is order:
+            return cached[1]
+        
+        summary = self._render_order_summary(order)
+        self._summary_cache[order.order_id] = (order, summary)
+        return summary
+    
+    def _render_order_summary(self, order: OrderInfo) -> str:
         lines = [
             f"**Order {order.order_id}**",
             f"Status: {order.status.upper()}",
@@ -183,9 +207,19 @@ def get_order_status(order_id: str, customer_id: str | None = None) -> dict:
     """
     Convenience function to look up order status.
     
-    Returns a dict with order info or error message.
+    Returns a dict with order info or error message. Orders don't change
+    once generated, so lookups are memoized per tool; every caller gets
+    its own copy of the result.
     """
-    tool = get_order_tool()
+    result = _order_status(get_order_tool(), order_id, customer_id)
+    # Logged here too, since a memoized result skips the tool's own logging
+    logger.info("order_status", order_id=order_id, found=result["found"])
+    return copy.deepcopy(result)
+
+
+@lru_cache(maxsize=4096)
+def _order_status(tool: OrderLookupTool, order_id: str, customer_id: str | None) -> dict:
+    """Build the get_order_status() result (keyed by tool, so a new tool starts fresh)."""
     order = tool.lookup(order_id, customer_id)
     
     if order is None:
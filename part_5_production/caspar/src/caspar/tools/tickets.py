@@ -9,14 +9,23 @@ In production, this would integrate with your ticketing system.
 """
 
 from datetime import datetime, timezone
+from itertools import count
 from typing import Literal
 from pydantic import BaseModel
-import uuid
+import secrets
 
 from caspar.config import get_logger
 
 logger = get_logger(__name__)
 
+# Values create_ticket() accepts - anything else falls back to a default
+VALID_CATEGORIES = frozenset({"return", "refund", "technical", "billing", "shipping", "general"})
+VALID_PRIORITIES = frozenset({"low", "medium", "high", "urgent"})
+
+# Identity maps over the same values, so normalizing is one dict.get()
+_CATEGORY_LOOKUP = {category: category for category in VALID_CATEGORIES}
+_PRIORITY_LOOKUP = {priority: priority for priority in VALID_PRIORITIES}
+
 
 class Ticket(BaseModel):
     """A customer support ticket."""
@@ -44,6 +53,13 @@ class TicketTool:
     
     def __init__(self):
         self._tickets: dict[str, Ticket] = {}
+        # customer_id -> that customer's tickets, oldest first
+        self._by_customer: dict[str, list[Ticket]] = {}
+        # Ticket IDs outlive this tool - they're stored with shared
+        # conversations and handoffs, and shown to customers - so each
+        # tool numbers its tickets under its own random prefix
+        self._id_prefix = secrets.token_hex(4).upper()
+        self._ticket_numbers = count(1)
     
     def create(
         self,
@@ -56,7 +72,7 @@ class TicketTool:
     ) -> Ticket:
         """Create a new support ticket."""
         
-        ticket_id = f"TKT-{uuid.uuid4().hex[:8].upper()}"
+        ticket_id = f"TKT-{self._id_prefix}-{next(self._ticket_numbers):06d}"
         now = datetime.now(timezone.utc).isoformat()
         
         ticket = Ticket(
@@ -72,6 +88,7 @@ class TicketTool:
         )
         
         self._tickets[ticket_id] = ticket
+        self._by_customer.setdefault(customer_id, []).append(ticket)
         
         logger.info(
             "ticket_created",
@@ -89,7 +106,7 @@ class TicketTool:
     
     def get_customer_tickets(self, customer_id: str) -> list[Ticket]:
         """Get all tickets for a customer."""
-        return [t for t in self._tickets.values() if t.customer_id == customer_id]
+        return list(self._by_customer.get(customer_id, ()))
     
     def format_ticket_confirmation(self, ticket: Ticket) -> str:
         """Format ticket info for customer confirmation."""
@@ -137,20 +154,15 @@ def create_ticket(
     tool = get_ticket_tool()
     
     # Validate inputs
-    valid_categories = ["return", "refund", "technical", "billing", "shipping", "general"]
-    if category.lower() not in valid_categories:
-        category = "general"
-    
-    valid_priorities = ["low", "medium", "high", "urgent"]
-    if priority.lower() not in valid_priorities:
-        priority = "medium"
+    category = _CATEGORY_LOOKUP.get(category.lower(), "general")
+    priority = _PRIORITY_LOOKUP.get(priority.lower(), "medium")
     
     ticket = tool.create(
         customer_id=customer_id,
-        category=category.lower(),
+        category=category,
         subject=subject,
         description=description,
-        priority=priority.lower(),
+        priority=priority,
         conversation_id=conversation_id,
     )
     
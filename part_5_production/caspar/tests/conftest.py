@@ -5,9 +5,10 @@ pytest automatically discovers this file and makes fixtures
 available to all tests.
 """
 
+from types import SimpleNamespace
+
 import pytest
-import asyncio
-from unittest.mock import MagicMock, AsyncMock
+import pytest_asyncio
 from langchain_core.messages import HumanMessage, AIMessage
 
 from caspar.agent import create_initial_state
@@ -40,14 +41,18 @@ def sample_state_with_messages():
 @pytest.fixture
 def mock_llm():
     """Create a mock LLM for testing without API calls."""
-    mock = MagicMock()
-    mock.invoke = MagicMock(return_value=MagicMock(content="mocked response"))
-    return mock
-
-
-@pytest.fixture
-def event_loop():
-    """Create an event loop for async tests."""
-    loop = asyncio.new_event_loop()
-    yield loop
-    loop.close()
+    return SimpleNamespace(invoke=lambda messages: SimpleNamespace(content="mocked response"))
+
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def agent():
+    """
+    One agent shared by every test in the run.
+    
+    Building it attaches tools, LLM clients and the compiled graph, so
+    doing that once instead of per test keeps setup out of each test.
+    Tests use their own thread IDs, so conversations don't mix. With
+    pytest-xdist each worker process builds its own.
+    """
+    from caspar.agent import get_or_create_agent
+    return await get_or_create_agent()
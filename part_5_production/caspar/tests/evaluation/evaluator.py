@@ -4,12 +4,53 @@ Response quality evaluation framework.
 Uses LLM-as-a-judge to assess agent responses.
 """
 
+from pathlib import Path
+import asyncio
+import hashlib
+import os
+import re
+
 from pydantic import BaseModel
-from langchain_openai import ChatOpenAI
 from langchain_core.messages import HumanMessage
 
+from caspar.agent.llm_pool import get_llm
 from caspar.config import settings
 
+# One pass over the judge's reply instead of checking every line for every label
+_SCORE_RE = re.compile(r"^\s*(RELEVANCE|ACCURACY|HELPFULNESS|TONE):\s*(\d*\.?\d+)\s*$", re.MULTILINE)
+_FEEDBACK_RE = re.compile(r"^\s*FEEDBACK:\s*(.+?)\s*$", re.MULTILINE)
+
+# Judge prompt, filled in per response by _build_prompt
+_EVAL_TEMPLATE = """You are evaluating a customer service AI agent's response.
+
+Customer Message: "{customer_message}"
+
+Agent Response: "{agent_response}"
+
+{expected_topics_line}
+{context_line}
+
+Evaluate the response on these criteria (0.0 to 1.0):
+
+1. RELEVANCE: Does the response address what the customer asked?
+2. ACCURACY: Is the information provided correct and not hallucinated?
+3. HELPFULNESS: Does the response help solve the customer's problem?
+4. TONE: Is the tone professional, friendly, and appropriate?
+
+Respond in this exact format:
+RELEVANCE: [score]
+ACCURACY: [score]
+HELPFULNESS: [score]
+TONE: [score]
+FEEDBACK: [1-2 sentence explanation]"""
+
+# Judge calls in flight at once from aevaluate_many, and retries per call
+JUDGE_CONCURRENCY = int(os.getenv("CASPAR_EVAL_JUDGE_CONCURRENCY", "16"))
+JUDGE_MAX_RETRIES = 5
+
+# Judge results for prompts seen before, reused when CASPAR_EVAL_CACHE=1
+EVAL_CACHE_DIR = Path(".pytest_eval_cache")
+
 
 class EvaluationResult(BaseModel):
     """Result of evaluating a response."""
@@ -26,11 +67,12 @@ class ResponseEvaluator:
     """Evaluates agent responses using LLM-as-a-judge."""
     
     def __init__(self):
-        self.llm = ChatOpenAI(
-            model=settings.smart_model,  # Use better model for evaluation
-            api_key=settings.openai_api_key,
-            temperature=0,
-        )
+        # Use better model for evaluation. The shared client pools its
+        # connections, and batched judge calls retry 429s with backoff
+        self.llm = get_llm(settings.smart_model, 0, max_retries=JUDGE_MAX_RETRIES)
+        
+        # Opt-in, so CI can insist on fresh judgements
+        self.cache_dir = EVAL_CACHE_DIR if os.getenv("CASPAR_EVAL_CACHE") == "1" else None
     
     def evaluate(
         self,
@@ -48,47 +90,106 @@ class ResponseEvaluator:
             expected_topics: Topics that should be covered
             context: Additional context (e.g., order info, policies)
         """
-        eval_prompt = f"""You are evaluating a customer service AI agent's response.
-
-Customer Message: "{customer_message}"
-
-Agent Response: "{agent_response}"
-
-{f'Expected Topics: {", ".join(expected_topics)}' if expected_topics else ''}
-{f'Context: {context}' if context else ''}
-
-Evaluate the response on these criteria (0.0 to 1.0):
-
-1. RELEVANCE: Does the response address what the customer asked?
-2. ACCURACY: Is the information provided correct and not hallucinated?
-3. HELPFULNESS: Does the response help solve the customer's problem?
-4. TONE: Is the tone professional, friendly, and appropriate?
-
-Respond in this exact format:
-RELEVANCE: [score]
-ACCURACY: [score]
-HELPFULNESS: [score]
-TONE: [score]
-FEEDBACK: [1-2 sentence explanation]"""
-
+        eval_prompt = self._build_prompt(customer_message, agent_response, expected_topics, context)
+        
+        cached = self._load_cached(eval_prompt)
+        if cached is not None:
+            return cached
+        
         response = self.llm.invoke([HumanMessage(content=eval_prompt)])
+        return self._save_cached(eval_prompt, self._parse_evaluation(response.content))
+    
+    async def aevaluate(
+        self,
+        customer_message: str,
+        agent_response: str,
+        expected_topics: list[str] | None = None,
+        context: str | None = None,
+    ) -> EvaluationResult:
+        """Async version of evaluate() - doesn't block the event loop."""
+        eval_prompt = self._build_prompt(customer_message, agent_response, expected_topics, context)
+        
+        cached = self._load_cached(eval_prompt)
+        if cached is not None:
+            return cached
+        
+        response = await self.llm.ainvoke([HumanMessage(content=eval_prompt)])
+        return self._save_cached(eval_prompt, self._parse_evaluation(response.content))
+    
+    async def aevaluate_many(self, cases: list[dict]) -> list[EvaluationResult]:
+        """
+        Evaluate several responses with the judge calls made concurrently.
+        
+        Args:
+            cases: Keyword arguments for evaluate(), one dict per response
+        
+        Returns:
+            One EvaluationResult per case, in the same order
+        """
+        prompts = [self._build_prompt(**case) for case in cases]
+        results = [self._load_cached(prompt) for prompt in prompts]
+        
+        # Only the prompts without a cached result go to the judge
+        missing = [i for i, result in enumerate(results) if result is None]
+        sem = asyncio.Semaphore(JUDGE_CONCURRENCY)
+        
+        async def judge(prompt: str):
+            async with sem:
+                return await self.llm.ainvoke([HumanMessage(content=prompt)])
         
-        # Parse response
+        responses = await asyncio.gather(*(judge(prompts[i]) for i in missing))
+        for i, response in zip(missing, responses):
+            results[i] = self._save_cached(prompts[i], self._parse_evaluation(response.content))
+        
+        return results
+    
+    def _cache_path(self, eval_prompt: str) -> Path:
+        key = hashlib.blake2b(f"{self.llm.model_name}\n{eval_prompt}".encode(), digest_size=16).hexdigest()
+        return self.cache_dir / f"{key}.json"
+    
+    def _load_cached(self, eval_prompt: str) -> EvaluationResult | None:
+        """Return the stored result for this prompt, if caching is on and it exists."""
+        if self.cache_dir is None:
+            return None
+        
+        cache_path = self._cache_path(eval_prompt)
+        if not cache_path.exists():
+            return None
+        return EvaluationResult.model_validate_json(cache_path.read_text(encoding="utf-8"))
+    
+    def _save_cached(self, eval_prompt: str, result: EvaluationResult) -> EvaluationResult:
+        """Store a fresh result (when caching is on) and pass it through."""
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(exist_ok=True)
+            self._cache_path(eval_prompt).write_text(result.model_dump_json(), encoding="utf-8")
+        return result
+    
+    def _build_prompt(
+        self,
+        customer_message: str,
+        agent_response: str,
+        expected_topics: list[str] | None = None,
+        context: str | None = None,
+    ) -> str:
+        """Build the judge prompt for one response."""
+        return _EVAL_TEMPLATE.format_map({
+            "customer_message": customer_message,
+            "agent_response": agent_response,
+            "expected_topics_line": f"Expected Topics: {', '.join(expected_topics)}" if expected_topics else "",
+            "context_line": f"Context: {context}" if context else "",
+        })
+    
+    def _parse_evaluation(self, content: str) -> EvaluationResult:
+        """Parse the judge's reply into an EvaluationResult."""
+        # Labels the judge left out (or scored unreadably) stay at 0.5
         scores = {"relevance": 0.5, "accuracy": 0.5, "helpfulness": 0.5, "tone": 0.5}
-        feedback = "Unable to parse evaluation"
-        
-        for line in response.content.strip().split("\n"):
-            line = line.strip()
-            if line.startswith("RELEVANCE:"):
-                scores["relevance"] = self._parse_score(line)
-            elif line.startswith("ACCURACY:"):
-                scores["accuracy"] = self._parse_score(line)
-            elif line.startswith("HELPFULNESS:"):
-                scores["helpfulness"] = self._parse_score(line)
-            elif line.startswith("TONE:"):
-                scores["tone"] = self._parse_score(line)
-            elif line.startswith("FEEDBACK:"):
-                feedback = line.split(":", 1)[1].strip()
+        scores.update(
+            (match.group(1).lower(), max(0.0, min(1.0, float(match.group(2)))))
+            for match in _SCORE_RE.finditer(content)
+        )
+        
+        feedback_match = _FEEDBACK_RE.search(content)
+        feedback = feedback_match.group(1) if feedback_match else "Unable to parse evaluation"
         
         overall = sum(scores.values()) / len(scores)
         
@@ -100,12 +201,3 @@ FEEDBACK: [1-2 sentence explanation]"""
             overall_score=overall,
             feedback=feedback,
         )
-    
-    def _parse_score(self, line: str) -> float:
-        """Parse a score from an evaluation line."""
-        try:
-            score_str = line.split(":")[1].strip()
-            score = float(score_str)
-            return max(0.0, min(1.0, score))
-        except (IndexError, ValueError):
-            return 0.5
@@ -1,13 +1,37 @@
 """Run evaluation on the full test dataset."""
 
 import asyncio
+import io
 import json
+import os
+import sys
 from datetime import datetime
 from langchain_core.messages import HumanMessage
 
 from caspar.agent import create_agent, create_initial_state
 from .evaluator import ResponseEvaluator
-from .test_dataset import TEST_CASES
+from .test_dataset import RUNNABLE_CASES, SKIPPED_CASES, TEST_CASES
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Agent runs in flight at once - each one is a chain of LLM calls
+EVAL_CONCURRENCY = int(os.getenv("CASPAR_EVAL_CONCURRENCY", "8"))
+
+
+async def _run_agent(i, test_case, sem, agent) -> dict:
+    """Run the agent on one test case."""
+    async with sem:
+        state = create_initial_state(
+            conversation_id=f"eval-{i}",
+            customer_id="CUST-1000"
+        )
+        state["messages"] = [HumanMessage(content=test_case.input)]
+        
+        config = {"configurable": {"thread_id": f"eval-{i}"}}
+        return await agent.ainvoke(state, config)
 
 
 async def evaluate_dataset():
@@ -15,7 +39,6 @@ async def evaluate_dataset():
     agent = await create_agent()
     evaluator = ResponseEvaluator()
     
-    results = []
     passed = 0
     failed = 0
     
@@ -23,74 +46,70 @@ async def evaluate_dataset():
     print(f"Running evaluation on {len(TEST_CASES)} test cases")
     print(f"{'=' * 60}\n")
     
-    for i, test_case in enumerate(TEST_CASES, 1):
-        print(f"[{i}/{len(TEST_CASES)}] Testing: {test_case['category']} - {test_case['input'][:40]}...")
-        
-        # Skip empty input test
-        if not test_case["input"]:
-            print("  ⏭️  Skipped (empty input)")
-            continue
-        
-        # Run agent
-        state = create_initial_state(
-            conversation_id=f"eval-{i}",
-            customer_id="CUST-1000"
-        )
-        state["messages"] = [HumanMessage(content=test_case["input"])]
-        
-        config = {"configurable": {"thread_id": f"eval-{i}"}}
-        result = await agent.ainvoke(state, config)
-        
-        response = result["messages"][-1].content
-        
-        # Check intent
-        intent_correct = result["intent"] == test_case["expected_intent"]
-        
-        # Evaluate quality
-        evaluation = evaluator.evaluate(
-            customer_message=test_case["input"],
-            agent_response=response,
-            expected_topics=test_case.get("expected_topics", []),
-        )
-        
-        quality_passed = evaluation.overall_score >= test_case["min_quality_score"]
-        
-        # Check special expectations
-        escalation_correct = True
-        ticket_correct = True
-        
-        if test_case.get("expect_escalation"):
-            escalation_correct = result.get("needs_escalation", False)
-        
-        if test_case.get("expect_ticket"):
-            ticket_correct = result.get("ticket_id") is not None
-        
-        # Overall pass/fail
-        test_passed = intent_correct and quality_passed and escalation_correct and ticket_correct
-        
-        if test_passed:
-            passed += 1
-            print(f"  ✅ Passed (score: {evaluation.overall_score:.2f})")
-        else:
-            failed += 1
-            print(f"  ❌ Failed")
-            if not intent_correct:
-                print(f"     Intent: expected {test_case['expected_intent']}, got {result['intent']}")
-            if not quality_passed:
-                print(f"     Quality: {evaluation.overall_score:.2f} < {test_case['min_quality_score']}")
-            if not escalation_correct:
-                print(f"     Escalation: expected but not triggered")
-            if not ticket_correct:
-                print(f"     Ticket: expected but not created")
-        
-        results.append({
-            "test_case": test_case,
-            "intent": result["intent"],
-            "intent_correct": intent_correct,
-            "evaluation": evaluation.model_dump(),
-            "quality_passed": quality_passed,
-            "test_passed": test_passed,
-        })
+    # Run the agent on every case, then judge all the responses at once
+    sem = asyncio.Semaphore(EVAL_CONCURRENCY)
+    agent_results = await asyncio.gather(*(
+        _run_agent(i, test_case, sem, agent) for i, test_case in enumerate(RUNNABLE_CASES, 1)
+    ))
+    evaluations = await evaluator.aevaluate_many([
+        {
+            "customer_message": test_case.input,
+            "agent_response": result["messages"][-1].content,
+            "expected_topics": test_case.expected_topics,
+        }
+        for test_case, result in zip(RUNNABLE_CASES, agent_results)
+    ])
+    
+    # Results are written as JSON lines while reporting, not dumped at the end
+    output_file = f"evaluation_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.jsonl"
+    with open(output_file, "wb") as output:
+        # Report in dataset order once everything has finished
+        cases = zip(RUNNABLE_CASES, agent_results, evaluations)
+        for i, (test_case, result, evaluation) in enumerate(cases, 1):
+            # Each case's report goes out in a single write
+            report = io.StringIO()
+            report.write(f"[{i}/{len(RUNNABLE_CASES)}] Testing: {test_case.category} - {test_case.input[:40]}...\n")
+            
+            intent_correct = result["intent"] == test_case.expected_intent
+            quality_passed = evaluation.overall_score >= test_case.min_quality_score
+            
+            # Each check pairs its outcome with the reason reported on failure.
+            # Escalation and ticket only count for cases that expect them
+            checks = (
+                (intent_correct, f"Intent: expected {test_case.expected_intent}, got {result['intent']}"),
+                (quality_passed, f"Quality: {evaluation.overall_score:.2f} < {test_case.min_quality_score}"),
+                (not test_case.expect_escalation or result.get("needs_escalation", False),
+                 "Escalation: expected but not triggered"),
+                (not test_case.expect_ticket or result.get("ticket_id") is not None,
+                 "Ticket: expected but not created"),
+            )
+            
+            # Overall pass/fail
+            test_passed = all(ok for ok, _ in checks)
+            
+            if test_passed:
+                passed += 1
+                report.write(f"  ✅ Passed (score: {evaluation.overall_score:.2f})\n")
+            else:
+                failed += 1
+                report.write("  ❌ Failed\n")
+                for ok, reason in checks:
+                    if not ok:
+                        report.write(f"     {reason}\n")
+            
+            sys.stdout.write(report.getvalue())
+            
+            output.write(_json_line({
+                "test_case": test_case._asdict(),
+                "intent": result["intent"],
+                "intent_correct": intent_correct,
+                "evaluation": evaluation.model_dump(),
+                "quality_passed": quality_passed,
+                "test_passed": test_passed,
+            }))
+    
+    if SKIPPED_CASES:
+        print(f"\n⏭️  Skipped {len(SKIPPED_CASES)} case(s) with empty input")
     
     # Summary
     print(f"\n{'=' * 60}")
@@ -98,14 +117,16 @@ async def evaluate_dataset():
     print(f"{'=' * 60}")
     print(f"Passed: {passed}/{len(TEST_CASES)} ({100*passed/len(TEST_CASES):.1f}%)")
     print(f"Failed: {failed}/{len(TEST_CASES)}")
-    
-    # Save results
-    output_file = f"evaluation_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
-    with open(output_file, "w") as f:
-        json.dump(results, f, indent=2)
     print(f"\nDetailed results saved to: {output_file}")
     
-    return results
+    return output_file
+
+
+def _json_line(record: dict) -> bytes:
+    """Encode one result as a JSON line (via orjson when it's installed)."""
+    if orjson is not None:
+        return orjson.dumps(record) + b"\n"
+    return json.dumps(record).encode("utf-8") + b"\n"
 
 
 if __name__ == "__main__":
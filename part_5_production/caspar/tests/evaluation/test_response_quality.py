@@ -3,7 +3,7 @@
 import pytest
 from langchain_core.messages import HumanMessage
 
-from caspar.agent import create_agent, create_initial_state
+from caspar.agent import create_initial_state
 from .evaluator import ResponseEvaluator
 
 
@@ -14,9 +14,8 @@ def evaluator():
 
 
 @pytest.mark.asyncio
-async def test_faq_response_quality(evaluator):
+async def test_faq_response_quality(evaluator, agent):
     """FAQ responses should be high quality."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="eval-faq", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="What is your return policy?")]
     
@@ -37,9 +36,8 @@ async def test_faq_response_quality(evaluator):
 
 
 @pytest.mark.asyncio
-async def test_complaint_response_quality(evaluator):
+async def test_complaint_response_quality(evaluator, agent):
     """Complaint responses should be empathetic and helpful."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="eval-complaint", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="My laptop arrived damaged! I'm very upset!")]
     
@@ -59,9 +57,8 @@ async def test_complaint_response_quality(evaluator):
 
 
 @pytest.mark.asyncio
-async def test_order_status_response_accuracy(evaluator):
+async def test_order_status_response_accuracy(evaluator, agent):
     """Order status responses should be accurate."""
-    agent = await create_agent()
     # Use CUST-1000 with TF-10000 (matching ownership)
     state = create_initial_state(conversation_id="eval-order", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="Where is my order TF-10000?")]
@@ -1,32 +1,38 @@
 """Integration tests for complete conversation flows."""
 
+import re
+
 import pytest
 from langchain_core.messages import HumanMessage
 
-from caspar.agent import create_agent, create_initial_state
+from caspar.agent import create_initial_state
+
+# One case-insensitive scan of the response per check
+RETURN_POLICY_PATTERN = re.compile(r"return|30|day|refund", re.IGNORECASE)
+ORDER_NOT_FOUND_PATTERN = re.compile(r"not found|couldn't find|unable to locate|check|verify", re.IGNORECASE)
+HUMAN_PATTERN = re.compile(r"human|agent", re.IGNORECASE)
+HANDOFF_PATTERN = re.compile(r"human|agent|team|reach", re.IGNORECASE)
 
 
 @pytest.mark.asyncio
-async def test_faq_flow_returns_relevant_info():
+async def test_faq_flow_returns_relevant_info(agent):
     """FAQ flow should return relevant policy information."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-faq-flow", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="What is your return policy?")]
     
     config = {"configurable": {"thread_id": "test-faq-flow"}}
     result = await agent.ainvoke(state, config)
     
-    response = result["messages"][-1].content.lower()
+    response = result["messages"][-1].content
     
     # Should mention key return policy details
-    assert any(word in response for word in ["return", "30", "day", "refund"]), \
+    assert RETURN_POLICY_PATTERN.search(response), \
         f"Response should mention return policy details: {response}"
 
 
 @pytest.mark.asyncio
-async def test_order_inquiry_with_valid_order():
+async def test_order_inquiry_with_valid_order(agent):
     """Order inquiry should return order details for valid orders."""
-    agent = await create_agent()
     # Use CUST-1000 with TF-10000 (TF-10000 belongs to CUST-1000)
     state = create_initial_state(conversation_id="test-order-flow", customer_id="CUST-1000")
     # Use polite phrasing to reduce chance of sentiment escalation
@@ -49,30 +55,28 @@ async def test_order_inquiry_with_valid_order():
 
 
 @pytest.mark.asyncio
-async def test_order_inquiry_with_invalid_order():
+async def test_order_inquiry_with_invalid_order(agent):
     """Order inquiry should handle invalid orders gracefully."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-invalid-order", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="Where is my order TF-99999?")]
     
     config = {"configurable": {"thread_id": "test-invalid-order"}}
     result = await agent.ainvoke(state, config)
     
-    response = result["messages"][-1].content.lower()
+    response = result["messages"][-1].content
     
     # Should either indicate order not found OR escalate to human
     # (escalation is acceptable when we can't find the order)
-    order_not_found = any(phrase in response for phrase in ["not found", "couldn't find", "unable to locate", "check", "verify"])
-    escalated = result.get("needs_escalation", False) or "human" in response or "agent" in response
+    order_not_found = bool(ORDER_NOT_FOUND_PATTERN.search(response))
+    escalated = result.get("needs_escalation", False) or bool(HUMAN_PATTERN.search(response))
     
     assert order_not_found or escalated, \
         f"Response should indicate order not found or escalate: {response}"
 
 
 @pytest.mark.asyncio
-async def test_complaint_creates_ticket():
+async def test_complaint_creates_ticket(agent):
     """Complaints should create a support ticket."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-complaint-ticket", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="My laptop arrived completely broken! This is unacceptable!")]
     
@@ -85,9 +89,8 @@ async def test_complaint_creates_ticket():
 
 
 @pytest.mark.asyncio
-async def test_handoff_request_triggers_escalation():
+async def test_handoff_request_triggers_escalation(agent):
     """Explicit handoff requests should trigger escalation."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-explicit-handoff", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="I want to speak to a human agent please")]
     
@@ -99,6 +102,6 @@ async def test_handoff_request_triggers_escalation():
     assert result.get("ticket_id") is not None, "Handoff should create a ticket"
     
     # Response should acknowledge the handoff
-    response = result["messages"][-1].content.lower()
-    assert any(word in response for word in ["human", "agent", "team", "reach"]), \
+    response = result["messages"][-1].content
+    assert HANDOFF_PATTERN.search(response), \
         f"Response should mention human handoff: {response}"
@@ -1,15 +1,22 @@
 """Integration tests for edge cases and unusual inputs."""
 
+import re
+
 import pytest
 from langchain_core.messages import HumanMessage
 
-from caspar.agent import create_agent, create_initial_state
+from caspar.agent import create_initial_state
+
+# One case-insensitive scan of the response per check
+POLICY_TOPICS_PATTERN = re.compile(r"return|warranty|policy|day", re.IGNORECASE)
+HUMAN_PATTERN = re.compile(r"human|agent", re.IGNORECASE)
+# Anchored at a word start so "hi" isn't found inside "this" or "which"
+GREETING_PATTERN = re.compile(r"\b(?:hello|hi|help|welcome)", re.IGNORECASE)
 
 
 @pytest.mark.asyncio
-async def test_empty_message():
+async def test_empty_message(agent):
     """Should handle empty messages gracefully."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-empty", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="")]
     
@@ -22,9 +29,8 @@ async def test_empty_message():
 
 
 @pytest.mark.asyncio
-async def test_very_long_message():
+async def test_very_long_message(agent):
     """Should handle very long messages."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-long", customer_id="CUST-1000")
     
     # Create a long message
@@ -38,9 +44,8 @@ async def test_very_long_message():
 
 
 @pytest.mark.asyncio
-async def test_special_characters():
+async def test_special_characters(agent):
     """Should handle special characters in messages."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-special", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="What's the status of order #TF-10000? 🤔 <test> & more")]
     
@@ -51,9 +56,8 @@ async def test_special_characters():
 
 
 @pytest.mark.asyncio
-async def test_multiple_questions_in_one_message():
+async def test_multiple_questions_in_one_message(agent):
     """Should handle multiple questions in a single message."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-multi-q", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(
         content="Hi! Quick questions: What's your return policy? And do you offer warranties? Thanks!"
@@ -62,20 +66,19 @@ async def test_multiple_questions_in_one_message():
     config = {"configurable": {"thread_id": "test-multi-q"}}
     
     result = await agent.ainvoke(state, config)
-    response = result["messages"][-1].content.lower()
+    response = result["messages"][-1].content
     
     # Should address at least some of the questions OR escalate for complex request
-    addressed_topics = any(word in response for word in ["return", "warranty", "policy", "day"])
-    escalated = result.get("needs_escalation", False) or "human" in response or "agent" in response
+    addressed_topics = bool(POLICY_TOPICS_PATTERN.search(response))
+    escalated = result.get("needs_escalation", False) or bool(HUMAN_PATTERN.search(response))
     
     assert addressed_topics or escalated, \
         f"Should address topics or escalate complex request: {response[:200]}"
 
 
 @pytest.mark.asyncio
-async def test_all_caps_message():
+async def test_all_caps_message(agent):
     """Should handle ALL CAPS messages (often indicate frustration)."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-caps", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="WHERE IS MY ORDER THIS IS TAKING TOO LONG")]
     
@@ -89,26 +92,24 @@ async def test_all_caps_message():
 
 
 @pytest.mark.asyncio
-async def test_greeting_only():
+async def test_greeting_only(agent):
     """Should handle simple greetings."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-greeting", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="Hello!")]
     
     config = {"configurable": {"thread_id": "test-greeting"}}
     
     result = await agent.ainvoke(state, config)
-    response = result["messages"][-1].content.lower()
+    response = result["messages"][-1].content
     
     # Should respond with a greeting
-    assert any(word in response for word in ["hello", "hi", "help", "welcome"]), \
+    assert GREETING_PATTERN.search(response), \
         f"Should greet the customer: {response}"
 
 
 @pytest.mark.asyncio
-async def test_typos_and_misspellings():
+async def test_typos_and_misspellings(agent):
     """Should handle messages with typos."""
-    agent = await create_agent()
     state = create_initial_state(conversation_id="test-typos", customer_id="CUST-1000")
     state["messages"] = [HumanMessage(content="waht is ur retrun polcy?")]
     
@@ -1,95 +1,102 @@
 """Integration tests for intent classification."""
 
+from itertools import count
+import asyncio
+
 import pytest
 from langchain_core.messages import HumanMessage
 
-from caspar.agent import create_agent, create_initial_state
+from caspar.agent import create_initial_state
+
+
+FAQ_CASES = (
+    "What is your return policy?",
+    "How long does shipping take?",
+    "Do you offer warranties?",
+    "What payment methods do you accept?",
+)
+
+# CUST-1000 owns TF-10000, TF-10005, TF-10010, TF-10015
+ORDER_CASES = (
+    "Where is my order TF-10000?",
+    "I want to track my order",
+    "What's the status of order 10005?",
+    "When will my package arrive?",
+)
+
+COMPLAINT_CASES = (
+    "This product is terrible!",
+    "I'm very disappointed with my purchase",
+    "Your service is awful",
+    "My item arrived damaged and I'm furious",
+)
+
+HANDOFF_CASES = (
+    "I want to speak to a human",
+    "Let me talk to a real person",
+    "Connect me with an agent",
+    "I need human support please",
+)
+
+
+# Unique thread IDs for this module's conversations
+_thread_ids = count()
+
+
+@pytest.fixture(scope="module")
+def human_messages() -> dict[str, HumanMessage]:
+    """Every test message, built once for the module."""
+    return {
+        message: HumanMessage(content=message)
+        for cases in (FAQ_CASES, ORDER_CASES, COMPLAINT_CASES, HANDOFF_CASES)
+        for message in cases
+    }
+
+
+async def classify_all(agent, prefix: str, messages: list[HumanMessage]) -> list[tuple[str, dict]]:
+    """Run each message as its own conversation, all at once."""
+    
+    async def classify(message: HumanMessage) -> tuple[str, dict]:
+        thread_id = f"test-{prefix}-{next(_thread_ids)}"
+        state = create_initial_state(conversation_id=thread_id, customer_id="CUST-1000")
+        state["messages"] = [message]
+        config = {"configurable": {"thread_id": thread_id}}
+        return message.content, await agent.ainvoke(state, config)
+    
+    return await asyncio.gather(*(classify(message) for message in messages))
 
 
 @pytest.mark.asyncio
-async def test_faq_intent_classification():
+async def test_faq_intent_classification(agent, human_messages):
     """Should classify FAQ questions correctly."""
-    agent = await create_agent()
-    state = create_initial_state(conversation_id="test-faq", customer_id="CUST-1000")
+    messages = [human_messages[m] for m in FAQ_CASES]
     
-    test_cases = [
-        "What is your return policy?",
-        "How long does shipping take?",
-        "Do you offer warranties?",
-        "What payment methods do you accept?",
-    ]
-    
-    for message in test_cases:
-        state["messages"] = [HumanMessage(content=message)]
-        config = {"configurable": {"thread_id": f"test-faq-{hash(message)}"}}
-        
-        result = await agent.ainvoke(state, config)
-        
+    for message, result in await classify_all(agent, "faq", messages):
         assert result["intent"] == "faq", f"Expected 'faq' for: {message}, got: {result['intent']}"
 
 
 @pytest.mark.asyncio
-async def test_order_inquiry_intent_classification():
+async def test_order_inquiry_intent_classification(agent, human_messages):
     """Should classify order inquiries correctly."""
-    agent = await create_agent()
-    # CUST-1000 owns TF-10000, TF-10005, TF-10010, TF-10015
-    state = create_initial_state(conversation_id="test-order", customer_id="CUST-1000")
-    
-    test_cases = [
-        "Where is my order TF-10000?",
-        "I want to track my order",
-        "What's the status of order 10005?",
-        "When will my package arrive?",
-    ]
+    messages = [human_messages[m] for m in ORDER_CASES]
     
-    for message in test_cases:
-        state["messages"] = [HumanMessage(content=message)]
-        config = {"configurable": {"thread_id": f"test-order-{hash(message)}"}}
-        
-        result = await agent.ainvoke(state, config)
-        
+    for message, result in await classify_all(agent, "order", messages):
         assert result["intent"] == "order_inquiry", f"Expected 'order_inquiry' for: {message}, got: {result['intent']}"
 
 
 @pytest.mark.asyncio
-async def test_complaint_intent_classification():
+async def test_complaint_intent_classification(agent, human_messages):
     """Should classify complaints correctly."""
-    agent = await create_agent()
-    state = create_initial_state(conversation_id="test-complaint", customer_id="CUST-1000")
+    messages = [human_messages[m] for m in COMPLAINT_CASES]
     
-    test_cases = [
-        "This product is terrible!",
-        "I'm very disappointed with my purchase",
-        "Your service is awful",
-        "My item arrived damaged and I'm furious",
-    ]
-    
-    for message in test_cases:
-        state["messages"] = [HumanMessage(content=message)]
-        config = {"configurable": {"thread_id": f"test-complaint-{hash(message)}"}}
-        
-        result = await agent.ainvoke(state, config)
-        
+    for message, result in await classify_all(agent, "complaint", messages):
         assert result["intent"] == "complaint", f"Expected 'complaint' for: {message}, got: {result['intent']}"
 
 
 @pytest.mark.asyncio
-async def test_handoff_request_classification():
+async def test_handoff_request_classification(agent, human_messages):
     """Should classify handoff requests correctly."""
-    agent = await create_agent()
-    state = create_initial_state(conversation_id="test-handoff", customer_id="CUST-1000")
-    
-    test_cases = [
-        "I want to speak to a human",
-        "Let me talk to a real person",
-        "Connect me with an agent",
-        "I need human support please",
-    ]
+    messages = [human_messages[m] for m in HANDOFF_CASES]
     
-    for message in test_cases:
-        state["messages"] = [HumanMessage(content=message)]
-        config = {"configurable": {"thread_id": f"test-handoff-{hash(message)}"}}
-        
-        result = await agent.ainvoke(state, config)
-        
+    for message, result in await classify_all(agent, "handoff", messages):
         assert result["intent"] == "handoff_request", f"Expected 'handoff_request' for: {message}, got: {result['intent']}"
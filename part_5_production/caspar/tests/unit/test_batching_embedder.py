@@ -0,0 +1,92 @@
+"""Unit tests for micro-batched query embedding."""
+
+import asyncio
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from caspar.knowledge.batching import BatchingEmbedder, embed_documents_concurrently
+
+
+class RecordingEmbeddings(Embeddings):
+    """Embeds text as [len(text)] and records each request."""
+    
+    def __init__(self, fail: bool = False):
+        self.requests: list[list[str]] = []
+        self.fail = fail
+    
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.requests.append(list(texts))
+        if self.fail:
+            raise RuntimeError("embedding service down")
+        return [[float(len(text))] for text in texts]
+    
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class TestBatchingEmbedder:
+    """Tests for BatchingEmbedder."""
+    
+    @pytest.mark.asyncio
+    async def test_concurrent_queries_share_one_request(self):
+        """Should embed queries arriving together in a single request."""
+        embeddings = RecordingEmbeddings()
+        embedder = BatchingEmbedder(embeddings, batch_size=64, window_ms=20)
+        
+        vectors = await asyncio.gather(*(embedder.embed("x" * n) for n in range(1, 6)))
+        
+        assert vectors == [[1.0], [2.0], [3.0], [4.0], [5.0]]
+        assert len(embeddings.requests) == 1
+    
+    @pytest.mark.asyncio
+    async def test_batch_size_respected(self):
+        """Should split into several requests when more than batch_size arrive."""
+        embeddings = RecordingEmbeddings()
+        embedder = BatchingEmbedder(embeddings, batch_size=2, window_ms=20)
+        
+        await asyncio.gather(*(embedder.embed(str(n)) for n in range(5)))
+        
+        assert [len(request) for request in embeddings.requests] == [2, 2, 1]
+    
+    @pytest.mark.asyncio
+    async def test_errors_reach_every_caller(self):
+        """Should propagate a failed request to each waiting query."""
+        embedder = BatchingEmbedder(RecordingEmbeddings(fail=True), window_ms=5)
+        
+        results = await asyncio.gather(
+            embedder.embed("a"),
+            embedder.embed("b"),
+            return_exceptions=True
+        )
+        
+        assert all(isinstance(result, RuntimeError) for result in results)
+
+
+class TestEmbedDocumentsConcurrently:
+    """Tests for embed_documents_concurrently."""
+    
+    def test_splits_into_requests_and_keeps_order(self):
+        """Should send request_size texts per request and return vectors in order."""
+        embeddings = RecordingEmbeddings()
+        texts = ["x" * n for n in range(1, 8)]
+        
+        vectors = embed_documents_concurrently(embeddings, texts, request_size=3, jitter_seconds=0)
+        
+        assert vectors == [[float(n)] for n in range(1, 8)]
+        assert sorted(len(request) for request in embeddings.requests) == [1, 3, 3]
+    
+    def test_single_request_skips_the_pool(self):
+        """Texts that fit in one request should be embedded directly."""
+        embeddings = RecordingEmbeddings()
+        
+        embed_documents_concurrently(embeddings, ["a", "b"], request_size=10)
+        
+        assert embeddings.requests == [["a", "b"]]
+    
+    def test_errors_propagate(self):
+        """A failed request should fail the whole build."""
+        with pytest.raises(RuntimeError):
+            embed_documents_concurrently(
+                RecordingEmbeddings(fail=True), ["a", "b", "c"], request_size=1, jitter_seconds=0
+            )
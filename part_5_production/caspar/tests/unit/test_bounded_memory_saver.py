@@ -0,0 +1,93 @@
+"""Unit tests for the bounded in-memory checkpointer."""
+
+from typing_extensions import TypedDict
+from langgraph.graph import StateGraph, END
+
+from caspar.agent.persistence import BoundedMemorySaver
+
+
+class CounterState(TypedDict):
+    count: int
+
+
+class ContextState(TypedDict):
+    context: str
+    count: int
+
+
+def _counter_graph(checkpointer):
+    """A one-node graph that just bumps a counter."""
+    graph = StateGraph(CounterState)
+    graph.add_node("bump", lambda state: {"count": state["count"] + 1})
+    graph.set_entry_point("bump")
+    graph.add_edge("bump", END)
+    return graph.compile(checkpointer=checkpointer)
+
+
+def _config(thread_id: str) -> dict:
+    return {"configurable": {"thread_id": thread_id}}
+
+
+class TestBoundedMemorySaver:
+    """Tests for BoundedMemorySaver."""
+    
+    def test_keeps_recent_threads(self):
+        """Should keep conversations while under the cap."""
+        saver = BoundedMemorySaver(max_threads=2)
+        app = _counter_graph(saver)
+        
+        app.invoke({"count": 0}, _config("a"))
+        app.invoke({"count": 0}, _config("b"))
+        
+        assert app.get_state(_config("a")).values == {"count": 1}
+        assert app.get_state(_config("b")).values == {"count": 1}
+    
+    def test_evicts_least_recently_used_thread(self):
+        """Should drop the oldest untouched conversation when over the cap."""
+        saver = BoundedMemorySaver(max_threads=2)
+        app = _counter_graph(saver)
+        
+        app.invoke({"count": 0}, _config("a"))
+        app.invoke({"count": 0}, _config("b"))
+        app.get_state(_config("a"))  # "a" is now the most recent
+        app.invoke({"count": 0}, _config("c"))
+        
+        assert "b" not in saver.storage
+        assert app.get_state(_config("a")).values == {"count": 1}
+        assert app.get_state(_config("c")).values == {"count": 1}
+
+
+class TestCheckpointSerialization:
+    """Guards for how checkpoints store state."""
+    
+    def _run(self):
+        graph = StateGraph(ContextState)
+        graph.add_node("first", lambda state: {"count": state["count"] + 1})
+        graph.add_node("second", lambda state: {"count": state["count"] + 1})
+        graph.set_entry_point("first")
+        graph.add_edge("first", "second")
+        graph.add_edge("second", END)
+        
+        saver = BoundedMemorySaver()
+        graph.compile(checkpointer=saver).invoke(
+            {"context": "x" * 5000, "count": 0},
+            _config("t")
+        )
+        return saver
+    
+    def test_channels_stored_as_msgpack(self):
+        """Should use the compact msgpack encoding for state values."""
+        saver = self._run()
+        
+        encodings = {blob[0] for key, blob in saver.blobs.items() if key[2] in ("context", "count")}
+        assert encodings == {"msgpack"}
+    
+    def test_unchanged_channels_not_rewritten(self):
+        """Should serialize a large channel once, not after every node."""
+        saver = self._run()
+        
+        context_blobs = [key for key in saver.blobs if key[2] == "context"]
+        count_blobs = [key for key in saver.blobs if key[2] == "count"]
+        
+        assert len(context_blobs) == 1
+        assert len(count_blobs) == 3
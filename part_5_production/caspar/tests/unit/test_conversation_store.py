@@ -0,0 +1,82 @@
+"""Unit tests for API conversation storage."""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from caspar.agent.state import create_initial_state
+from caspar.api.conversations import InMemoryConversationStore, _dump_state, _load_state
+
+
+class TestInMemoryConversationStore:
+    """Tests for the in-memory conversation store."""
+    
+    async def test_set_and_get(self):
+        """Should return the record that was stored."""
+        store = InMemoryConversationStore()
+        record = {"customer_id": "CUST-1", "state": create_initial_state("conv-1", "CUST-1")}
+        
+        await store.set("conv-1", record)
+        
+        assert await store.get("conv-1") == record
+        assert await store.get("conv-2") is None
+    
+    async def test_delete(self):
+        """Should report whether a conversation was removed."""
+        store = InMemoryConversationStore()
+        await store.set("conv-1", {"customer_id": "CUST-1", "state": {}})
+        
+        assert await store.delete("conv-1") is True
+        assert await store.delete("conv-1") is False
+        assert await store.get("conv-1") is None
+    
+    async def test_evicts_least_recently_used(self):
+        """Should drop the conversation used longest ago when full."""
+        store = InMemoryConversationStore(max_conversations=2)
+        await store.set("conv-1", {"customer_id": "CUST-1", "state": {}})
+        await store.set("conv-2", {"customer_id": "CUST-2", "state": {}})
+        await store.get("conv-1")
+        
+        await store.set("conv-3", {"customer_id": "CUST-3", "state": {}})
+        
+        assert len(store) == 2
+        assert await store.get("conv-2") is None
+        assert await store.get("conv-1") is not None
+    
+    async def test_idle_conversations_expire(self, monkeypatch):
+        """Should forget conversations idle for longer than the TTL."""
+        clock = [1000.0]
+        monkeypatch.setattr("caspar.api.conversations.time.monotonic", lambda: clock[0])
+        store = InMemoryConversationStore(ttl_seconds=60)
+        await store.set("conv-1", {"customer_id": "CUST-1", "state": {}})
+        await store.set("conv-2", {"customer_id": "CUST-2", "state": {}})
+        
+        clock[0] += 30
+        await store.get("conv-2")
+        clock[0] += 45
+        
+        assert store.evict_expired() == 1
+        assert await store.get("conv-1") is None
+        assert await store.get("conv-2") is not None
+
+
+class TestStateSerialization:
+    """Tests for the encoding used by the Redis store."""
+    
+    @pytest.fixture(autouse=True)
+    def require_orjson(self):
+        pytest.importorskip("orjson")
+    
+    def test_round_trip_keeps_messages(self):
+        """Messages should come back as LangChain messages with their IDs."""
+        state = create_initial_state("conv-1", "CUST-1")
+        state["messages"] = [
+            HumanMessage(content="Where is my order?", id="m1"),
+            AIMessage(content="Let me check.", id="m2"),
+        ]
+        state["intent"] = "order_inquiry"
+        
+        restored = _load_state(_dump_state(state))
+        
+        assert restored["messages"] == state["messages"]
+        assert restored["intent"] == "order_inquiry"
+        assert restored["conversation_id"] == "conv-1"
@@ -0,0 +1,69 @@
+"""Unit tests for the embedding cache."""
+
+from langchain_core.embeddings import Embeddings
+
+from caspar.knowledge.embedding_cache import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    """Embeds text as [len(text)] and records the texts it was asked for."""
+    
+    model = "counting"
+    
+    def __init__(self):
+        self.embedded: list[str] = []
+    
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.embedded.extend(texts)
+        return [[float(len(text))] for text in texts]
+    
+    def embed_query(self, text: str) -> list[float]:
+        return self.embed_documents([text])[0]
+
+
+class TestCachedEmbeddings:
+    """Tests for CachedEmbeddings."""
+    
+    def test_memory_cache_skips_repeat_texts(self):
+        """Texts seen before shouldn't reach the model again."""
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner)
+        
+        assert cached.embed_documents(["a", "bb"]) == [[1.0], [2.0]]
+        assert cached.embed_documents(["bb", "ccc", "a"]) == [[2.0], [3.0], [1.0]]
+        assert cached.embed_query("ccc") == [3.0]
+        
+        assert inner.embedded == ["a", "bb", "ccc"]
+        assert cached.cache_stats() == {"hits": 3, "misses": 3, "in_memory": 3}
+    
+    def test_memory_cache_evicts_least_recently_used(self):
+        """Only memory_capacity vectors should be kept in memory."""
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner, memory_capacity=2)
+        
+        cached.embed_documents(["a", "bb"])
+        cached.embed_query("a")
+        cached.embed_query("ccc")
+        cached.embed_query("bb")
+        
+        assert inner.embedded == ["a", "bb", "ccc", "bb"]
+    
+    def test_sqlite_cache_survives_new_instances(self, tmp_path):
+        """A fresh wrapper should read vectors another one stored."""
+        path = str(tmp_path / "cache.sqlite")
+        CachedEmbeddings(CountingEmbeddings(), path).embed_documents(["a", "bb"])
+        
+        inner = CountingEmbeddings()
+        assert CachedEmbeddings(inner, path).embed_documents(["bb", "a"]) == [[2.0], [1.0]]
+        assert inner.embedded == []
+    
+    def test_sqlite_cache_prunes_oldest_on_open(self, tmp_path):
+        """Opening a cache over max_entries should keep only the newest vectors."""
+        path = str(tmp_path / "cache.sqlite")
+        CachedEmbeddings(CountingEmbeddings(), path).embed_documents(["a", "bb", "ccc"])
+        
+        inner = CountingEmbeddings()
+        cached = CachedEmbeddings(inner, path, memory_capacity=0, max_entries=2)
+        cached.embed_documents(["a", "bb", "ccc"])
+        
+        assert inner.embedded == ["a"]
@@ -0,0 +1,140 @@
+"""Unit tests for the exact in-memory vector index."""
+
+from unittest.mock import MagicMock
+
+import numpy as np
+import pytest
+from langchain_core.documents import Document
+
+from caspar.knowledge.faiss_backend import FAISSRetriever, FlatVectorIndex
+
+
+def make_index(dtype: str = "float32") -> FlatVectorIndex:
+    vectors = [[1.0, 0.0], [0.0, 2.0], [1.0, 1.0], [-1.0, 0.0]]
+    documents = [
+        Document(page_content="east", metadata={"category": "faq"}),
+        Document(page_content="north", metadata={"category": "policy"}),
+        Document(page_content="north-east", metadata={"category": "faq"}),
+        Document(page_content="west", metadata={"category": "policy"}),
+    ]
+    return FlatVectorIndex(vectors, documents, dtype=dtype)
+
+
+class TestFlatVectorIndex:
+    """Tests for FlatVectorIndex."""
+    
+    def test_nearest_first_by_cosine(self):
+        """Results should be ordered by cosine distance, ignoring magnitude."""
+        results = make_index().search([[3.0, 0.1]], k=3)[0]
+        
+        assert [doc.page_content for doc, _ in results] == ["east", "north-east", "north"]
+        assert results[0][1] == pytest.approx(0.0, abs=1e-3)
+        assert results[0][1] < results[1][1] < results[2][1]
+    
+    def test_batch_queries_keep_order(self):
+        """Each query should get its own result list, in input order."""
+        results = make_index().search([[0.0, 1.0], [-1.0, 0.0]], k=1)
+        
+        assert [[doc.page_content for doc, _ in r] for r in results] == [["north"], ["west"]]
+    
+    def test_metadata_filter(self):
+        """Only documents matching the filter should be returned."""
+        results = make_index().search([[0.0, 1.0]], k=4, where={"category": "faq"})[0]
+        
+        assert [doc.page_content for doc, _ in results] == ["north-east", "east"]
+    
+    def test_k_larger_than_index(self):
+        """Asking for more documents than exist should return them all."""
+        assert len(make_index().search([[1.0, 0.0]], k=10)[0]) == 4
+    
+    def test_empty_index(self):
+        """An empty index should return no results rather than fail."""
+        assert FlatVectorIndex([], []).search([[1.0, 0.0]], k=3) == [[]]
+
+
+class TestQuantizedFlatIndex:
+    """Tests for the float16 and int8 storage formats."""
+    
+    @pytest.mark.parametrize("dtype", ["float16", "int8"])
+    def test_same_ranking_as_float32(self, dtype):
+        """Reduced precision shouldn't change which documents come back."""
+        results = make_index(dtype).search([[3.0, 0.1]], k=3)[0]
+        
+        assert [doc.page_content for doc, _ in results] == ["east", "north-east", "north"]
+        assert results[0][1] == pytest.approx(0.0, abs=1e-2)
+    
+    @pytest.mark.parametrize("dtype", ["float16", "int8"])
+    def test_recall_against_float32(self, dtype):
+        """Top-10 results should match the exact float32 search almost entirely."""
+        rng = np.random.default_rng(0)
+        vectors = rng.standard_normal((500, 64)).tolist()
+        documents = [Document(page_content=str(i)) for i in range(500)]
+        queries = rng.standard_normal((20, 64)).tolist()
+        
+        exact = FlatVectorIndex(vectors, documents).search(queries, k=10)
+        reduced = FlatVectorIndex(vectors, documents, dtype=dtype).search(queries, k=10)
+        
+        overlap = sum(
+            len({d.page_content for d, _ in a} & {d.page_content for d, _ in b})
+            for a, b in zip(exact, reduced)
+        )
+        assert overlap / 200 >= 0.95
+    
+    def test_reduced_formats_use_less_memory(self):
+        """float16 should halve the vector memory and int8 roughly quarter it."""
+        vectors = np.ones((100, 256)).tolist()
+        documents = [Document(page_content=str(i)) for i in range(100)]
+        
+        full = FlatVectorIndex(vectors, documents).nbytes
+        
+        assert FlatVectorIndex(vectors, documents, dtype="float16").nbytes == full // 2
+        assert FlatVectorIndex(vectors, documents, dtype="int8").nbytes < full // 3
+    
+    def test_unknown_dtype_rejected(self):
+        """An unsupported storage format should fail loudly."""
+        with pytest.raises(ValueError):
+            make_index("float64")
+
+
+class TestRetrieverResultCache:
+    """Tests for caching search results on the retriever."""
+    
+    def make_retriever(self) -> tuple[FAISSRetriever, list[str]]:
+        queried: list[str] = []
+        retriever = FAISSRetriever()
+        retriever.embeddings = MagicMock()
+        retriever.embeddings.embed_query.side_effect = lambda text: queried.append(text) or [1.0, 0.0]
+        retriever.index = make_index()
+        retriever._initialized = True
+        retriever.clear_cache()
+        return retriever, queried
+    
+    def test_repeat_query_is_served_from_cache(self):
+        """The same (query, k, category) shouldn't be embedded twice."""
+        retriever, queried = self.make_retriever()
+        
+        first = retriever.retrieve("return policy", k=2)
+        second = retriever.retrieve("return policy", k=2)
+        
+        assert [doc.page_content for doc in second] == [doc.page_content for doc in first]
+        assert queried == ["return policy"]
+    
+    def test_k_and_category_are_part_of_the_key(self):
+        """A different k or category filter should run a new search."""
+        retriever, queried = self.make_retriever()
+        
+        retriever.retrieve("return policy", k=2)
+        retriever.retrieve("return policy", k=3)
+        retriever.retrieve("return policy", k=2, category_filter="faq")
+        
+        assert len(queried) == 3
+    
+    def test_clear_cache(self):
+        """Clearing the cache should force a fresh search."""
+        retriever, queried = self.make_retriever()
+        
+        retriever.retrieve("return policy")
+        retriever.clear_cache()
+        retriever.retrieve("return policy")
+        
+        assert len(queried) == 2
@@ -0,0 +1,28 @@
+"""Unit tests for response approval rules."""
+
+from caspar.handoff.approval import approval_reasons, get_approval_reason, needs_approval
+
+
+class TestApprovalRules:
+    """Tests for needs_approval and get_approval_reason."""
+    
+    def test_no_approval_for_routine_response(self):
+        """A plain conversation shouldn't need review."""
+        state = {"intent": "faq", "sentiment_score": 0.3}
+        
+        assert approval_reasons(state) == []
+        assert needs_approval(state) is False
+        assert get_approval_reason(state) == "Manual review requested"
+    
+    def test_reasons_match_decision(self):
+        """Every rule that fires should be reported."""
+        state = {
+            "pending_refund_amount": 250,
+            "intent": "complaint",
+            "customer_tenure_days": 10,
+        }
+        
+        assert needs_approval(state) is True
+        assert get_approval_reason(state) == (
+            "High-value refund: $250; New customer complaint - retention risk"
+        )
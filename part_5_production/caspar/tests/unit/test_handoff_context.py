@@ -0,0 +1,114 @@
+"""Unit tests for handoff context packaging."""
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from caspar.agent.state import create_initial_state
+from caspar.handoff.context import TranscriptTurn, format_context_for_display, package_context_for_agent
+
+
+def _state(*messages):
+    state = create_initial_state("conv-ctx", "CUST-1")
+    state["messages"] = list(messages)
+    return state
+
+
+class TestPackageContextForAgent:
+    """Tests for package_context_for_agent."""
+    
+    def test_summary_uses_first_and_last_customer_messages(self):
+        """The summary should quote the initial and most recent inquiries."""
+        context = package_context_for_agent(
+            _state(
+                HumanMessage(content="Where is my order?"),
+                AIMessage(content="Let me check."),
+                HumanMessage(content="It's been two weeks."),
+            ),
+            request_id="HO-sum",
+        )
+        
+        assert "Initial inquiry: Where is my order?" in context.conversation_summary
+        assert "Most recent message: It's been two weeks." in context.conversation_summary
+        assert [m["role"] for m in context.transcript] == ["customer", "caspar", "customer"]
+    
+    def test_transcript_dicts_are_built_on_demand(self):
+        """Turns are stored as tuples; the dict view is only built when read."""
+        context = package_context_for_agent(
+            _state(HumanMessage(content="Hi"), AIMessage(content="Hello!")),
+            request_id="HO-turns",
+        )
+        
+        assert context.turns == [TranscriptTurn("customer", "Hi"), TranscriptTurn("caspar", "Hello!")]
+        assert context._transcript is None
+        assert context.transcript == [
+            {"role": "customer", "content": "Hi"},
+            {"role": "caspar", "content": "Hello!"},
+        ]
+    
+    def test_repackaging_reads_current_state(self):
+        """Fields besides the messages should never come from an earlier context."""
+        state = _state(HumanMessage(content="Hello"))
+        package_context_for_agent(state, request_id="HO-state")
+        
+        state["escalation_triggers"] = ["high_frustration"]
+        state["sentiment_score"] = -0.9
+        context = package_context_for_agent(
+            state,
+            request_id="HO-state",
+            customer_info={"name": "Alex Doe", "loyalty_tier": "gold"},
+        )
+        
+        assert context.escalation_triggers == ["high_frustration"]
+        assert context.sentiment_score == -0.9
+        assert context.customer_tier == "gold"
+    
+    def test_new_messages_repackage(self):
+        """A longer conversation should produce a fresh context."""
+        state = _state(HumanMessage(content="Hello"))
+        first = package_context_for_agent(state, request_id="HO-grow")
+        
+        state["messages"].append(AIMessage(content="Hi there"))
+        second = package_context_for_agent(state, request_id="HO-grow")
+        
+        assert second is not first
+        assert second.message_count == 2
+    
+    def test_repackaging_extends_previous_transcript(self):
+        """A later handoff should keep the earlier transcript and add new messages."""
+        state = _state(HumanMessage(content="My order is late"), AIMessage(content="Sorry!"))
+        package_context_for_agent(state, request_id="HO-first")
+        
+        state["messages"] += [HumanMessage(content="Still nothing"), AIMessage(content="Escalating.")]
+        context = package_context_for_agent(state, request_id="HO-second")
+        
+        assert [m["content"] for m in context.transcript] == [
+            "My order is late", "Sorry!", "Still nothing", "Escalating.",
+        ]
+        assert context.initial_inquiry == "My order is late"
+        assert context.latest_inquiry == "Still nothing"
+    
+    def test_rewritten_history_repackages_from_scratch(self):
+        """If earlier messages changed, the previous transcript shouldn't be reused."""
+        state = _state(HumanMessage(content="First question"))
+        package_context_for_agent(state, request_id="HO-rewrite-1")
+        
+        state["messages"] = [HumanMessage(content="Other question"), AIMessage(content="Answer")]
+        context = package_context_for_agent(state, request_id="HO-rewrite-2")
+        
+        assert context.transcript[0]["content"] == "Other question"
+        assert context.initial_inquiry == "Other question"
+
+
+class TestFormatContextForDisplay:
+    """Tests for format_context_for_display."""
+    
+    def test_truncates_long_messages(self):
+        """Transcript lines should be cut at 200 characters."""
+        context = package_context_for_agent(
+            _state(HumanMessage(content="x" * 250)),
+            request_id="HO-display",
+        )
+        
+        text = format_context_for_display(context)
+        
+        assert f"Customer: {'x' * 200}..." in text
+        assert format_context_for_display(context) is text
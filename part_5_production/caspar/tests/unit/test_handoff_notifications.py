@@ -0,0 +1,116 @@
+"""Unit tests for agent notifications."""
+
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from caspar.handoff import notifications
+from caspar.handoff.notifications import (
+    get_available_agents,
+    notify_available_agents,
+    notify_available_agents_async,
+    register_agent,
+    remove_agent,
+    set_agent_status,
+)
+from caspar.handoff.queue import HandoffRequest
+
+
+class TestGetAvailableAgents:
+    """Tests for get_available_agents."""
+    
+    def test_without_skills_returns_available_agents(self):
+        """Busy agents should be left out."""
+        agents = get_available_agents()
+        
+        assert {a["id"] for a in agents} == {"AGENT-001", "AGENT-002"}
+    
+    def test_filters_by_any_required_skill(self):
+        """Agents with at least one of the skills should match."""
+        agents = get_available_agents(["shipping", "vip"])
+        
+        assert [a["id"] for a in agents] == ["AGENT-002"]
+    
+    def test_unknown_skill_matches_nobody(self):
+        """A skill no agent has should not fall back to everyone."""
+        assert get_available_agents(["astrology"]) == []
+    
+    def test_status_change_updates_availability(self):
+        """Agents becoming available should be matched straight away."""
+        set_agent_status("AGENT-003", "available")
+        try:
+            assert [a["id"] for a in get_available_agents(["vip"])] == ["AGENT-003"]
+        finally:
+            set_agent_status("AGENT-003", "busy")
+        
+        assert get_available_agents(["vip"]) == []
+    
+    def test_registered_agent_with_new_skill_is_matched(self):
+        """Agents added later, with skills nobody had, should be found."""
+        register_agent("AGENT-004", "Priya Patel", ["warranty"])
+        try:
+            assert [a["id"] for a in get_available_agents(["warranty"])] == ["AGENT-004"]
+            assert "AGENT-004" in {a["id"] for a in get_available_agents(["technical", "warranty"])}
+        finally:
+            remove_agent("AGENT-004")
+        
+        assert get_available_agents(["warranty"]) == []
+    
+    def test_returned_agents_are_copies(self):
+        """Changing a returned agent shouldn't change the pool."""
+        get_available_agents()[0]["status"] = "busy"
+        
+        assert {a["id"] for a in get_available_agents()} == {"AGENT-001", "AGENT-002"}
+    
+    def test_unknown_agent_raises(self):
+        """Updating an agent that doesn't exist should fail loudly."""
+        with pytest.raises(ValueError):
+            set_agent_status("AGENT-999", "available")
+
+
+class TestNotifyAvailableAgents:
+    """Tests for notification fan-out."""
+    
+    @pytest.fixture
+    def request_(self):
+        return HandoffRequest(
+            conversation_id="conv-1",
+            customer_id="CUST-1",
+            priority="high",
+            triggers=["high_frustration"],
+            reason="Customer is upset",
+        )
+    
+    def test_standard_notifications_are_batched_per_channel(self, request_, monkeypatch):
+        """Every available agent should be notified in one send."""
+        sent = []
+        executor = ThreadPoolExecutor(max_workers=2)
+        monkeypatch.setattr(notifications, "_notify_executor", executor)
+        monkeypatch.setattr(
+            notifications,
+            "_send_standard_batch",
+            lambda channel, agents, *_: sent.append((channel, [a["id"] for a in agents]))
+        )
+        
+        result = notify_available_agents(request_)
+        executor.shutdown(wait=True)
+        
+        assert [n.request_id for n in result] == [request_.request_id] * 2
+        assert sent == [("dashboard", ["AGENT-001", "AGENT-002"])]
+    
+    async def test_urgent_alerts_each_agent_and_survives_failures(self, request_, monkeypatch):
+        """A failing urgent alert shouldn't stop the other agents' alerts."""
+        request_.priority = "urgent"
+        sent = []
+        
+        def send(agent, *_):
+            if agent["id"] == "AGENT-001":
+                raise ConnectionError("slack is down")
+            sent.append(agent["id"])
+        
+        monkeypatch.setattr(notifications, "_send_urgent_notification", send)
+        
+        result = await notify_available_agents_async(request_)
+        
+        assert len(result) == 2
+        assert sent == ["AGENT-002"]
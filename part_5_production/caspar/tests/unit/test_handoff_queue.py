@@ -0,0 +1,152 @@
+"""Unit tests for the handoff queue."""
+
+import json
+
+from caspar.config import settings
+from caspar.handoff.queue import (
+    HandoffQueue,
+    HandoffStatus,
+    Priority,
+    _create_handoff_queue,
+    _dump_request,
+    _load_request,
+    encode_request,
+    format_timestamp,
+)
+
+
+def _add(queue: HandoffQueue, conversation_id: str, priority: str):
+    return queue.add(conversation_id, "CUST-1000", priority, ["general"], "Needs help")
+
+
+class TestHandoffQueue:
+    """Tests for queue ordering and counts."""
+    
+    def test_positions_follow_priority_then_arrival(self):
+        """Higher priorities go first; equal priorities keep arrival order."""
+        queue = HandoffQueue()
+        medium = _add(queue, "conv-1", "medium")
+        urgent = _add(queue, "conv-2", "urgent")
+        high = _add(queue, "conv-3", "high")
+        second_medium = _add(queue, "conv-4", "medium")
+        low = _add(queue, "conv-5", "low")
+        
+        positions = [
+            queue.get_queue_position(request.request_id)
+            for request in (urgent, high, medium, second_medium, low)
+        ]
+        
+        assert positions == [1, 2, 3, 4, 5]
+    
+    def test_assigned_and_resolved_requests_leave_queue(self):
+        """Requests that are picked up should no longer count or hold a position."""
+        queue = HandoffQueue()
+        first = _add(queue, "conv-1", "high")
+        second = _add(queue, "conv-2", "high")
+        third = _add(queue, "conv-3", "low")
+        
+        queue.assign(first.request_id, "agent-1")
+        queue.resolve(third.request_id)
+        
+        assert queue.get_queue_position(first.request_id) == 0
+        assert queue.get_queue_position(second.request_id) == 1
+        assert queue.get_pending_count() == {"urgent": 0, "high": 1, "medium": 0, "low": 0}
+    
+    def test_counts_survive_repeated_transitions(self):
+        """Leaving the queue twice, or re-queuing later, should keep counts right."""
+        queue = HandoffQueue()
+        request = _add(queue, "conv-1", "urgent")
+        
+        queue.assign(request.request_id, "agent-1")
+        queue.resolve(request.request_id)
+        assert queue.get_pending_count()["urgent"] == 0
+        
+        again = _add(queue, "conv-1", "urgent")
+        assert again is not request
+        assert queue.get_pending_count()["urgent"] == 1
+        assert queue.get_queue_position(again.request_id) == 1
+    
+    def test_duplicate_conversation_returns_existing_request(self):
+        """A conversation can only wait in the queue once."""
+        queue = HandoffQueue()
+        first = _add(queue, "conv-1", "medium")
+        
+        assert _add(queue, "conv-1", "medium") is first
+        assert queue.get_pending_count()["medium"] == 1
+    
+    def test_wait_estimate_counts_requests_ahead(self):
+        """Wait estimates should grow with the number of requests ahead."""
+        queue = HandoffQueue()
+        for i in range(3):
+            _add(queue, f"conv-{i}", "medium")
+        
+        assert _add(queue, "conv-urgent", "urgent").estimated_wait == 2
+        assert _add(queue, "conv-low", "low").estimated_wait == 4 * 5 + 5
+    
+    def test_unknown_priority_queues_as_medium(self):
+        """A request with an unrecognized priority should wait with medium ones."""
+        queue = HandoffQueue()
+        _add(queue, "conv-1", "high")
+        request = _add(queue, "conv-2", "whenever")
+        
+        assert request.priority_rank == Priority.MEDIUM
+        assert queue.get_queue_position(request.request_id) == 2
+        assert queue.get_pending_count()["medium"] == 1
+    
+    def test_timestamps_render_as_iso(self):
+        """Nanosecond timestamps should format as UTC ISO strings on demand."""
+        queue = HandoffQueue()
+        request = _add(queue, "conv-1", "high")
+        
+        assert request.assigned_at_iso is None
+        
+        queue.assign(request.request_id, "agent-1")
+        
+        assert request.assigned_at >= request.created_at
+        assert request.assigned_at_iso.endswith("+00:00")
+        assert format_timestamp(0) == "1970-01-01T00:00:00+00:00"
+
+
+class TestEncodeRequest:
+    """Tests for JSON encoding of handoff requests."""
+    
+    def test_encodes_plain_json(self):
+        """Status should be its value and timestamps ISO strings."""
+        queue = HandoffQueue()
+        request = _add(queue, "conv-1", "high")
+        
+        data = json.loads(encode_request(request))
+        
+        assert data["request_id"] == request.request_id
+        assert data["status"] == "queued"
+        assert data["created_at"] == request.created_at_iso
+        assert data["assigned_at"] is None
+        assert "priority_rank" not in data
+    
+    def test_falls_back_to_stdlib_json(self, monkeypatch):
+        """Encoding shouldn't need orjson."""
+        monkeypatch.setattr("caspar.handoff.queue.orjson", None)
+        request = _add(HandoffQueue(), "conv-1", "low")
+        
+        assert json.loads(encode_request(request))["priority"] == "low"
+
+
+class TestRedisHandoffQueueSupport:
+    """Tests for the pieces of the Redis queue that don't need a server."""
+    
+    def test_stored_request_round_trips(self):
+        """Requests read back from storage should match what was written."""
+        request = _add(HandoffQueue(), "conv-1", "urgent")
+        
+        restored = _load_request(_dump_request(request))
+        
+        assert restored == request
+        assert restored.status is HandoffStatus.QUEUED
+        assert restored.priority_rank == Priority.URGENT
+    
+    def test_falls_back_to_memory_without_redis(self, monkeypatch):
+        """A Redis backend with no Redis configured should still give a working queue."""
+        monkeypatch.setattr(settings, "handoff_backend", "redis")
+        monkeypatch.setattr(settings, "redis_url", None)
+        
+        assert isinstance(_create_handoff_queue(), HandoffQueue)
@@ -0,0 +1,82 @@
+"""Unit tests for the embedding-based intent classifier."""
+
+import pytest
+from langchain_core.embeddings import Embeddings
+
+from caspar.agent.intent_classifier import IntentClassifier
+
+
+class BagOfWordsEmbeddings(Embeddings):
+    """Tiny deterministic embeddings - one dimension per vocabulary word."""
+    
+    VOCAB = ["return", "policy", "order", "track", "password", "login", "human", "person"]
+    
+    def __init__(self):
+        self.calls = 0
+    
+    def embed_documents(self, texts: list[str]) -> list[list[float]]:
+        self.calls += 1
+        return [self._embed(text) for text in texts]
+    
+    def embed_query(self, text: str) -> list[float]:
+        self.calls += 1
+        return self._embed(text)
+    
+    def _embed(self, text: str) -> list[float]:
+        words = text.lower().replace("?", "").split()
+        return [float(words.count(word)) for word in self.VOCAB]
+
+
+EXAMPLES = {
+    "faq": ["return policy", "what is the return policy", "policy on returns"],
+    "order_inquiry": ["track my order", "where is my order", "order status"],
+    "account": ["reset password", "login problem", "password login"],
+    "handoff_request": ["talk to a human", "real person please", "human person"],
+}
+
+
+class TestIntentClassifier:
+    """Tests for IntentClassifier."""
+    
+    def setup_method(self):
+        """Set up a classifier over the toy examples."""
+        self.embeddings = BagOfWordsEmbeddings()
+        self.classifier = IntentClassifier(self.embeddings, examples=EXAMPLES, k=3)
+    
+    def test_predicts_nearest_label(self):
+        """Should pick the label whose examples are closest."""
+        intent, confidence = self.classifier.predict("Can you track my order?")
+        
+        assert intent == "order_inquiry"
+        assert confidence == 1.0
+    
+    def test_confidence_reflects_disagreement(self):
+        """Should report low confidence when neighbors disagree."""
+        _, confidence = self.classifier.predict("human login")
+        
+        assert confidence == pytest.approx(2 / 3)
+    
+    def test_examples_embedded_once(self):
+        """Should embed the examples once and only the message afterwards."""
+        self.classifier.predict("return policy?")
+        self.classifier.predict("forgot my password")
+        
+        # One batched call for the examples + one per message
+        assert self.embeddings.calls == 3
+    
+    @pytest.mark.asyncio
+    async def test_apredict_matches_predict(self):
+        """Async prediction should agree with the sync version."""
+        assert await self.classifier.apredict("I want a human") == self.classifier.predict("I want a human")
+    
+    def test_failed_fit_leaves_classifier_unfitted(self):
+        """A failed example embedding shouldn't leave stale labels behind."""
+        self.embeddings.embed_documents = lambda texts: 1 / 0
+        
+        with pytest.raises(ZeroDivisionError):
+            self.classifier.predict("return policy?")
+        
+        del self.embeddings.embed_documents
+        
+        assert self.classifier.predict("return policy?") == ("faq", 1.0)
+        assert len(self.classifier._labels) == 12
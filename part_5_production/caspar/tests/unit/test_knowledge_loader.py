@@ -0,0 +1,68 @@
+"""Unit tests for the knowledge base loader."""
+
+from caspar.knowledge.loader import KnowledgeLoader
+
+
+class TestKnowledgeLoader:
+    """Tests for KnowledgeLoader."""
+    
+    def test_loads_every_markdown_file(self, tmp_path):
+        """Each file should become one document with source and category."""
+        for name in ("faq.md", "policies.md", "shipping.md"):
+            (tmp_path / name).write_text(f"# {name}\n\nContent of {name}", encoding="utf-8")
+        (tmp_path / "notes.txt").write_text("ignored", encoding="utf-8")
+        
+        documents = KnowledgeLoader(knowledge_dir=str(tmp_path)).load_documents()
+        
+        by_source = {doc.metadata["source"]: doc for doc in documents}
+        assert set(by_source) == {"faq.md", "policies.md", "shipping.md"}
+        assert by_source["policies.md"].metadata["category"] == "policy"
+        assert by_source["shipping.md"].page_content.endswith("Content of shipping.md")
+    
+    def test_unreadable_file_is_skipped(self, tmp_path):
+        """One bad file shouldn't stop the others from loading."""
+        (tmp_path / "faq.md").write_text("Questions", encoding="utf-8")
+        (tmp_path / "broken.md").mkdir()
+        
+        documents = KnowledgeLoader(knowledge_dir=str(tmp_path)).load_documents()
+        
+        assert [doc.metadata["source"] for doc in documents] == ["faq.md"]
+    
+    def test_only_loads_requested_files(self, tmp_path):
+        """The only argument should limit which files are read."""
+        (tmp_path / "faq.md").write_text("Questions", encoding="utf-8")
+        (tmp_path / "products.md").write_text("Laptops", encoding="utf-8")
+        
+        loader = KnowledgeLoader(knowledge_dir=str(tmp_path))
+        
+        assert [doc.page_content for doc in loader.load_documents(only=["products.md"])] == ["Laptops"]
+        assert set(loader.compute_digests()) == {"faq.md", "products.md"}
+    
+    def test_iter_chunks_matches_load_and_split(self, tmp_path):
+        """Streaming chunks should give the same chunks as the list version."""
+        (tmp_path / "faq.md").write_text("## Returns\n\n" + "Return it within 30 days. " * 40, encoding="utf-8")
+        (tmp_path / "products.md").write_text("## Laptops\n\nThe Pro 15 is our flagship.", encoding="utf-8")
+        
+        loader = KnowledgeLoader(knowledge_dir=str(tmp_path), chunk_size=200, chunk_overlap=20)
+        chunks = list(loader.iter_chunks())
+        
+        assert [c.page_content for c in chunks] == [c.page_content for c in loader.load_and_split()]
+        assert len(chunks) > 2
+    
+    def test_iter_chunks_records_chunk_lengths(self, tmp_path):
+        """The lengths of the streamed chunks should be kept for build stats."""
+        (tmp_path / "faq.md").write_text("## Returns\n\n" + "Return it within 30 days. " * 40, encoding="utf-8")
+        
+        loader = KnowledgeLoader(knowledge_dir=str(tmp_path), chunk_size=200, chunk_overlap=20)
+        chunks = list(loader.iter_chunks())
+        
+        assert loader.chunk_lengths == [len(c.page_content) for c in chunks]
+    
+    def test_loaders_share_a_splitter(self, tmp_path):
+        """Loaders with the same chunk settings should reuse one splitter."""
+        first = KnowledgeLoader(knowledge_dir=str(tmp_path))
+        second = KnowledgeLoader(knowledge_dir=str(tmp_path))
+        other = KnowledgeLoader(knowledge_dir=str(tmp_path), chunk_size=200)
+        
+        assert first.text_splitter is second.text_splitter
+        assert other.text_splitter is not first.text_splitter
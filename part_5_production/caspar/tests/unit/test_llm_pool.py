@@ -0,0 +1,68 @@
+"""Unit tests for the shared LLM clients."""
+
+import asyncio
+
+import pytest
+
+from caspar.agent.llm_pool import aclose_llm_pool, clear_llm_pool, get_llm
+
+
+@pytest.fixture(autouse=True)
+def fresh_pool():
+    """Start and end every test with an empty pool."""
+    clear_llm_pool()
+    yield
+    clear_llm_pool()
+
+
+def _in_new_loop(fn):
+    """Run an async function on its own event loop, like asyncio.run()."""
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(fn())
+    finally:
+        loop.close()
+
+
+class TestGetLLM:
+    """Tests for get_llm."""
+    
+    def test_same_loop_reuses_client(self):
+        """Calls on one loop should share the client and its pool."""
+        async def fetch_twice():
+            return get_llm("gpt-4o-mini", 0), get_llm("gpt-4o-mini", 0)
+        
+        first, second = _in_new_loop(fetch_twice)
+        
+        assert first is second
+    
+    def test_each_loop_gets_its_own_client(self):
+        """Pooled connections can't cross loops, so neither can clients."""
+        async def fetch():
+            return get_llm("gpt-4o-mini", 0)
+        
+        assert _in_new_loop(fetch) is not _in_new_loop(fetch)
+    
+    def test_settings_are_part_of_the_key(self):
+        """Different temperatures or retry counts get different clients."""
+        assert get_llm("gpt-4o-mini", 0) is not get_llm("gpt-4o-mini", 0.7)
+        assert get_llm("gpt-4o-mini", 0) is not get_llm("gpt-4o-mini", 0, max_retries=5)
+    
+    def test_clear_forgets_clients(self):
+        """clear_llm_pool() should make the next call build a new client."""
+        before = get_llm("gpt-4o-mini", 0)
+        
+        clear_llm_pool()
+        
+        assert get_llm("gpt-4o-mini", 0) is not before
+    
+    def test_aclose_replaces_the_loop_client(self):
+        """After closing the pool, the same loop gets a fresh client."""
+        async def close_between():
+            before = get_llm("gpt-4o-mini", 0)
+            await aclose_llm_pool()
+            return before, get_llm("gpt-4o-mini", 0)
+        
+        before, after = _in_new_loop(close_between)
+        
+        assert before is not after
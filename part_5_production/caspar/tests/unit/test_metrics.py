@@ -0,0 +1,68 @@
+"""Unit tests for API metrics."""
+
+from typing import TypedDict
+
+import pytest
+from langgraph.graph import StateGraph, START, END
+
+from caspar.api.metrics import NodeLatencyTracker, SimpleMetrics
+
+
+class TestLatencyStats:
+    """Tests for running latency statistics."""
+    
+    def test_running_totals(self):
+        """Should report count, average, min and max without storing samples."""
+        metrics = SimpleMetrics()
+        for seconds in (0.002, 0.004, 0.006):
+            metrics.record_latency("llm_call", seconds)
+        
+        stats = metrics.get_stats()["latencies"]["llm_call"]
+        
+        assert stats["count"] == 3
+        assert stats["avg_ms"] == pytest.approx(4.0)
+        assert stats["min_ms"] == pytest.approx(2.0)
+        assert stats["max_ms"] == pytest.approx(6.0)
+    
+    def test_histogram_is_cumulative(self):
+        """Each bucket should count every measurement at or below its bound."""
+        metrics = SimpleMetrics()
+        for seconds in (0.001, 0.03, 0.3, 12):
+            metrics.record_latency("llm_call", seconds)
+        
+        histogram = metrics.get_stats()["latencies"]["llm_call"]["histogram"]
+        
+        assert histogram["0.001"] == 1
+        assert histogram["0.05"] == 2
+        assert histogram["0.5"] == 3
+        assert histogram["5"] == 3
+        assert histogram["+Inf"] == 4
+    
+
+class TestNodeLatencyTracker:
+    """Tests for per-node graph timings."""
+    
+    async def test_records_each_node_once(self):
+        """Should record one latency per node run, named after the node."""
+        class State(TypedDict):
+            count: int
+        
+        async def step(state):
+            return {"count": state["count"] + 1}
+        
+        graph = StateGraph(State)
+        graph.add_node("first", step)
+        graph.add_node("second", step)
+        graph.add_edge(START, "first")
+        graph.add_edge("first", "second")
+        graph.add_edge("second", END)
+        
+        metrics = SimpleMetrics()
+        await graph.compile().ainvoke(
+            {"count": 0},
+            {"callbacks": [NodeLatencyTracker(metrics)]},
+        )
+        
+        latencies = metrics.get_stats()["latencies"]
+        assert set(latencies) == {"node.first", "node.second"}
+        assert latencies["node.first"]["count"] == 1
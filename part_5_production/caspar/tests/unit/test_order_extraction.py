@@ -0,0 +1,29 @@
+"""Unit tests for order ID extraction."""
+
+import pytest
+
+from caspar.agent.nodes import extract_order_id
+
+
+class TestExtractOrderId:
+    """Tests for the regex order ID extractor."""
+    
+    @pytest.mark.parametrize("message,expected", [
+        ("Where is my order TF-10000?", "TF-10000"),
+        ("track tf10001 please", "TF-10001"),
+        ("Order TF 10002 hasn't arrived", "TF-10002"),
+        ("What's the status of order 10005?", "TF-10005"),
+        ("My order #10010 is late", "TF-10010"),
+    ])
+    def test_finds_order_ids(self, message, expected):
+        """Should find and normalize order IDs in their usual forms."""
+        assert extract_order_id(message) == expected
+    
+    @pytest.mark.parametrize("message", [
+        "Where is my order?",
+        "I ordered 3 items",
+        "Call me at 555-1234",
+    ])
+    def test_no_order_id(self, message):
+        """Should return None when there's no order ID."""
+        assert extract_order_id(message) is None
@@ -0,0 +1,90 @@
+"""Unit tests for the plan and response cache."""
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from caspar.agent.plan_cache import (
+    TTLCache,
+    canonicalize,
+    response_cache_key,
+)
+
+
+class TestCanonicalize:
+    """Tests for question canonicalization."""
+    
+    def test_paraphrases_share_a_key(self):
+        """Should map paraphrased questions to the same key."""
+        assert canonicalize("What's your return policy?") == canonicalize("Tell me about the return policy")
+    
+    def test_content_words_kept(self):
+        """Should keep the words that change the question."""
+        assert canonicalize("How long does shipping take?") != canonicalize("How long does a refund take?")
+    
+    def test_greeting_only_is_empty(self):
+        """Should reduce pure filler to an empty key."""
+        assert canonicalize("Hi, hello!") == ""
+
+
+class TestTTLCache:
+    """Tests for the LRU/TTL cache."""
+    
+    def test_evicts_least_recently_used(self):
+        """Should drop the oldest untouched entry when full."""
+        cache = TTLCache(max_size=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+        
+        assert cache.get("a") == 1
+        assert cache.get("b") is None
+        assert cache.get("c") == 3
+    
+    def test_entries_expire(self, monkeypatch):
+        """Should stop returning entries older than the TTL."""
+        clock = [100.0]
+        monkeypatch.setattr("caspar.knowledge.ttl_cache.time.monotonic", lambda: clock[0])
+        
+        cache = TTLCache(max_size=10, ttl_seconds=60)
+        cache.set("a", 1)
+        clock[0] += 61
+        
+        assert cache.get("a") is None
+
+
+class TestResponseCacheKey:
+    """Tests for deciding which responses can be cached."""
+    
+    def _state(self, **overrides):
+        state = {
+            "intent": "faq",
+            "handler_used": "faq",
+            "context": "Returns accepted within 30 days.",
+            "messages": [HumanMessage(content="What is your return policy?")],
+        }
+        state.update(overrides)
+        return state
+    
+    def test_faq_opening_question_cacheable(self):
+        """Should cache an opening FAQ question."""
+        assert response_cache_key(self._state()) is not None
+    
+    @pytest.mark.parametrize("handler", ["order_inquiry", "account", "complaint"])
+    def test_customer_specific_handlers_not_cached(self, handler):
+        """Should never cache responses built from customer data."""
+        assert response_cache_key(self._state(intent=handler, handler_used=handler)) is None
+    
+    def test_follow_up_turns_not_cached(self):
+        """Should skip turns whose answer depends on earlier messages."""
+        state = self._state(messages=[
+            HumanMessage(content="What is your return policy?"),
+            AIMessage(content="30 days."),
+            HumanMessage(content="What about laptops?"),
+        ])
+        
+        assert response_cache_key(state) is None
+    
+    def test_context_change_changes_key(self):
+        """Should miss the cache when the knowledge base content changes."""
+        assert response_cache_key(self._state()) != response_cache_key(self._state(context="Returns within 14 days."))
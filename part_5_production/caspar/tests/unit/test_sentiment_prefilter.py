@@ -0,0 +1,37 @@
+"""Unit tests for the lexical sentiment pre-filter."""
+
+import pytest
+
+from caspar.agent.sentiment_prefilter import prefilter_sentiment
+
+
+class TestPrefilterSentiment:
+    """Tests for prefilter_sentiment."""
+    
+    @pytest.mark.parametrize("message", [
+        "What is your return policy?",
+        "How long does shipping take?",
+        "Thanks, that was really helpful",
+        "Where is my order TF-10001?",
+    ])
+    def test_neutral_and_positive_messages_scored(self, message):
+        """Should score clearly non-negative messages without the LLM."""
+        score = prefilter_sentiment(message)
+        
+        assert score is not None
+        assert -0.2 < score <= 1.0
+    
+    @pytest.mark.parametrize("message", [
+        "This is the worst service ever",
+        "I want a refund right now",
+        "I'm so frustrated with this laptop",
+        "Where is my order!!",
+        "WHY HAS NOBODY ANSWERED ME YET",
+    ])
+    def test_frustration_signals_go_to_llm(self, message):
+        """Should defer to the LLM when there are signs of frustration."""
+        assert prefilter_sentiment(message) is None
+    
+    def test_negative_wording_goes_to_llm(self):
+        """Should defer to the LLM when the message scores negative."""
+        assert prefilter_sentiment("Not happy, the order was wrong and the charger is missing") is None
@@ -0,0 +1,59 @@
+"""Unit tests for agent state helpers."""
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from caspar.agent.state import (
+    RECENT_HISTORY_LIMIT,
+    AgentState,
+    create_initial_state,
+    history_entry,
+    merge_recent_history,
+)
+
+
+class TestRecentHistory:
+    """Tests for the recent_history reducer."""
+    
+    def test_history_entry_labels_speaker(self):
+        """Should render customer and agent messages with their speaker."""
+        assert history_entry(HumanMessage(content="Hi", id="1")) == ("1", "Customer: Hi")
+        assert history_entry(AIMessage(content="Hello!", id="2")) == ("2", "Agent: Hello!")
+    
+    def test_keeps_only_recent_entries(self):
+        """Should keep the last RECENT_HISTORY_LIMIT entries."""
+        history = []
+        for i in range(RECENT_HISTORY_LIMIT + 3):
+            history = merge_recent_history(history, [(str(i), f"Customer: {i}")])
+        
+        assert len(history) == RECENT_HISTORY_LIMIT
+        assert history[-1] == (str(RECENT_HISTORY_LIMIT + 2), f"Customer: {RECENT_HISTORY_LIMIT + 2}")
+    
+    def test_resent_entries_not_duplicated(self):
+        """Should ignore entries that are already in the history."""
+        history = [("1", "Customer: Hi"), ("2", "Agent: Hello!")]
+        
+        assert merge_recent_history(history, history) == history
+
+
+class TestCreateInitialState:
+    """Tests for building a new conversation's state."""
+    
+    def test_sets_every_state_field(self):
+        """Should initialize exactly the fields AgentState declares."""
+        state = create_initial_state("conv-1", "CUST-1")
+        
+        assert set(state) == set(AgentState.__annotations__)
+        assert state["conversation_id"] == "conv-1"
+        assert state["customer_id"] == "CUST-1"
+        assert state["created_at"] == state["last_updated"]
+    
+    def test_message_lists_not_shared(self):
+        """Each conversation should get its own message lists."""
+        first = create_initial_state("conv-1")
+        second = create_initial_state("conv-2")
+        
+        first["messages"].append(HumanMessage(content="Hi"))
+        first["recent_history"].append(("1", "Customer: Hi"))
+        
+        assert second["messages"] == []
+        assert second["recent_history"] == []
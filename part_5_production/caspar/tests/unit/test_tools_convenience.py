@@ -1,7 +1,8 @@
 """Unit tests for tool convenience functions."""
 
 import pytest
-from caspar.tools import get_order_status, create_ticket, get_account_info
+from caspar.tools import AccountTool, OrderLookupTool, get_order_status, create_ticket, get_account_info
+from caspar.tools import accounts, orders
 
 
 class TestGetOrderStatus:
@@ -22,6 +23,26 @@ class TestGetOrderStatus:
         assert result["found"] is False
         assert "error" in result
         assert "not found" in result["error"].lower()
+    
+    def test_repeat_lookup_is_memoized(self, monkeypatch):
+        """The same order looked up twice should only hit the tool once."""
+        tool = OrderLookupTool()
+        calls = []
+        lookup = tool.lookup
+        monkeypatch.setattr(tool, "lookup", lambda *args: calls.append(args) or lookup(*args))
+        monkeypatch.setattr(orders, "_order_tool", tool)
+        
+        first = get_order_status("TF-10001")
+        second = get_order_status("TF-10001")
+        
+        assert first == second
+        assert len(calls) == 1
+    
+    def test_callers_get_their_own_copy(self):
+        """Changing one result shouldn't leak into the next caller's."""
+        get_order_status("TF-10001")["order"]["items"].clear()
+        
+        assert get_order_status("TF-10001")["order"]["items"]
 
 
 class TestCreateTicket:
@@ -81,3 +102,23 @@ class TestGetAccountInfo:
         
         assert result["found"] is False
         assert "error" in result
+    
+    def test_repeat_lookup_is_memoized(self, monkeypatch):
+        """The same account looked up twice should only hit the tool once."""
+        tool = AccountTool()
+        calls = []
+        get_account = tool.get_account
+        monkeypatch.setattr(tool, "get_account", lambda *args: calls.append(args) or get_account(*args))
+        monkeypatch.setattr(accounts, "_account_tool", tool)
+        
+        first = get_account_info("CUST-1000")
+        second = get_account_info("CUST-1000")
+        
+        assert first == second
+        assert len(calls) == 1
+    
+    def test_callers_get_their_own_copy(self):
+        """Changing one result shouldn't leak into the next caller's."""
+        get_account_info("CUST-1000")["account"]["name"] = "Someone Else"
+        
+        assert get_account_info("CUST-1000")["account"]["name"] != "Someone Else"
@@ -1,6 +1,7 @@
 """Unit tests for the order lookup tool."""
 
 import pytest
+from pydantic import ValidationError
 from caspar.tools.orders import (
     OrderLookupTool,
     get_order_status,
@@ -8,51 +9,92 @@ from caspar.tools.orders import (
 )
 
 
+@pytest.fixture(scope="module")
+def tool():
+    """
+    One tool for the whole module.
+    
+    Lookups only read the mock orders, and orders are immutable, so
+    there's no need to regenerate them for every test.
+    """
+    return OrderLookupTool()
+
+
 class TestOrderLookupTool:
     """Tests for OrderLookupTool class."""
     
-    def setup_method(self):
-        """Set up a fresh tool instance for each test."""
-        self.tool = OrderLookupTool()
-    
-    def test_lookup_existing_order(self):
+    def test_lookup_existing_order(self, tool):
         """Should find an order that exists."""
-        order = self.tool.lookup("TF-10001")
+        order = tool.lookup("TF-10001")
         
         assert order is not None
         assert order.order_id == "TF-10001"
         assert order.status in ["processing", "shipped", "delivered", "cancelled", "returned"]
     
-    def test_lookup_nonexistent_order(self):
+    def test_lookup_nonexistent_order(self, tool):
         """Should return None for orders that don't exist."""
-        order = self.tool.lookup("TF-99999")
+        order = tool.lookup("TF-99999")
         
         assert order is None
     
-    def test_lookup_normalizes_order_id(self):
+    def test_lookup_normalizes_order_id(self, tool):
         """Should handle order IDs without the TF- prefix."""
-        order = self.tool.lookup("10001")
+        order = tool.lookup("10001")
         
         assert order is not None
         assert order.order_id == "TF-10001"
     
-    def test_lookup_case_insensitive(self):
+    def test_lookup_case_insensitive(self, tool):
         """Should handle lowercase order IDs."""
-        order = self.tool.lookup("tf-10001")
+        order = tool.lookup("tf-10001")
+        
+        assert order is not None
+        assert order.order_id == "TF-10001"
+    
+    def test_lookup_strips_whitespace(self, tool):
+        """Should ignore whitespace around the order ID."""
+        order = tool.lookup("  TF-10001 ")
         
         assert order is not None
         assert order.order_id == "TF-10001"
     
-    def test_lookup_with_customer_verification(self):
+    @pytest.mark.parametrize("order_id", ["abc", "TF-", "TF-10001x", ""])
+    def test_lookup_malformed_order_id(self, tool, order_id):
+        """Should return None for IDs that aren't order numbers."""
+        assert tool.lookup(order_id) is None
+    
+    def test_lookup_with_customer_verification(self, tool):
         """Should verify customer ownership when customer_id provided."""
         # TF-10001 belongs to CUST-1001 in our mock data
-        order = self.tool.lookup("TF-10001", customer_id="CUST-1001")
+        order = tool.lookup("TF-10001", customer_id="CUST-1001")
         
         assert order is not None
     
-    def test_lookup_wrong_customer_returns_none(self):
+    def test_lookup_wrong_customer_returns_none(self, tool):
         """Should return None if customer doesn't own the order."""
         # TF-10001 belongs to CUST-1001, not CUST-1002
-        order = self.tool.lookup("TF-10001", customer_id="CUST-9999")
+        order = tool.lookup("TF-10001", customer_id="CUST-9999")
         
         assert order is None
+    
+    def test_summary_is_reused_for_the_same_order(self, tool):
+        """Formatting the same order twice should return the cached string."""
+        order = tool.lookup("TF-10001")
+        
+        assert tool.format_order_summary(order) is tool.format_order_summary(order)
+    
+    def test_summary_reflects_updated_order(self, tool):
+        """A changed copy of an order should get a fresh summary."""
+        order = tool.lookup("TF-10000")
+        tool.format_order_summary(order)
+        
+        cancelled = order.model_copy(update={"status": "cancelled"})
+        
+        assert "Status: CANCELLED" in tool.format_order_summary(cancelled)
+    
+    def test_orders_are_immutable(self, tool):
+        """Orders can't be changed in place (which would stale the summary cache)."""
+        order = tool.lookup("TF-10001")
+        
+        with pytest.raises(ValidationError):
+            order.status = "cancelled"
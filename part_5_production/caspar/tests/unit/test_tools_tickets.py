@@ -8,16 +8,24 @@ from caspar.tools.tickets import (
 )
 
 
+@pytest.fixture
+def fresh_tool():
+    """A new tool for tests that create tickets."""
+    return TicketTool()
+
+
+@pytest.fixture(scope="module")
+def empty_tool():
+    """One tool, never written to, for tests that only read."""
+    return TicketTool()
+
+
 class TestTicketTool:
     """Tests for TicketTool class."""
     
-    def setup_method(self):
-        """Set up a fresh tool instance for each test."""
-        self.tool = TicketTool()
-    
-    def test_create_ticket_returns_ticket(self):
+    def test_create_ticket_returns_ticket(self, fresh_tool):
         """Should create and return a ticket."""
-        ticket = self.tool.create(
+        ticket = fresh_tool.create(
             customer_id="CUST-1000",
             category="technical",
             subject="Test ticket",
@@ -30,9 +38,37 @@ class TestTicketTool:
         assert ticket.category == "technical"
         assert ticket.status == "open"
     
-    def test_create_ticket_with_priority(self):
+    def test_ticket_ids_are_unique(self, fresh_tool):
+        """Every ticket from the same tool should get its own ID."""
+        ids = {
+            fresh_tool.create(
+                customer_id="CUST-1000",
+                category="general",
+                subject=f"Ticket {i}",
+                description="Just asking",
+            ).ticket_id
+            for i in range(5)
+        }
+        
+        assert len(ids) == 5
+    
+    def test_ticket_ids_differ_between_tools(self):
+        """Tools in different workers (or after a restart) shouldn't reuse IDs."""
+        tickets = [
+            TicketTool().create(
+                customer_id="CUST-1000",
+                category="general",
+                subject="First ticket",
+                description="Just asking",
+            )
+            for _ in range(2)
+        ]
+        
+        assert tickets[0].ticket_id != tickets[1].ticket_id
+    
+    def test_create_ticket_with_priority(self, fresh_tool):
         """Should respect priority setting."""
-        ticket = self.tool.create(
+        ticket = fresh_tool.create(
             customer_id="CUST-1000",
             category="billing",
             subject="Urgent issue",
@@ -42,9 +78,9 @@ class TestTicketTool:
         
         assert ticket.priority == "urgent"
     
-    def test_create_ticket_default_priority(self):
+    def test_create_ticket_default_priority(self, fresh_tool):
         """Should default to medium priority."""
-        ticket = self.tool.create(
+        ticket = fresh_tool.create(
             customer_id="CUST-1000",
             category="general",
             subject="General question",
@@ -53,49 +89,63 @@ class TestTicketTool:
         
         assert ticket.priority == "medium"
     
-    def test_get_ticket_by_id(self):
+    def test_get_ticket_by_id(self, fresh_tool):
         """Should retrieve ticket by ID."""
-        created = self.tool.create(
+        created = fresh_tool.create(
             customer_id="CUST-1000",
             category="return",
             subject="Return request",
             description="Want to return item",
         )
         
-        retrieved = self.tool.get(created.ticket_id)
+        retrieved = fresh_tool.get(created.ticket_id)
         
         assert retrieved is not None
         assert retrieved.ticket_id == created.ticket_id
     
-    def test_get_nonexistent_ticket(self):
+    def test_get_nonexistent_ticket(self, empty_tool):
         """Should return None for tickets that don't exist."""
-        result = self.tool.get("TKT-NONEXISTENT")
+        result = empty_tool.get("TKT-NONEXISTENT")
         
         assert result is None
     
-    def test_get_customer_tickets(self):
+    def test_get_customer_tickets(self, fresh_tool):
         """Should retrieve all tickets for a customer."""
         # Create multiple tickets
-        self.tool.create(
+        fresh_tool.create(
             customer_id="CUST-TEST",
             category="technical",
             subject="Issue 1",
             description="First issue",
         )
-        self.tool.create(
+        fresh_tool.create(
             customer_id="CUST-TEST",
             category="billing",
             subject="Issue 2",
             description="Second issue",
         )
-        self.tool.create(
+        fresh_tool.create(
             customer_id="CUST-OTHER",
             category="general",
             subject="Other customer",
             description="Different customer",
         )
         
-        tickets = self.tool.get_customer_tickets("CUST-TEST")
+        tickets = fresh_tool.get_customer_tickets("CUST-TEST")
         
         assert len(tickets) == 2
         assert all(t.customer_id == "CUST-TEST" for t in tickets)
+    
+    def test_get_customer_tickets_returns_a_copy(self, fresh_tool):
+        """Changing the returned list shouldn't affect the stored tickets."""
+        fresh_tool.create(
+            customer_id="CUST-TEST",
+            category="technical",
+            subject="Issue 1",
+            description="First issue",
+        )
+        
+        fresh_tool.get_customer_tickets("CUST-TEST").clear()
+        
+        assert len(fresh_tool.get_customer_tickets("CUST-TEST")) == 1
+        assert fresh_tool.get_customer_tickets("CUST-NONE") == []